@@ -0,0 +1,186 @@
+"""
+Act Text Chunking Module
+Splits raw act texts (it.txt / ipc.txt style) on section headings, drops amendment footnotes and
+page numbers, and packs each section's sentences into chunks that fit the embedding model's
+token window, measured with the model's real tokenizer.
+"""
+
+import os
+import re
+from typing import Callable, Iterator, List, Dict, Any, Optional
+
+from embeddings import DEFAULT_MODEL, MODEL_REGISTRY, onnx_model_dir
+
+# Heading styles. Each pattern captures the section number and (optionally) its title.
+HEADING_PATTERNS = {
+    # India Code gazette layout: "43A. Compensation for failure to protect data.—(1) ..."
+    # (optionally "[" for inserted sections, title may wrap onto a second line, en or em dash)
+    "gazette": re.compile(
+        r'^\[?(?P<number>\d+[A-Z]*)\.\s+(?P<title>[^\n—–]{2,200}?(?:\n[^\n—–]{1,200}?)?)\.?\s*[—–]',
+        re.MULTILINE,
+    ),
+    # Record layout: "Section: IPC 302\nOffense: Murder\n..."
+    "record": re.compile(
+        r'^Section:\s*(?:IPC\s+)?(?P<number>\d+[A-Z]*)\s*\n(?:Offense:\s*(?P<title>[^\n]+))?',
+        re.MULTILINE,
+    ),
+}
+# "CHAPTER IX\n5\n[PENALTIES, COMPENSATION AND ADJUDICATION]" (footnote marker lines skipped)
+CHAPTER_PATTERN = re.compile(r'^CHAPTER\s+([IVXLC]+[A-Z]?)\s*\n(?:\d+\s*\n)?\[?([^\n\]]+)', re.MULTILINE)
+
+# Amendment footnotes ("2. Subs. by Act 10 of 2009, s. 3 ... (w.e.f. 27-10-2009).") and bare page numbers
+FOOTNOTE_LINE = re.compile(
+    r'^\s*\d+\.\s+(?:Subs\.|Ins\.|Omitted|Added|Rep\.|The words|Clause|Sub-section|Vide|\d{1,2}(?:st|nd|rd|th)\s)'
+    r'|w\.e\.f\.|^\s*\d+\s*$'
+)
+FOOTNOTE_TITLE = re.compile(r'Subs\. by|Ins\. by|w\.e\.f\.|Omitted by')
+# Sentence / clause boundaries: after . ; : when the next token starts a sentence or a numbered clause
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.;:])\s+(?=\(|[A-Z0-9"“])')
+
+# [CLS] and [SEP]
+SPECIAL_TOKENS = 2
+
+
+def load_token_counter(model_name: Optional[str] = None) -> Callable[[str], int]:
+    """
+    Token counter using the embedding model's own tokenizer (no truncation, no special tokens)
+
+    Tries the ONNX export's tokenizer.json, then the Hugging Face tokenizer; falls back to a
+    4-characters-per-token estimate with a warning if neither is available.
+    """
+    model_name = model_name or os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL)
+    tokenizer_path = os.path.join(onnx_model_dir(model_name), "tokenizer.json")
+    try:
+        from tokenizers import Tokenizer
+
+        if os.path.exists(tokenizer_path):
+            tokenizer = Tokenizer.from_file(tokenizer_path)
+            tokenizer.no_truncation()
+            return lambda text: len(tokenizer.encode(text, add_special_tokens=False).ids)
+    except ImportError:
+        pass
+    try:
+        from transformers import AutoTokenizer
+
+        repo = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        hf_tokenizer = AutoTokenizer.from_pretrained(repo)
+        return lambda text: len(hf_tokenizer.encode(text, add_special_tokens=False, truncation=False))
+    except Exception as e:
+        print(f"[Chunking] ⚠️ Tokenizer for {model_name} unavailable ({e}); estimating 4 characters per token")
+        return lambda text: (len(text) + 3) // 4
+
+
+def model_token_limit(model_name: Optional[str] = None) -> int:
+    """Input window of the embedding model, from the registry"""
+    model_name = model_name or os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL)
+    return MODEL_REGISTRY.get(model_name, {}).get("max_seq_length", 256)
+
+
+def clean_section_text(text: str) -> str:
+    """Drop footnote / page-number lines and join the hard-wrapped lines of the gazette layout"""
+    lines = [line for line in text.splitlines() if not FOOTNOTE_LINE.search(line)]
+    return re.sub(r'\s+', ' ', " ".join(lines)).strip()
+
+
+def split_sections(text: str, style: str = "gazette") -> List[Dict[str, Any]]:
+    """
+    Split an act into sections
+
+    Returns:
+        [{"number", "title", "chapter", "text"}] in document order. Text before the first heading
+        (title page, arrangement of sections) is dropped. Without any heading the whole text is
+        returned as one section with number None.
+    """
+    pattern = HEADING_PATTERNS[style]
+    headings = [m for m in pattern.finditer(text) if not FOOTNOTE_TITLE.search(m.group("title") or "")]
+    if not headings:
+        return [{"number": None, "title": None, "chapter": None, "text": clean_section_text(text)}]
+
+    chapters = []
+    for m in CHAPTER_PATTERN.finditer(text):
+        name = re.sub(r'\s+\d+$', '', m.group(2).strip()).title()
+        chapters.append((m.start(), f"Chapter {m.group(1)} - {name}"))
+    sections = []
+    chapter = None
+    for i, match in enumerate(headings):
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(text)
+        title = match.group("title")
+        if title:
+            # Drop footnote markers left where the title wrapped ("recognition of 1\nelectronic")
+            title = re.sub(r'\s*\d*\s*\n\s*', ' ', title).strip(" [].")
+        # Chapter headings sit between the previous section and this one (the arrangement of
+        # sections at the top also lists every chapter, so never look further back than that)
+        window_start = headings[i - 1].start() if i else max(0, match.start() - 300)
+        for position, name in chapters:
+            if window_start <= position < match.start():
+                chapter = name
+        sections.append({
+            "number": match.group("number"),
+            "title": title,
+            "chapter": chapter,
+            "text": clean_section_text(text[match.start():end]),
+        })
+    return sections
+
+
+def pack_sentences(text: str, budget: int, count_tokens: Callable[[str], int]) -> List[str]:
+    """Greedily pack sentences into pieces of at most `budget` tokens (over-long sentences split on words)"""
+    pieces, current, current_tokens = [], [], 0
+    for sentence in SENTENCE_BOUNDARY.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        tokens = count_tokens(sentence)
+        if tokens > budget:
+            if current:
+                pieces.append(" ".join(current))
+                current, current_tokens = [], 0
+            words, window = sentence.split(), []
+            for word in words:
+                if window and count_tokens(" ".join(window + [word])) > budget:
+                    pieces.append(" ".join(window))
+                    window = []
+                window.append(word)
+            if window:
+                current, current_tokens = window, count_tokens(" ".join(window))
+            continue
+        # +1 for the joining space, which can merge into a separate token at the boundary
+        if current and current_tokens + tokens + 1 > budget:
+            pieces.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += tokens + (1 if len(current) > 1 else 0)
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_act(text: str, act_title: str, count_tokens: Callable[[str], int], max_tokens: int,
+              style: str = "gazette") -> Iterator[Dict[str, Any]]:
+    """
+    Section-aware, token-bounded chunks of an act
+
+    Every yielded "document" (heading prefix included) fits in `max_tokens` including special tokens,
+    so nothing is truncated at embedding time and no overlap windows are needed.
+
+    Yields:
+        {"document", "section", "section_title", "chapter", "part", "parts"}
+    """
+    for section in split_sections(text, style):
+        if not section["text"]:
+            continue
+        label = f"Section {section['number']}" if section["number"] else "Text"
+        if section["title"]:
+            label += f" ({section['title']})"
+        prefix = f"Statute: {act_title}, {label}. Text: "
+        budget = max(16, max_tokens - SPECIAL_TOKENS - count_tokens(prefix))
+        pieces = pack_sentences(section["text"], budget, count_tokens)
+        for part, piece in enumerate(pieces):
+            yield {
+                "document": prefix + piece,
+                "section": section["number"],
+                "section_title": section["title"],
+                "chapter": section["chapter"],
+                "part": part,
+                "parts": len(pieces),
+            }
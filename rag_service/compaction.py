@@ -0,0 +1,130 @@
+"""
+Compaction Module
+Tombstones for documents removed from the index, and compaction that purges them.
+
+Deleting from a Chroma collection only marks the vectors deleted in the HNSW segment: the graph
+keeps their nodes, the segment files keep their bytes, and search keeps stepping over them. Every
+deletion made by the ingestor is therefore recorded in a tombstone log next to the index
+(tombstones.ndjson). Compaction copies the live documents, with their stored vectors, into a
+freshly built collection (a new HNSW segment without deleted nodes), vacuums the doc store,
+clears the log and reports how much space was reclaimed. Nothing is re-embedded.
+"""
+
+import os
+import json
+import time
+from typing import Iterable, Iterator, List, Dict, Any, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TOMBSTONE_FILE = "tombstones.ndjson"
+TOMBSTONE_PATH = os.path.join(BASE_DIR, TOMBSTONE_FILE)
+COMPACT_PAGE_SIZE = 1000
+
+
+class TombstoneLog:
+    """Append-only record of deleted document ids: one {"id", "source", "content_hash", "deleted_at"} per line"""
+
+    def __init__(self, path: str = TOMBSTONE_PATH):
+        self.path = path
+
+    def record(self, ids: Iterable[str], source: str, hashes: Optional[Dict[str, Optional[str]]] = None):
+        hashes = hashes or {}
+        deleted_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        lines = [json.dumps({"id": doc_id, "source": source, "content_hash": hashes.get(doc_id),
+                             "deleted_at": deleted_at}) for doc_id in ids]
+        if not lines:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn last line of an interrupted run
+                    continue
+
+    def pending(self, live_ids: Optional[set] = None) -> int:
+        """Tombstoned ids, excluding ones that were written again since (when `live_ids` is given)"""
+        ids = {entry["id"] for entry in self.entries()}
+        return len(ids - live_ids) if live_ids is not None else len(ids)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def dir_size(path: str) -> int:
+    """Bytes used by a file or directory tree (0 if missing)"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def copy_live_documents(source, target, page_size: int = COMPACT_PAGE_SIZE) -> int:
+    """Page every live document (id, text, metadata, stored vector) of `source` into `target`"""
+    copied = 0
+    total = source.count()
+    for offset in range(0, total, page_size):
+        page = source.get(include=["embeddings", "documents", "metadatas"], limit=page_size, offset=offset)
+        if not len(page["ids"]):
+            break
+        embeddings = page["embeddings"]
+        target.add(
+            ids=page["ids"],
+            documents=page["documents"],
+            metadatas=page["metadatas"],
+            embeddings=embeddings.tolist() if hasattr(embeddings, "tolist") else embeddings,
+        )
+        copied += len(page["ids"])
+    return copied
+
+
+def compact_collections(source_client, target_client, names: List[str],
+                        page_size: int = COMPACT_PAGE_SIZE) -> Dict[str, int]:
+    """
+    Rebuild each named collection of `source_client` in `target_client`, keeping the collection
+    metadata (embedding model, HNSW parameters). Collections the source lacks are skipped.
+
+    Returns:
+        name -> documents copied
+    """
+    existing = {getattr(c, "name", c) for c in source_client.list_collections()}
+    copied = {}
+    for name in names:
+        if name not in existing:
+            continue
+        source = source_client.get_collection(name=name, embedding_function=None)
+        target = target_client.create_collection(name=name, embedding_function=None, metadata=source.metadata or None)
+        copied[name] = copy_live_documents(source, target, page_size)
+    return copied
+
+
+def vacuum_doc_store(path: str) -> int:
+    """VACUUM a doc store in place (reclaims pages freed by deleted chunks); returns bytes reclaimed"""
+    import sqlite3
+
+    if not os.path.exists(path):
+        return 0
+
+    def size() -> int:
+        return sum(dir_size(p) for p in (path, f"{path}-wal"))
+
+    before = size()
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+    return before - size()
@@ -0,0 +1,269 @@
+"""
+Corpus Module
+One columnar corpus file shared by the service, evaluation tools and every index backend, so none of
+them re-parse the CSV / text / JSON sources or re-embed anything.
+
+corpus.arrow is an uncompressed Arrow IPC file with the columns
+    id, type, act, section, text, metadata (JSON), embedding (fixed-size float32 list)
+and the format version, embedding model and collection metadata in its schema metadata. It is opened
+with pa.memory_map: text and embedding buffers are read straight from the OS page cache, never parsed
+or copied, and every worker process mapping the same file shares one copy.
+
+The corpus holds exactly what the index holds, so it replaces the JSON / text sources the index is built
+from, not every file under "datasets resources". The statute CSVs only reach it through
+ipc_bns_mapping.json (scripts/ingest_statutes.py): every bns_sections.csv section is in it, but
+ipc_sections.csv rows (offense / punishment per IPC section) are only there for the mapped sections,
+so tools that need those rows still read the CSV.
+"""
+
+import os
+import json
+from typing import Iterator, List, Dict, Any, Optional, Tuple
+
+from vector_store import BASE_DIR, COLLECTION_NAME, MmapVectorStore
+
+CORPUS_FORMAT_VERSION = 1
+CORPUS_FILE = "corpus.arrow"
+CORPUS_PATH = os.path.join(BASE_DIR, CORPUS_FILE)
+# Rows per record batch while streaming. close() merges the batches into one, so the embedding column
+# of any corpus maps to a single zero-copy (N, D) matrix.
+BATCH_ROWS = int(os.getenv("CORPUS_BATCH_ROWS", "65536"))
+SCHEMA_KEY = b"corpus"
+
+
+def corpus_fields(metadata: Dict[str, Any]) -> Tuple[str, str, str]:
+    """(type, act, section) columns from a document's metadata (each source names them differently)"""
+    doc_type = metadata.get("type", "")
+    act = metadata.get("act") or metadata.get("law") or metadata.get("source") or ""
+    section = ""
+    for key in ("section", "section_number", "bns_section", "ipc_section"):
+        if metadata.get(key):
+            section = str(metadata[key])
+            break
+    return doc_type, act, section
+
+
+def corpus_schema(dimension: int, manifest: Dict[str, Any]):
+    import pyarrow as pa
+
+    return pa.schema([
+        ("id", pa.string()),
+        ("type", pa.string()),
+        ("act", pa.string()),
+        ("section", pa.string()),
+        ("text", pa.string()),
+        ("metadata", pa.string()),
+        ("embedding", pa.list_(pa.float32(), dimension)),
+    ], metadata={SCHEMA_KEY: json.dumps(manifest)})
+
+
+class CorpusWriter:
+    """
+    Streams rows into a corpus file in record batches of BATCH_ROWS.
+
+    The file is written next to `path` and renamed into place on close(), so readers never map a
+    half-written corpus. If more than one batch was written, close() first rewrites them as a single
+    record batch (one more pass over the file, holding the corpus in memory once at build time) so
+    readers never have to concatenate.
+    """
+
+    def __init__(self, path: str, dimension: int, manifest: Optional[Dict[str, Any]] = None):
+        import pyarrow as pa
+
+        self.path = path
+        self.dimension = dimension
+        self.manifest = {"format_version": CORPUS_FORMAT_VERSION, "name": COLLECTION_NAME, "dimension": dimension,
+                         **(manifest or {})}
+        self.schema = corpus_schema(dimension, self.manifest)
+        self.tmp_path = f"{path}.tmp"
+        self._sink = pa.OSFile(self.tmp_path, "wb")
+        self._writer = pa.ipc.new_file(self._sink, self.schema)
+        self._pending: List[tuple] = []
+        self.count = 0
+        self.batches = 0
+
+    def write(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]], embeddings):
+        for row in zip(ids, documents, metadatas, embeddings):
+            self._pending.append(row)
+            if len(self._pending) >= BATCH_ROWS:
+                self._flush()
+
+    def _flush(self):
+        import numpy as np
+        import pyarrow as pa
+
+        if not self._pending:
+            return
+        ids, documents, metadatas, embeddings = zip(*self._pending)
+        fields = [corpus_fields(meta or {}) for meta in metadatas]
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.shape[1] != self.dimension:
+            raise ValueError(f"Expected {self.dimension}-dim embeddings, got {matrix.shape[1]}")
+        batch = pa.record_batch([
+            pa.array(ids, pa.string()),
+            pa.array([f[0] for f in fields], pa.string()),
+            pa.array([f[1] for f in fields], pa.string()),
+            pa.array([f[2] for f in fields], pa.string()),
+            pa.array(documents, pa.string()),
+            pa.array([json.dumps(meta or {}, ensure_ascii=False) for meta in metadatas], pa.string()),
+            pa.FixedSizeListArray.from_arrays(pa.array(matrix.reshape(-1)), self.dimension),
+        ], schema=self.schema)
+        self._writer.write_batch(batch)
+        self.count += len(ids)
+        self.batches += 1
+        self._pending = []
+
+    def close(self) -> int:
+        self._flush()
+        self._writer.close()
+        self._sink.close()
+        if self.batches > 1:
+            self._merge_batches()
+        os.replace(self.tmp_path, self.path)
+        print(f"[Corpus] Wrote {self.count} rows ({self.dimension}-dim) to {self.path}")
+        return self.count
+
+    def _merge_batches(self):
+        import pyarrow as pa
+
+        merged_path = f"{self.tmp_path}.merged"
+        source = pa.memory_map(self.tmp_path, "r")
+        try:
+            table = pa.ipc.open_file(source).read_all().combine_chunks()
+            with pa.OSFile(merged_path, "wb") as sink:
+                with pa.ipc.new_file(sink, self.schema) as writer:
+                    writer.write_table(table)
+            del table
+        finally:
+            source.close()
+        os.replace(merged_path, self.tmp_path)
+
+    def abort(self):
+        self._writer.close()
+        self._sink.close()
+        os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type:
+            self.abort()
+        else:
+            self.close()
+
+
+def write_corpus_from_collection(collection, path: str, extra_manifest: Optional[Dict[str, Any]] = None,
+                                 page_size: int = 1000) -> int:
+    """Page a Chroma collection (documents, metadata and stored vectors) into a corpus file. Nothing is re-embedded."""
+    collection_metadata = collection.metadata or {}
+    writer = None
+    try:
+        total = collection.count()
+        for offset in range(0, total, page_size):
+            page = collection.get(include=["embeddings", "documents", "metadatas"], limit=page_size, offset=offset)
+            if writer is None:
+                writer = CorpusWriter(path, len(page["embeddings"][0]), {
+                    "model": collection_metadata.get("embedding:model"),
+                    "normalized": collection_metadata.get("embedding:normalized", True),
+                    "collection_metadata": collection_metadata,
+                    **(extra_manifest or {}),
+                })
+            writer.write(page["ids"], page["documents"], page["metadatas"], page["embeddings"])
+    except BaseException:
+        if writer:
+            writer.abort()
+        raise
+    if writer is None:
+        raise ValueError("Collection is empty; nothing to write")
+    return writer.close()
+
+
+class ArrowStringColumn:
+    """Read-only sequence over a string column: values are decoded from the mapped buffer on access"""
+
+    def __init__(self, column):
+        self.column = column
+
+    def __len__(self) -> int:
+        return len(self.column)
+
+    def __getitem__(self, row: int) -> str:
+        return self.column[row].as_py()
+
+
+class Corpus:
+    """Memory-mapped corpus file"""
+
+    def __init__(self, path: str = CORPUS_PATH):
+        import pyarrow as pa
+
+        self.path = path
+        self.table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        self.manifest: Dict[str, Any] = json.loads((self.table.schema.metadata or {}).get(SCHEMA_KEY, b"{}"))
+        version = self.manifest.get("format_version")
+        if version != CORPUS_FORMAT_VERSION:
+            raise ValueError(f"{path}: corpus format version {version}, this build reads {CORPUS_FORMAT_VERSION}")
+        self.dimension = self.table.schema.field("embedding").type.list_size
+
+    def count(self) -> int:
+        return self.table.num_rows
+
+    def ids(self) -> List[str]:
+        return self.table.column("id").to_pylist()
+
+    def texts(self) -> ArrowStringColumn:
+        return ArrowStringColumn(self.table.column("text"))
+
+    def metadatas(self) -> Iterator[Dict[str, Any]]:
+        for chunk in self.table.column("metadata").chunks:
+            for value in chunk.to_pylist():
+                yield json.loads(value)
+
+    def embeddings(self):
+        """
+        (N, D) float32 matrix, a view of the mapped file (CorpusWriter writes one record batch).
+        Files with several batches (e.g. written by other Arrow tools) are concatenated once.
+        """
+        import numpy as np
+
+        chunks = [chunk.flatten().to_numpy(zero_copy_only=True).reshape(-1, self.dimension)
+                  for chunk in self.table.column("embedding").chunks]
+        if len(chunks) == 1:
+            return chunks[0]
+        return np.concatenate(chunks) if chunks else np.zeros((0, self.dimension), dtype=np.float32)
+
+    def export(self) -> tuple:
+        """(ids, embeddings, documents, metadatas), the same shape as vector_store.export_collection()"""
+        return self.ids(), self.embeddings(), self.table.column("text").to_pylist(), list(self.metadatas())
+
+    def to_parquet(self, path: str):
+        """Compressed Parquet copy for interchange (Parquet cannot be memory-mapped without decoding)"""
+        import pyarrow.parquet as pq
+
+        pq.write_table(self.table, path, compression="zstd")
+
+
+class CorpusVectorStore(MmapVectorStore):
+    """
+    Exact search straight from a corpus file (VECTOR_BACKEND=corpus): the embedding column is the
+    search matrix and documents are decoded from the mapped text column only for returned hits.
+    """
+
+    def _load(self, path: str):
+        corpus = Corpus(path)
+        self.corpus = corpus
+        columns: Dict[str, List[Any]] = {}
+        for row, metadata in enumerate(corpus.metadatas()):
+            for key, value in metadata.items():
+                columns.setdefault(key, [None] * corpus.count())[row] = value
+        manifest = {**corpus.manifest, "count": corpus.count(), "dtype": "float32"}
+        return manifest, corpus.ids(), corpus.texts(), columns, corpus.embeddings()
+
+
+def open_corpus(version: Optional[str] = None) -> Corpus:
+    """Corpus of an index snapshot (default: CURRENT), or CORPUS_PATH when no snapshot is active"""
+    from index_snapshots import current_version, snapshot_path
+
+    version = version or current_version()
+    return Corpus(os.path.join(snapshot_path(version), CORPUS_FILE) if version else os.getenv("CORPUS_FILE_PATH", CORPUS_PATH))
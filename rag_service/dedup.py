@@ -0,0 +1,183 @@
+"""
+Near-Duplicate Detection Module
+MinHash signatures over word shingles, bucketed by LSH banding, cluster near-duplicate documents
+(e.g. the templated judgment summaries produced by ingest_kaggle_data.py) in roughly linear time.
+NearDuplicateFilter wraps a DocumentSource and yields one canonical document per cluster, carrying
+the merged metadata of the documents it stands in for.
+"""
+
+import os
+import re
+import zlib
+from typing import Iterator, List, Dict, Any, Optional, Tuple
+
+from ingestion import Document, DocumentSource
+
+# Mersenne prime for the universal hash family h(x) = (a*x + b) mod p over 32-bit shingle hashes
+MERSENNE_PRIME = (1 << 61) - 1
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 128
+SHINGLE_SIZE = 5
+# Distinct values of a merged field kept on the canonical document
+MERGED_VALUES_LIMIT = 50
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_SIZE) -> set:
+    """CRC32 of every `size`-word shingle (lowercased). Texts shorter than `size` words form one shingle."""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) <= size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+    return {zlib.crc32(" ".join(words[i:i + size]).encode("utf-8")) for i in range(len(words) - size + 1)}
+
+
+def choose_bands(num_perm: int, threshold: float) -> int:
+    """
+    Number of LSH bands for a similarity threshold
+
+    A pair with Jaccard similarity s shares a bucket with probability 1 - (1 - s^r)^b, which rises
+    steeply around (1/b)^(1/r). Pick the split whose midpoint sits just below the threshold, so true
+    near-duplicates are nearly always candidates and the signature comparison does the filtering.
+    """
+    splits = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    below = [(b, r) for b, r in splits if (1 / b) ** (1 / r) <= threshold - 0.05] or splits[-1:]
+    return max(below, key=lambda split: (1 / split[0]) ** (1 / split[1]))[0]
+
+
+class MinHashLSH:
+    """MinHash signatures plus band buckets for the documents inserted so far"""
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, bands: int = 16, seed: int = 1):
+        import numpy as np
+
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        rng = np.random.default_rng(seed)
+        # Fixed seed: the same text always gets the same signature, so clusters are stable across runs
+        self.a = rng.integers(1, 1 << 32, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 32, num_perm, dtype=np.uint64)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.signatures: List[Any] = []
+        self.buckets: Dict[Tuple[int, bytes], List[int]] = {}
+
+    def signature(self, shingles: set):
+        import numpy as np
+
+        x = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+        # a, x < 2^32, so a*x + b cannot overflow uint64
+        return ((x[:, None] * self.a + self.b) % MERSENNE_PRIME).min(axis=0)
+
+    def _band_keys(self, signature) -> Iterator[Tuple[int, bytes]]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def candidates(self, signature) -> List[int]:
+        found = {}
+        for key in self._band_keys(signature):
+            for item in self.buckets.get(key, ()):
+                found[item] = True
+        return list(found)
+
+    def similarity(self, signature, item: int) -> float:
+        """Estimated Jaccard similarity with an inserted document"""
+        return float((signature == self.signatures[item]).mean())
+
+    def insert(self, signature) -> int:
+        item = len(self.signatures)
+        self.signatures.append(signature)
+        for key in self._band_keys(signature):
+            self.buckets.setdefault(key, []).append(item)
+        return item
+
+
+class NearDuplicateFilter(DocumentSource):
+    """
+    Source wrapper that drops near-duplicates, keeping the first document of each cluster
+
+    Two passes over the wrapped source: the first clusters documents (only canonical documents'
+    signatures are kept), the second yields canonical documents with `duplicates` (count) and
+    `merged_<field>` (for the source's merge_fields) added to their metadata. Dropped ids are
+    simply no longer produced, so IncrementalIngestor deletes them from the index.
+    """
+
+    def __init__(self, source: DocumentSource, threshold: float = DEFAULT_THRESHOLD,
+                 num_perm: int = DEFAULT_NUM_PERM, shingle_size: int = SHINGLE_SIZE):
+        self.source = source
+        self.name = source.name
+        self.id_prefixes = source.id_prefixes
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.report: Dict[str, Any] = {}
+        # Dropped id -> canonical id, from the last run
+        self.duplicate_of: Dict[str, str] = {}
+
+    def available(self) -> bool:
+        return self.source.available()
+
+    def _cluster(self) -> Dict[str, Dict[str, List[Any]]]:
+        """First pass: fill duplicate_of; returns canonical id -> duplicate count and merge field values"""
+        lsh = MinHashLSH(self.num_perm, choose_bands(self.num_perm, self.threshold))
+        canonical_ids: List[str] = []
+        merged: Dict[str, Dict[str, List[Any]]] = {}
+        self.duplicate_of = {}
+        seen, documents = set(), 0
+        for doc_id, text, metadata in self.source.documents():
+            if doc_id in seen:
+                continue
+            seen.add(doc_id)
+            documents += 1
+            shingles = shingle_hashes(self.source.dedup_text(text, metadata), self.shingle_size)
+            if not shingles:
+                continue
+            signature = lsh.signature(shingles)
+            match = max(((lsh.similarity(signature, item), item) for item in lsh.candidates(signature)),
+                        default=(0.0, None))
+            if match[0] >= self.threshold:
+                canonical = canonical_ids[match[1]]
+                self.duplicate_of[doc_id] = canonical
+                fields = merged.setdefault(canonical, {"duplicates": 0})
+                fields["duplicates"] += 1
+                for field in self.source.merge_fields:
+                    values = fields.setdefault(field, [])
+                    if field in metadata and metadata[field] not in values and len(values) < MERGED_VALUES_LIMIT:
+                        values.append(metadata[field])
+            else:
+                lsh.insert(signature)
+                canonical_ids.append(doc_id)
+
+        kept = documents - len(self.duplicate_of)
+        self.report = {
+            "documents": documents,
+            "kept": kept,
+            "dropped": len(self.duplicate_of),
+            "clusters_merged": len(merged),
+            "reduction": round(len(self.duplicate_of) / max(documents, 1), 3),
+        }
+        return merged
+
+    def documents(self) -> Iterator[Document]:
+        merged = self._cluster()
+        # Same first-occurrence rule as _cluster, so the output matches report["kept"]
+        seen = set()
+        for doc_id, text, metadata in self.source.documents():
+            if doc_id in seen or doc_id in self.duplicate_of:
+                continue
+            seen.add(doc_id)
+            if doc_id in merged:
+                fields = merged[doc_id]
+                metadata = {**metadata, "duplicates": fields["duplicates"]}
+                for field in self.source.merge_fields:
+                    # Chroma metadata values must be scalars
+                    values = [str(v) for v in fields.get(field, []) if v != metadata.get(field)]
+                    if values:
+                        metadata[f"merged_{field}"] = "; ".join(values)
+            yield doc_id, text, metadata
+
+
+def dedup_sources(sources: List[DocumentSource], threshold: Optional[float] = None) -> List[DocumentSource]:
+    """Wrap the sources that opt in (source.deduplicate) in NearDuplicateFilter (threshold: DEDUP_THRESHOLD)"""
+    threshold = threshold or float(os.getenv("DEDUP_THRESHOLD", DEFAULT_THRESHOLD))
+    return [NearDuplicateFilter(source, threshold) if source.deduplicate else source for source in sources]
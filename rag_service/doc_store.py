@@ -0,0 +1,162 @@
+"""
+Document Store Module
+SQLite store of parent documents (e.g. full judgments) and their ordered child chunks. Child chunks are
+what gets embedded; at query time the matched child is widened into a token-bounded neighbourhood of
+adjacent chunks from its parent, so the prompt gets the relevant passage rather than a blind prefix.
+Lives next to the vector index in each snapshot (docstore.sqlite) and is copied with it.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DOC_STORE_FILE = "docstore.sqlite"
+DOC_STORE_PATH = os.path.join(BASE_DIR, DOC_STORE_FILE)
+# Tokens of context assembled around each matched chunk
+CONTEXT_TOKENS = int(os.getenv("CONTEXT_TOKENS_PER_HIT", "512"))
+# Chunks read on each side of the match; bounds the query even when the budget would allow more
+MAX_SPAN = 16
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parents (
+    parent_id TEXT PRIMARY KEY,
+    metadata  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    chunk_id  TEXT PRIMARY KEY,
+    parent_id TEXT NOT NULL,
+    position  INTEGER NOT NULL,
+    text      TEXT NOT NULL,
+    tokens    INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chunks_by_parent ON chunks (parent_id, position);
+"""
+
+# Child metadata keys that describe the parent rather than the chunk
+CHUNK_KEYS = ("parent_id", "position", "tokens", "content_hash", "ingest_source", "part", "parts")
+
+
+class DocStore:
+    """
+    Parent/child chunk store. Writers use one connection; readers get one connection per thread
+    (read-only, WAL mode), so queries never block on ingestion and never see a half-written batch.
+    """
+
+    def __init__(self, path: str = DOC_STORE_PATH, readonly: bool = False):
+        self.path = path
+        self.readonly = readonly
+        self._local = threading.local()
+        if not readonly:
+            conn = self._connection()
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.readonly:
+                conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            else:
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    # ------------------------------------------------------------------ writing
+
+    def put_chunks(self, rows: Iterable[Tuple[str, str, Dict[str, Any]]]):
+        """Upsert (chunk_id, text, metadata) rows; metadata needs parent_id and position (tokens optional)"""
+        chunks, parents = [], {}
+        for chunk_id, text, metadata in rows:
+            chunks.append((chunk_id, metadata["parent_id"], int(metadata["position"]), text,
+                           int(metadata.get("tokens") or (len(text) + 3) // 4)))
+            parents[metadata["parent_id"]] = json.dumps(
+                {k: v for k, v in metadata.items() if k not in CHUNK_KEYS}, ensure_ascii=False)
+        if not chunks:
+            return
+        conn = self._connection()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?)", chunks)
+            conn.executemany("INSERT OR REPLACE INTO parents VALUES (?, ?)", parents.items())
+
+    def delete_chunks(self, chunk_ids: List[str]):
+        """Delete chunks by id, and parents left without chunks"""
+        conn = self._connection()
+        with conn:
+            conn.executemany("DELETE FROM chunks WHERE chunk_id = ?", [(i,) for i in chunk_ids])
+            conn.execute("DELETE FROM parents WHERE parent_id NOT IN (SELECT DISTINCT parent_id FROM chunks)")
+
+    def chunk_ids(self) -> set:
+        return {row[0] for row in self._connection().execute("SELECT chunk_id FROM chunks")}
+
+    # ------------------------------------------------------------------ reading
+
+    def count(self) -> Dict[str, int]:
+        conn = self._connection()
+        return {
+            "parents": conn.execute("SELECT COUNT(*) FROM parents").fetchone()[0],
+            "chunks": conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0],
+        }
+
+    def parent(self, parent_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute("SELECT metadata FROM parents WHERE parent_id = ?", (parent_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def neighbourhood(self, chunk_id: str, max_tokens: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        The matched chunk plus adjacent chunks of the same parent, added alternately after and before
+        it while they fit in `max_tokens` (the matched chunk itself is always included)
+
+        Returns:
+            {"parent_id", "parent", "text", "start", "end", "tokens"} or None for unknown chunks
+        """
+        max_tokens = max_tokens or CONTEXT_TOKENS
+        conn = self._connection()
+        row = conn.execute("SELECT parent_id, position FROM chunks WHERE chunk_id = ?", (chunk_id,)).fetchone()
+        if row is None:
+            return None
+        parent_id, position = row
+        window = {
+            pos: (text, tokens)
+            for pos, text, tokens in conn.execute(
+                "SELECT position, text, tokens FROM chunks WHERE parent_id = ? AND position BETWEEN ? AND ?",
+                (parent_id, position - MAX_SPAN, position + MAX_SPAN),
+            )
+        }
+        start = end = position
+        used = window[position][1]
+        grew = True
+        while grew:
+            grew = False
+            for candidate in (end + 1, start - 1):
+                if candidate in window and used + window[candidate][1] <= max_tokens:
+                    used += window[candidate][1]
+                    start, end = min(start, candidate), max(end, candidate)
+                    grew = True
+        return {
+            "parent_id": parent_id,
+            "parent": self.parent(parent_id) or {},
+            "text": " ".join(window[pos][0] for pos in range(start, end + 1)),
+            "start": start,
+            "end": end,
+            "tokens": used,
+        }
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def open_doc_store(version: Optional[str] = None) -> Optional[DocStore]:
+    """Read-only doc store of an index snapshot (None uses the legacy location); None if it has none"""
+    if version:
+        from index_snapshots import snapshot_path
+        path = os.path.join(snapshot_path(version), DOC_STORE_FILE)
+    else:
+        path = os.getenv("DOC_STORE_PATH", DOC_STORE_PATH)
+    return DocStore(path, readonly=True) if os.path.exists(path) else None
@@ -0,0 +1,152 @@
+"""
+Embedding Pipeline Module
+Batch-embedding stage for bulk ingestion: batches of (id, text, metadata) go in, (batch, vectors) come
+out in order. InlineEmbedder encodes in the calling process; ParallelEmbedder fans batches out to a pool
+of worker processes, each holding its own copy of the model, with a bounded number of batches in flight.
+Both record per-stage timings and CPU time for throughput / utilisation reporting.
+"""
+
+import os
+import time
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Iterable, List, Dict, Any, Optional, Tuple
+
+from embeddings import DEFAULT_MODEL, model_spec
+
+_WORKER_PROVIDER = None
+
+
+class PipelineStats:
+    """Wall time, item counts and CPU time per pipeline stage (read / embed / write)"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.worker_cpu_s = 0.0
+
+    def add(self, stage: str, seconds: float, items: int = 0):
+        entry = self.stages.setdefault(stage, {"seconds": 0.0, "items": 0})
+        entry["seconds"] += seconds
+        entry["items"] += items
+
+    def report(self, cpu_count: Optional[int] = None) -> Dict[str, Any]:
+        wall = max(time.perf_counter() - self.started, 1e-9)
+        cpu = (time.process_time() - self.cpu_started) + self.worker_cpu_s
+        cpu_count = cpu_count or os.cpu_count() or 1
+        return {
+            "wall_s": round(wall, 3),
+            "stages": {
+                name: {
+                    "seconds": round(entry["seconds"], 3),
+                    "items": int(entry["items"]),
+                    "items_per_sec": round(entry["items"] / max(entry["seconds"], 1e-9), 1),
+                }
+                for name, entry in self.stages.items()
+            },
+            "cpu_s": round(cpu, 2),
+            # Share of all cores kept busy over the run (1.0 = every core saturated)
+            "cpu_utilisation": round(cpu / (wall * cpu_count), 3),
+        }
+
+
+class InlineEmbedder:
+    """Encodes each batch in the calling process with an EmbeddingProvider"""
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.model_name = getattr(provider, "model_name", DEFAULT_MODEL)
+        self.dimension = getattr(provider, "dimension", None)
+
+    def describe(self) -> dict:
+        return self.provider.describe() if hasattr(self.provider, "describe") else {"model": self.model_name}
+
+    def embed_batches(self, batches: Iterable[list], stats: Optional[PipelineStats] = None) -> Iterator[Tuple[list, Any]]:
+        for batch in batches:
+            start = time.perf_counter()
+            vectors = self.provider.embed([text for _, text, _ in batch])
+            if stats:
+                stats.add("embed", time.perf_counter() - start, len(batch))
+            yield batch, vectors
+
+    def close(self):
+        pass
+
+
+def _init_worker(backend: Optional[str], model_name: str, threads: int):
+    """Load the model once per worker; threads are split so workers do not oversubscribe cores"""
+    global _WORKER_PROVIDER
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["ONNX_NUM_THREADS"] = str(threads)
+    from embeddings import get_embedding_provider
+
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _WORKER_PROVIDER = get_embedding_provider(backend=backend, model_name=model_name)
+
+
+def _embed_in_worker(texts: List[str]):
+    start, cpu_start = time.perf_counter(), time.process_time()
+    vectors = _WORKER_PROVIDER.embed(texts)
+    return vectors, time.perf_counter() - start, time.process_time() - cpu_start
+
+
+class ParallelEmbedder:
+    """
+    Process-pool embedding stage.
+
+    Workers are started with 'spawn' (torch / ONNX Runtime state does not survive fork) and split the
+    machine's cores between them. At most `max_in_flight` batches are queued, so memory stays bounded
+    while the producer (source parsing) and the consumer (store writes) overlap with encoding.
+    """
+
+    def __init__(self, workers: Optional[int] = None, backend: Optional[str] = None, model_name: Optional[str] = None,
+                 max_in_flight: Optional[int] = None):
+        self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self.backend = backend or os.getenv("EMBEDDING_BACKEND", "torch")
+        self.model_name = model_name or os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL)
+        self.dimension = model_spec(self.model_name)["dimension"]
+        self.max_in_flight = max_in_flight or self.workers * 2
+        self.threads_per_worker = max(1, (os.cpu_count() or 1) // self.workers)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.backend, self.model_name, self.threads_per_worker),
+        )
+        print(f"[EmbeddingPipeline] {self.workers} workers x {self.threads_per_worker} threads ({self.backend}, {self.model_name})")
+
+    def describe(self) -> dict:
+        return {"backend": self.backend, "model": self.model_name, "dimension": self.dimension, "workers": self.workers}
+
+    def embed_batches(self, batches: Iterable[list], stats: Optional[PipelineStats] = None) -> Iterator[Tuple[list, Any]]:
+        in_flight = deque()
+
+        def collect():
+            batch, future = in_flight.popleft()
+            start = time.perf_counter()
+            vectors, worker_s, worker_cpu = future.result()
+            if vectors.shape[1] != self.dimension:
+                raise ValueError(f"{self.model_name} produced {vectors.shape[1]}-dim vectors, registry says {self.dimension}")
+            if stats:
+                # "embed" is summed worker time (per-worker rate); "embed_wait" is what the consumer
+                # actually blocked for, since encoding overlaps with reading and writing
+                stats.add("embed", worker_s, len(batch))
+                stats.add("embed_wait", time.perf_counter() - start, len(batch))
+                stats.worker_cpu_s += worker_cpu
+            return batch, vectors
+
+        for batch in batches:
+            in_flight.append((batch, self._pool.submit(_embed_in_worker, [text for _, text, _ in batch])))
+            while len(in_flight) >= self.max_in_flight:
+                yield collect()
+        while in_flight:
+            yield collect()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,255 @@
+"""
+Embedding Provider Module
+Pluggable sentence-embedding backends: PyTorch (sentence-transformers) and ONNX Runtime (fp32 / int8)
+"""
+
+import os
+import json
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.join(BASE_DIR, "models")
+
+# Backend names accepted by EMBEDDING_BACKEND
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# Models an index may be built with. Every provider L2-normalises its output.
+MODEL_REGISTRY = {
+    "all-MiniLM-L6-v2": {"dimension": 384, "max_seq_length": 256, "normalized": True},
+    "multi-qa-MiniLM-L6-cos-v1": {"dimension": 384, "max_seq_length": 512, "normalized": True},
+    "paraphrase-multilingual-MiniLM-L12-v2": {"dimension": 384, "max_seq_length": 128, "normalized": True},
+    "all-mpnet-base-v2": {"dimension": 768, "max_seq_length": 384, "normalized": True},
+    "BAAI/bge-small-en-v1.5": {"dimension": 384, "max_seq_length": 512, "normalized": True},
+}
+
+
+class EmbeddingMismatchError(ValueError):
+    """The index was built with a different embedding model than the one loaded for queries"""
+
+
+def model_spec(model_name: str) -> dict:
+    """Registry entry for a model; raises ValueError for models nobody has vetted for this index"""
+    if model_name not in MODEL_REGISTRY:
+        raise ValueError(f"Unknown embedding model '{model_name}'. Registered: {', '.join(MODEL_REGISTRY)}")
+    return MODEL_REGISTRY[model_name]
+
+
+def embedding_metadata(model_name: str, dimension: int) -> dict:
+    """Collection metadata recording which model produced the stored vectors"""
+    return {
+        "embedding:model": model_name,
+        "embedding:dimension": int(dimension),
+        "embedding:normalized": True,
+    }
+
+
+def check_embedding_compatibility(index_metadata: Optional[dict], provider: "EmbeddingProvider") -> bool:
+    """
+    Refuse to query an index with vectors from another model
+
+    Args:
+        index_metadata: Collection metadata (Chroma) or manifest collection_metadata (mmap)
+        provider: The provider that will embed queries
+
+    Returns:
+        True if the index records its model and it matches; False for legacy indexes without a record
+
+    Raises:
+        EmbeddingMismatchError: Model id or dimension differ
+    """
+    index_metadata = index_metadata or {}
+    model = index_metadata.get("embedding:model")
+    if model is None:
+        print(f"[Embeddings] ⚠️ Index does not record its embedding model; assuming {provider.model_name}. "
+              "Rebuild or migrate it (scripts/migrate_embeddings.py) to enable the check.")
+        return False
+    dimension = index_metadata.get("embedding:dimension")
+    if model != provider.model_name or (dimension and provider.dimension and int(dimension) != provider.dimension):
+        raise EmbeddingMismatchError(
+            f"Index was built with {model} ({dimension}-dim) but queries use {provider.model_name} "
+            f"({provider.dimension}-dim). Set EMBEDDING_MODEL={model} or run scripts/migrate_embeddings.py."
+        )
+    return True
+
+
+def onnx_model_dir(model_name: str = DEFAULT_MODEL) -> str:
+    """Directory holding the exported ONNX graph(s) and tokenizer for a model"""
+    return os.getenv("ONNX_MODEL_DIR") or os.path.join(MODELS_DIR, f"{model_name}-onnx")
+
+
+class EmbeddingProvider(ABC):
+    """Turns texts into L2-normalised float32 vectors. Subclasses implement _encode()."""
+
+    backend = "base"
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, batch_size: int = 32):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.dimension = None
+
+    def embed(self, texts: List[str]):
+        """
+        Embed a list of texts
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            numpy array of shape (len(texts), dimension), float32, unit length rows
+        """
+        import numpy as np
+
+        if not texts:
+            return np.zeros((0, self.dimension or 0), dtype=np.float32)
+        return self._encode(list(texts))
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query string and return it as a plain list"""
+        return self.embed([text])[0].tolist()
+
+    @abstractmethod
+    def _encode(self, texts: List[str]):
+        """Embed a non-empty batch; returns float32 unit-length rows"""
+
+    def describe(self) -> dict:
+        return {"backend": self.backend, "model": self.model_name, "dimension": self.dimension}
+
+
+class SentenceTransformerProvider(EmbeddingProvider):
+    """Reference backend: the PyTorch model via sentence-transformers"""
+
+    backend = "torch"
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, batch_size: int = 32, device: Optional[str] = None):
+        super().__init__(model_name, batch_size)
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device=device)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+
+    def _encode(self, texts: List[str]):
+        import numpy as np
+
+        vectors = self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        return vectors.astype(np.float32, copy=False)
+
+
+class OnnxEmbeddingProvider(EmbeddingProvider):
+    """
+    ONNX Runtime backend for a transformer exported by scripts/export_onnx_embeddings.py.
+    Reproduces the sentence-transformers pipeline: tokenize -> encoder -> mean pooling -> L2 normalise.
+    """
+
+    backend = "onnx"
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, quantized: bool = False, batch_size: int = 32,
+                 model_dir: Optional[str] = None, num_threads: Optional[int] = None):
+        super().__init__(model_name, batch_size)
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = model_dir or onnx_model_dir(model_name)
+        graph_file = "model.int8.onnx" if quantized else "model.onnx"
+        graph_path = os.path.join(model_dir, graph_file)
+        if not os.path.exists(graph_path):
+            raise FileNotFoundError(f"{graph_path} not found. Run scripts/export_onnx_embeddings.py first.")
+
+        with open(os.path.join(model_dir, "export_config.json"), "r", encoding="utf-8") as f:
+            config = json.load(f)
+        self.dimension = config["dimension"]
+        self.max_seq_length = config.get("max_seq_length", 256)
+        self.backend = "onnx-int8" if quantized else "onnx"
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        self.tokenizer.enable_padding(pad_id=config.get("pad_token_id", 0), pad_token=config.get("pad_token", "[PAD]"))
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = num_threads or int(os.getenv("ONNX_NUM_THREADS", "0"))
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(graph_path, options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def _encode(self, texts: List[str]):
+        import numpy as np
+
+        # Sort by length so each batch pads to a similar size, then restore caller order
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        output = np.empty((len(texts), self.dimension), dtype=np.float32)
+
+        for start in range(0, len(order), self.batch_size):
+            batch_idx = order[start:start + self.batch_size]
+            encodings = self.tokenizer.encode_batch([texts[i] for i in batch_idx])
+
+            input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self._input_names:
+                feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+            hidden = self.session.run(None, feeds)[0]
+
+            # Mean pooling over real tokens
+            mask = attention_mask[..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            output[batch_idx] = pooled / np.clip(norms, 1e-12, None)
+
+        return output
+
+
+class ProviderEmbeddingFunction:
+    """Adapter exposing an EmbeddingProvider through ChromaDB's embedding-function interface"""
+
+    def __init__(self, provider: EmbeddingProvider):
+        self.provider = provider
+
+    def __call__(self, input):
+        return self.provider.embed(list(input)).tolist()
+
+    @staticmethod
+    def name() -> str:
+        # Existing collections were persisted with Chroma's SentenceTransformerEmbeddingFunction;
+        # keep its name so newer Chroma versions do not report an embedding-function conflict
+        return "sentence_transformer"
+
+
+def get_embedding_provider(backend: Optional[str] = None, model_name: Optional[str] = None) -> EmbeddingProvider:
+    """
+    Build the configured embedding provider
+
+    Args:
+        backend: 'torch', 'onnx' or 'onnx-int8' (default: EMBEDDING_BACKEND env, else 'torch')
+        model_name: Model id (default: EMBEDDING_MODEL env, else all-MiniLM-L6-v2)
+
+    Returns:
+        EmbeddingProvider instance. Falls back to torch if the ONNX export is missing.
+    """
+    backend = (backend or os.getenv("EMBEDDING_BACKEND", "torch")).lower()
+    model_name = model_name or os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL)
+    batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND '{backend}'. Expected one of {BACKENDS}")
+
+    if backend.startswith("onnx"):
+        try:
+            provider = OnnxEmbeddingProvider(model_name, quantized=(backend == "onnx-int8"), batch_size=batch_size)
+            print(f"[Embeddings] Using ONNX Runtime backend ({provider.backend}) for {model_name}")
+            return provider
+        except (ImportError, FileNotFoundError) as e:
+            print(f"[Embeddings] ⚠️ ONNX backend unavailable ({e}). Falling back to PyTorch.")
+
+    provider = SentenceTransformerProvider(model_name, batch_size=batch_size)
+    print(f"[Embeddings] Using PyTorch backend for {model_name}")
+    return provider
@@ -0,0 +1,136 @@
+"""
+Extraction Cache Module
+Content-addressed SQLite cache of PDF extraction results, so a re-uploaded judgment goes straight to
+summarization. Whole documents are keyed by the SHA-256 of the file (text, cleaned text and method);
+OCR'd pages are also cached on their own, keyed by a hash of what the page draws, so a scanned page
+seen inside another PDF is not OCR'd again. Keys carry the settings the result depends on.
+
+Entries are zlib-compressed and evicted least-recently-used once their total size passes
+EXTRACTION_CACHE_MAX_MB. The cache is best-effort: any SQLite error is logged and treated as a miss.
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from collections import Counter
+from typing import Dict, Any, Optional, Tuple
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+EXTRACTION_CACHE_PATH = os.path.join(BASE_DIR, "extraction_cache.sqlite")
+EXTRACTION_CACHE_MAX_MB = int(os.getenv("EXTRACTION_CACHE_MAX_MB", "512"))
+# Eviction frees down to this fraction of the limit, so a full cache does not evict on every insert
+EVICT_TO = 0.9
+# Bump when extraction or cleaning changes what a cached entry would contain
+CACHE_FORMAT = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key       TEXT PRIMARY KEY,
+    method    TEXT NOT NULL,
+    payload   BLOB NOT NULL,
+    bytes     INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_by_use ON entries (last_used);
+"""
+
+
+def file_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ExtractionCache:
+    """
+    Size-bounded LRU store of {key: (method, payload dict)}. One connection per thread, opened on
+    first use (never in a pre-fork master), WAL mode so gunicorn workers can share the file.
+    """
+
+    def __init__(self, path: str = EXTRACTION_CACHE_PATH, max_bytes: Optional[int] = None):
+        self.path = path
+        self.max_bytes = max_bytes or EXTRACTION_CACHE_MAX_MB * 1024 * 1024
+        self._local = threading.local()
+        self.counters: Counter = Counter()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """(method, payload) for a cached key, or None; a hit makes the entry most recently used"""
+        kind = key.split(":", 1)[0]
+        try:
+            conn = self._connection()
+            row = conn.execute("SELECT method, payload FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.counters[f"{kind}_misses"] += 1
+                return None
+            with conn:
+                conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.counters[f"{kind}_hits"] += 1
+            return row[0], json.loads(zlib.decompress(row[1]))
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            print(f"[ExtractionCache] Read failed for {key[:24]}...: {e}")
+            return None
+
+    def put(self, key: str, method: str, payload: Dict[str, Any]):
+        """Insert or replace an entry, then evict least-recently-used entries past the size limit"""
+        blob = zlib.compress(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+        if len(blob) > self.max_bytes // 4:
+            return  # one document must not flush most of the cache
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                             (key, method, blob, len(blob), time.time()))
+            self._evict(conn)
+        except sqlite3.Error as e:
+            print(f"[ExtractionCache] Write failed for {key[:24]}...: {e}")
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess, victims = total - int(self.max_bytes * EVICT_TO), []
+        for key, size in conn.execute("SELECT key, bytes FROM entries ORDER BY last_used"):
+            if excess <= 0:
+                break
+            victims.append((key,))
+            excess -= size
+        with conn:
+            conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self.counters["evictions"] += len(victims)
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            entries, size = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entries").fetchone()
+        except sqlite3.Error:
+            entries, size = None, None
+        return {"entries": entries, "bytes": size, "max_bytes": self.max_bytes, **self.counters}
+
+    def clear(self):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM entries")
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def open_extraction_cache() -> Optional[ExtractionCache]:
+    """The service's extraction cache, or None when EXTRACTION_CACHE=0"""
+    if os.getenv("EXTRACTION_CACHE", "1") != "1":
+        return None
+    return ExtractionCache(os.getenv("EXTRACTION_CACHE_PATH", EXTRACTION_CACHE_PATH))
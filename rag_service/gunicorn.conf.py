@@ -0,0 +1,37 @@
+"""
+Gunicorn configuration for multi-worker serving (Linux/macOS)
+
+    cd rag_service
+    gunicorn -c gunicorn.conf.py main:app
+
+The master preloads read-only assets (embedding model, language detector, mmap index) and freezes
+the GC before forking, so workers share those pages copy-on-write instead of loading N copies.
+Per-worker memory: GET /metrics/memory, or python ../scripts/report_worker_memory.py <master pid>.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = 300
+keepalive = 300
+preload_app = True
+
+# Each worker gets its own intra-op threads; N workers x all cores would oversubscribe the CPU
+os.environ.setdefault("OMP_NUM_THREADS", str(max(1, (os.cpu_count() or 1) // workers)))
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+# Workers follow the CURRENT snapshot pointer, since /admin/reload only reaches one worker
+os.environ.setdefault("INDEX_WATCH_INTERVAL", "10")
+
+
+def on_starting(server):
+    from dotenv import load_dotenv
+    import pathlib
+
+    load_dotenv(dotenv_path=pathlib.Path(__file__).parent.parent / ".env")
+
+    from shared_assets import load_shared_assets, freeze_for_fork
+
+    load_shared_assets()
+    freeze_for_fork()
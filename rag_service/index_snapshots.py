@@ -0,0 +1,162 @@
+"""
+Index Snapshot Module
+Versioned, immutable vector-index snapshots with an atomically updated CURRENT pointer
+
+Layout:
+    index_snapshots/
+        CURRENT                      - name of the active version (replaced atomically)
+        20260101-120000-ab12cd/      - one published snapshot (never modified after publish)
+            manifest.json
+            chroma_db/               - Chroma persistent directory (optional)
+            mmap_index/              - MmapVectorStore directory (optional)
+        .building-<version>/         - snapshot under construction (invisible to readers)
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_ROOT = os.getenv("INDEX_SNAPSHOT_DIR", os.path.join(BASE_DIR, "index_snapshots"))
+CURRENT_FILE = "CURRENT"
+BUILDING_PREFIX = ".building-"
+# Published snapshots kept before CURRENT by prune_snapshots() (rollback targets, workers not yet swapped)
+SNAPSHOT_RETENTION = int(os.getenv("INDEX_SNAPSHOT_RETENTION", "3"))
+
+
+def new_version() -> str:
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def snapshot_path(version: str) -> str:
+    return os.path.join(SNAPSHOT_ROOT, version)
+
+
+def begin_snapshot(base_version: Optional[str] = None, base_dir: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Start building a new snapshot off to the side
+
+    Args:
+        base_version: Copy this published snapshot as the starting point (incremental builds)
+        base_dir: Copy this raw index directory (e.g. the legacy chroma_db) into <build>/chroma_db instead
+
+    Returns:
+        (version, build_path)
+    """
+    version = new_version()
+    build_path = os.path.join(SNAPSHOT_ROOT, BUILDING_PREFIX + version)
+    os.makedirs(SNAPSHOT_ROOT, exist_ok=True)
+    if base_version:
+        shutil.copytree(snapshot_path(base_version), build_path, ignore=shutil.ignore_patterns("manifest.json"))
+    elif base_dir and os.path.isdir(base_dir):
+        shutil.copytree(base_dir, os.path.join(build_path, "chroma_db"))
+    else:
+        os.makedirs(build_path)
+    print(f"[IndexSnapshots] Building snapshot {version} in {build_path}")
+    return version, build_path
+
+
+def publish_snapshot(version: str, build_path: str, manifest: Optional[Dict[str, Any]] = None,
+                     activate: bool = True) -> str:
+    """Write the manifest, rename the build directory into place and optionally make it CURRENT"""
+    info = {
+        "version": version,
+        "created_at": datetime.now().isoformat(),
+        "backends": [b for b in ("chroma_db", "mmap_index") if os.path.isdir(os.path.join(build_path, b))],
+    }
+    info.update(manifest or {})
+    with open(os.path.join(build_path, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2)
+
+    final_path = snapshot_path(version)
+    os.rename(build_path, final_path)
+    print(f"[IndexSnapshots] Published snapshot {version}")
+    if activate:
+        set_current(version)
+    return final_path
+
+
+def abort_snapshot(build_path: str):
+    shutil.rmtree(build_path, ignore_errors=True)
+
+
+def set_current(version: str):
+    """Point CURRENT at `version` (write-then-rename, so readers see the old or new value, never a partial one)"""
+    if not os.path.isdir(snapshot_path(version)):
+        raise FileNotFoundError(f"Snapshot '{version}' does not exist")
+    tmp = os.path.join(SNAPSHOT_ROOT, f"{CURRENT_FILE}.{uuid.uuid4().hex}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(SNAPSHOT_ROOT, CURRENT_FILE))
+    print(f"[IndexSnapshots] CURRENT -> {version}")
+
+
+def current_version() -> Optional[str]:
+    """Pinned version (INDEX_SNAPSHOT env) or the CURRENT pointer; None when no snapshots exist"""
+    pinned = os.getenv("INDEX_SNAPSHOT")
+    if pinned:
+        return pinned
+    try:
+        with open(os.path.join(SNAPSHOT_ROOT, CURRENT_FILE), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def prune_snapshots(keep: Optional[int] = None, before: Optional[str] = None) -> List[str]:
+    """
+    Delete published snapshots older than CURRENT, keeping the `keep` most recent of them
+
+    Args:
+        keep: Snapshots kept before CURRENT (default INDEX_SNAPSHOT_RETENTION)
+        before: Only delete versions older than this one - pass the version CURRENT just replaced, which
+                workers that have not swapped yet (INDEX_WATCH_INTERVAL) may still be serving
+
+    CURRENT, a pinned INDEX_SNAPSHOT and snapshots newer than CURRENT (published without activating)
+    are never removed. Returns the deleted versions.
+    """
+    keep = SNAPSHOT_RETENTION if keep is None else keep
+    try:
+        with open(os.path.join(SNAPSHOT_ROOT, CURRENT_FILE), "r", encoding="utf-8") as f:
+            current = f.read().strip()
+    except FileNotFoundError:
+        return []
+    if not current:
+        return []
+    protected = {current, os.getenv("INDEX_SNAPSHOT")}
+    # Versions start with their build timestamp, so older builds sort first
+    older = sorted(name for name in os.listdir(SNAPSHOT_ROOT)
+                   if not name.startswith(".") and name < current and name not in protected
+                   and os.path.isdir(snapshot_path(name)))
+    removed = [version for version in older[:max(0, len(older) - keep)] if before is None or version < before]
+    for version in removed:
+        shutil.rmtree(snapshot_path(version), ignore_errors=True)
+    if removed:
+        print(f"[IndexSnapshots] Pruned {len(removed)} snapshot(s) older than {before or current}")
+    return removed
+
+
+def snapshot_embedding_model(version: str) -> Optional[str]:
+    """Embedding model a snapshot's manifest records (migrations record one); None if unknown"""
+    try:
+        return (read_manifest(version).get("embedding") or {}).get("model")
+    except (OSError, ValueError):
+        return None
+
+
+def list_snapshots() -> List[Dict[str, Any]]:
+    if not os.path.isdir(SNAPSHOT_ROOT):
+        return []
+    manifests = []
+    for name in sorted(os.listdir(SNAPSHOT_ROOT)):
+        if name.startswith(".") or not os.path.isdir(snapshot_path(name)):
+            continue
+        try:
+            manifests.append(read_manifest(name))
+        except (OSError, ValueError):
+            continue
+    return manifests
@@ -0,0 +1,544 @@
+"""
+Ingestion Module
+Pluggable document sources and incremental, content-hash based synchronisation into the vector store:
+unchanged documents are skipped, changed/new ones are embedded and upserted in bounded batches,
+and documents a source no longer produces are deleted. Sources stream their JSON / NDJSON files
+record by record, so peak memory depends on the batch size, not on corpus size.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+from typing import Iterator, List, Dict, Any, Optional, Tuple
+
+from embedding_pipeline import InlineEmbedder, PipelineStats
+
+SERVICE_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SERVICE_DIR)
+DATA_DIR = os.path.join(SERVICE_DIR, "data")
+RAW_DATA_DIR = os.path.join(BASE_DIR, "datasets resources")
+
+DEFAULT_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "256"))
+# Child chunk size for hierarchical (parent/child) sources: small enough to match precisely
+CHILD_CHUNK_TOKENS = int(os.getenv("CHILD_CHUNK_TOKENS", "128"))
+SCAN_PAGE_SIZE = 5000
+# Read-ahead for incremental JSON parsing
+STREAM_CHUNK_SIZE = 1 << 16
+
+# (id, text, metadata)
+Document = Tuple[str, str, Dict[str, Any]]
+
+
+def content_hash(text: str, metadata: Dict[str, Any]) -> str:
+    """Hash of everything that ends up in the store for a document"""
+    payload = text + "\0" + json.dumps(metadata, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def stable_id(prefix: str, key: str, text: str) -> str:
+    """
+    Deterministic document id: source prefix + readable key (section / title) + hash of the text.
+    Independent of input order, so reordering a dataset re-embeds nothing; an edited document
+    gets a new id and its old one is tombstoned.
+    """
+    slug = re.sub(r'[^a-z0-9]+', '_', key.lower()).strip('_')[:48] or "doc"
+    return f"{prefix}_{slug}_{hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]}"
+
+
+def iter_json_records(path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Records of a JSON array file (or NDJSON / JSON Lines file), parsed incrementally
+
+    Only the current record and one read-ahead chunk are held in memory, so corpus size does not
+    change peak memory the way json.load does.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith((".ndjson", ".jsonl")):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        decoder = json.JSONDecoder()
+        buffer, pos, eof = "", 0, False
+
+        def more(size: int) -> bool:
+            nonlocal buffer, pos, eof
+            data = f.read(size)
+            if not data:
+                eof = True
+                return False
+            buffer = buffer[pos:] + data
+            pos = 0
+            return True
+
+        def next_token() -> str:
+            """Skip whitespace (and separators between records); '' at end of file"""
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+                if pos < len(buffer):
+                    return buffer[pos]
+                if not more(chunk_size):
+                    return ""
+
+        if next_token() != "[":
+            raise ValueError(f"{path}: expected a JSON array of records")
+        pos += 1
+        while True:
+            token = next_token()
+            if token == "]":
+                return
+            if not token:
+                raise ValueError(f"{path}: unterminated JSON array")
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError(f"{path}: malformed or truncated record")
+                # Record spans the chunk boundary: grow the buffer geometrically so a huge record
+                # is re-parsed O(log n) times rather than once per chunk
+                more(max(chunk_size, len(buffer)))
+                continue
+            if end == len(buffer) and not eof:
+                # A bare number cut off at the chunk boundary decodes "successfully"
+                more(chunk_size)
+                continue
+            yield record
+            pos = end
+
+
+class DocumentSource:
+    """A named producer of documents. Subclasses implement documents()."""
+
+    name = "base"
+    # Ids written before documents were tagged with their source (used to adopt legacy entries)
+    id_prefixes: Tuple[str, ...] = ()
+    # Near-duplicate elimination (see dedup.py). Off by default: statute sections are distinct
+    # citation targets even when their wording is almost identical.
+    deduplicate = False
+    # Metadata fields collected from near-duplicates onto the document that is kept
+    merge_fields: Tuple[str, ...] = ()
+    # Yields child chunks (parent_id / position metadata) that are mirrored into the doc store
+    hierarchical = False
+
+    def available(self) -> bool:
+        return True
+
+    def dedup_text(self, text: str, metadata: Dict[str, Any]) -> str:
+        """Part of a document compared for near-duplicate detection"""
+        return text
+
+    def documents(self) -> Iterator[Document]:
+        raise NotImplementedError
+
+
+class StatuteMappingSource(DocumentSource):
+    """BNS sections and their IPC counterparts from ipc_bns_mapping.json"""
+
+    name = "statutes"
+    id_prefixes = ("statute_",)
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(DATA_DIR, "ipc_bns_mapping.json")
+
+    def available(self) -> bool:
+        return os.path.exists(self.path)
+
+    def documents(self) -> Iterator[Document]:
+        for item in iter_json_records(self.path):
+            topic = item.get("topic", "")
+            # BNS document (kept separate for citation accuracy)
+            text = f"Statute: Bharatiya Nyaya Sanhita (BNS) Section {item['bns']}. Topic: {topic}. Description: {item.get('text_bns', '')}"
+            yield (
+                stable_id("statute_bns", str(item["bns"]), text),
+                text,
+                {"type": "statute", "source": "Bharatiya Nyaya Sanhita, 2023", "law": "BNS",
+                 "bns_section": item.get("bns", ""), "topic": topic},
+            )
+            # IPC document (only if mapping exists)
+            if item.get("ipc"):
+                text = f"Statute: Indian Penal Code (IPC) Section {item['ipc']}. Topic: {topic}. Description: {item.get('text_ipc', '') or ''}"
+                yield (
+                    stable_id("statute_ipc", str(item["ipc"]), text),
+                    text,
+                    {"type": "statute", "source": "Indian Penal Code, 1860", "law": "IPC",
+                     "ipc_section": item.get("ipc", ""), "topic": topic},
+                )
+
+
+class GoldenJudgmentSource(DocumentSource):
+    """Supreme Court case laws from golden_dataset.json (grouped by topic)"""
+
+    name = "judgments"
+    id_prefixes = ("judgment_",)
+    deduplicate = True
+    merge_fields = ("title",)
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(DATA_DIR, "golden_dataset.json")
+
+    def available(self) -> bool:
+        return os.path.exists(self.path)
+
+    def documents(self) -> Iterator[Document]:
+        for topic_item in iter_json_records(self.path):
+            topic_keywords = ", ".join(topic_item.get("keywords", []))
+            for case in topic_item.get("case_laws", []):
+                title = case.get("title", "Unknown Case")
+                text = f"Case Judgment: {title}. Topic Keywords: {topic_keywords}. Legal Summary: {case.get('summary', '')}"
+                yield (
+                    stable_id("judgment", title, text),
+                    text,
+                    {"type": "judgment", "source": "Supreme Court", "title": title,
+                     "case_id": title.replace(" ", "_")[:20], "keywords": topic_keywords},
+                )
+
+    def dedup_text(self, text: str, metadata: Dict[str, Any]) -> str:
+        # Title and file-name keywords identify a case; the summary is what it says about the law
+        return text.split("Legal Summary: ", 1)[-1]
+
+
+class ActTextSource(DocumentSource):
+    """
+    Raw act text (it.txt / ipc.txt) split on section headings into token-bounded chunks
+    (see chunking.py), each carrying its section number, title and chapter
+    """
+
+    def __init__(self, name: str, path: str, act_title: str, source_label: str, topic: str,
+                 style: str = "gazette", max_tokens: Optional[int] = None):
+        self.name = name
+        self.id_prefixes = (f"{name}_",)
+        self.path = path
+        self.act_title = act_title
+        self.source_label = source_label
+        self.topic = topic
+        self.style = style
+        self.max_tokens = max_tokens
+
+    def available(self) -> bool:
+        return os.path.exists(self.path)
+
+    def documents(self) -> Iterator[Document]:
+        from chunking import chunk_act, load_token_counter, model_token_limit
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        count_tokens = load_token_counter()
+        for chunk in chunk_act(text, self.act_title, count_tokens, self.max_tokens or model_token_limit(), self.style):
+            metadata = {"type": "statute", "source": self.source_label, "topic": self.topic,
+                        "part": chunk["part"], "parts": chunk["parts"]}
+            # Chroma metadata values cannot be None
+            for key in ("section", "section_title", "chapter"):
+                if chunk[key]:
+                    metadata[key] = chunk[key]
+            # Section numbers repeat as headings in the raw text (ipc.txt has two 122s and 140s): the
+            # text hash keeps those chunks apart
+            key = f"{chunk['section'] or 'text'} {chunk['part']}"
+            yield stable_id(self.name, key, chunk["document"]), chunk["document"], metadata
+
+
+class JudgmentTextSource(DocumentSource):
+    """
+    Full judgment texts (kaggle_cases.ndjson records with "text", from ingest_kaggle_data.py --full-text)
+    as small child chunks linked to their parent judgment by parent_id / position. The ingestor mirrors
+    the chunks into the doc store (doc_store.py), which assembles a matched chunk's neighbourhood at query time.
+    """
+
+    name = "judgment_texts"
+    id_prefixes = ("judgment_text_",)
+    hierarchical = True
+
+    def __init__(self, path: Optional[str] = None, chunk_tokens: Optional[int] = None):
+        self.path = path or os.path.join(DATA_DIR, "kaggle_cases.ndjson")
+        self.chunk_tokens = chunk_tokens or CHILD_CHUNK_TOKENS
+
+    def available(self) -> bool:
+        return os.path.exists(self.path)
+
+    def documents(self) -> Iterator[Document]:
+        from chunking import load_token_counter, pack_sentences
+
+        count_tokens = load_token_counter()
+        for record in iter_json_records(self.path):
+            if not record.get("text"):
+                continue
+            entry = record["entry"]
+            title = entry["case_laws"][0]["title"]
+            parent_id = f"judgment_text_{hashlib.sha1(record['path'].encode('utf-8')).hexdigest()[:12]}"
+            pieces = pack_sentences(re.sub(r'\s+', ' ', record["text"]).strip(), self.chunk_tokens, count_tokens)
+            for position, piece in enumerate(pieces):
+                yield (
+                    f"{parent_id}_{position}",
+                    piece,
+                    {"type": "judgment", "source": "Supreme Court", "title": title,
+                     "case_id": title.replace(" ", "_")[:20], "topic": (entry.get("keywords") or [""])[0],
+                     "parent_id": parent_id, "position": position, "parts": len(pieces),
+                     "tokens": count_tokens(piece)},
+                )
+
+
+def act_domain(act_name: str) -> str:
+    """Map act to domain"""
+    if "IPC" in act_name or "BNS" in act_name:
+        return "Criminal Law"
+    elif "IT Act" in act_name or "Information Technology" in act_name:
+        return "IT & Cyber Law"
+    elif "Companies Act" in act_name:
+        return "Corporate Law"
+    elif "Consumer Protection" in act_name:
+        return "Consumer Law"
+    elif "Motor Vehicles" in act_name:
+        return "Transport Law"
+    return "General Law"
+
+
+class MultiDomainSource(DocumentSource):
+    """IT Act, Companies Act, Consumer Protection Act, Motor Vehicles Act sections (multi_domain_acts.json)"""
+
+    name = "multi_domain"
+    id_prefixes = ("multi_domain_",)
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(DATA_DIR, "multi_domain_acts.json")
+
+    def available(self) -> bool:
+        return os.path.exists(self.path)
+
+    def documents(self) -> Iterator[Document]:
+        for section in iter_json_records(self.path):
+            text = f"{section['act']} {section['section']}: {section['title']}. {section['description']}"
+            yield (
+                stable_id("multi_domain", f"{section['act']} {section['section']}", text),
+                text,
+                {"type": "statute", "act": section['act'], "section": section['section'],
+                 "title": section['title'], "domain": act_domain(section['act'])},
+            )
+
+
+class ComprehensiveSource(DocumentSource):
+    """Additional multi-domain sections with explicit domains (comprehensive_multi_domain.json)"""
+
+    name = "comprehensive"
+    id_prefixes = ("comprehensive_",)
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(DATA_DIR, "comprehensive_multi_domain.json")
+
+    def available(self) -> bool:
+        return os.path.exists(self.path)
+
+    def documents(self) -> Iterator[Document]:
+        for section in iter_json_records(self.path):
+            text = f"{section['act']} - {section['section']}: {section['title']}. {section['description']} Domain: {section['domain']}"
+            yield (
+                stable_id("comprehensive", f"{section['act']} {section['section']}", text),
+                text,
+                {"type": "statute", "act": section['act'], "section_number": section['section'],
+                 "title": section['title'], "domain": section['domain'],
+                 "description": section['description'][:200]},
+            )
+
+
+SOURCES = {
+    "statutes": StatuteMappingSource,
+    "judgments": GoldenJudgmentSource,
+    "it_act": lambda: ActTextSource("it_act", os.path.join(RAW_DATA_DIR, "it.txt"),
+                                    "Information Technology Act, 2000", "IT Act 2000", "Cyber Law"),
+    "ipc_text": lambda: ActTextSource("ipc_text", os.path.join(RAW_DATA_DIR, "ipc.txt"),
+                                      "Indian Penal Code, 1860", "Indian Penal Code, 1860", "Criminal Law",
+                                      style="record"),
+    "judgment_texts": JudgmentTextSource,
+    "multi_domain": MultiDomainSource,
+    "comprehensive": ComprehensiveSource,
+}
+# What ingest_vector.py has always indexed
+DEFAULT_SOURCES = ("statutes", "judgments", "it_act")
+
+
+def get_sources(names: Optional[List[str]] = None) -> List[DocumentSource]:
+    """Instantiate sources by name (default: DEFAULT_SOURCES)"""
+    sources = []
+    for name in names or DEFAULT_SOURCES:
+        if name not in SOURCES:
+            raise ValueError(f"Unknown source '{name}'. Expected one of {', '.join(SOURCES)}")
+        sources.append(SOURCES[name]())
+    return sources
+
+
+class IncrementalIngestor:
+    """
+    Synchronises sources into a Chroma collection (plus optional per-type shard collections and a
+    doc store for parent/child chunks).
+
+    Every stored document carries `ingest_source` and `content_hash` metadata. A run re-embeds only
+    documents whose hash changed, deletes (and tombstones) ids the source stopped producing, and
+    writes in batches of `batch_size` so memory and request sizes stay bounded.
+    """
+
+    def __init__(self, collection, provider, batch_size: Optional[int] = None,
+                 shard_collections: Optional[Dict[str, Any]] = None, doc_store=None, tombstones=None):
+        """
+        Args:
+            collection: Target collection
+            provider: EmbeddingProvider, or an embedding stage with embed_batches()
+                      (e.g. embedding_pipeline.ParallelEmbedder) used for changed documents
+            batch_size: Documents per embed + upsert call
+            shard_collections: shard name -> collection, kept in step with the main collection
+            doc_store: DocStore receiving every document with a parent_id (child chunks)
+            tombstones: compaction.TombstoneLog recording every deleted id until the index is compacted
+        """
+        self.collection = collection
+        self.embedder = provider if hasattr(provider, "embed_batches") else InlineEmbedder(provider)
+        self.batch_size = batch_size or DEFAULT_BATCH_SIZE
+        self.shard_collections = shard_collections or {}
+        self.doc_store = doc_store
+        self.tombstones = tombstones
+        self._stored_chunks: Optional[set] = None
+        # Cumulative read / embed / write timings across every source this ingestor runs
+        self.pipeline_stats = PipelineStats()
+        self._existing: Optional[Dict[str, Tuple[Optional[str], Optional[str]]]] = None
+
+    def _scan_existing(self) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """id -> (ingest_source, content_hash) for everything already stored"""
+        if self._existing is None:
+            existing = {}
+            total = self.collection.count()
+            for offset in range(0, total, SCAN_PAGE_SIZE):
+                page = self.collection.get(include=["metadatas"], limit=SCAN_PAGE_SIZE, offset=offset)
+                for doc_id, meta in zip(page["ids"], page["metadatas"]):
+                    meta = meta or {}
+                    existing[doc_id] = (meta.get("ingest_source"), meta.get("content_hash"))
+            self._existing = existing
+        return self._existing
+
+    def _owned_ids(self, source: DocumentSource) -> Dict[str, Optional[str]]:
+        """Stored ids belonging to a source (tagged, or untagged legacy ids with its prefix) -> hash"""
+        owned = {}
+        for doc_id, (owner, digest) in self._scan_existing().items():
+            if owner == source.name or (owner is None and doc_id.startswith(source.id_prefixes or ("\0",))):
+                owned[doc_id] = digest
+        return owned
+
+    def _missing_from_doc_store(self, doc_id: str, metadata: Dict[str, Any]) -> bool:
+        """Child chunks without doc store rows (e.g. the store is new to this index) are rewritten even if unchanged"""
+        if self.doc_store is None or "parent_id" not in metadata:
+            return False
+        if self._stored_chunks is None:
+            self._stored_chunks = self.doc_store.chunk_ids()
+        return doc_id not in self._stored_chunks
+
+    def _write(self, batch: List[Document], vectors):
+        from retrieval import shard_for
+
+        ids = [doc_id for doc_id, _, _ in batch]
+        texts = [text for _, text, _ in batch]
+        metadatas = [meta for _, _, meta in batch]
+        embeddings = vectors.tolist()
+        self.collection.upsert(ids=ids, documents=texts, metadatas=metadatas, embeddings=embeddings)
+
+        routed: Dict[str, List[int]] = {}
+        for i, meta in enumerate(metadatas):
+            routed.setdefault(shard_for(meta), []).append(i)
+        for shard, rows in routed.items():
+            if shard in self.shard_collections:
+                self.shard_collections[shard].upsert(
+                    ids=[ids[i] for i in rows],
+                    documents=[texts[i] for i in rows],
+                    metadatas=[metadatas[i] for i in rows],
+                    embeddings=[embeddings[i] for i in rows],
+                )
+        if self.doc_store is not None:
+            self.doc_store.put_chunks(doc for doc in batch if "parent_id" in doc[2])
+
+    def _delete(self, ids: List[str]):
+        for start in range(0, len(ids), self.batch_size):
+            chunk = ids[start:start + self.batch_size]
+            self.collection.delete(ids=chunk)
+            for shard_collection in self.shard_collections.values():
+                shard_collection.delete(ids=chunk)
+            if self.doc_store is not None:
+                self.doc_store.delete_chunks(chunk)
+
+    def ingest(self, source: DocumentSource, full: bool = False, dry_run: bool = False,
+               prune: bool = True) -> Dict[str, Any]:
+        """
+        Synchronise one source
+
+        Args:
+            source: Document source
+            full: Re-embed every document even if its hash is unchanged
+            dry_run: Count what would change without writing
+            prune: Delete stored ids the source did not produce (off when the source is a partial
+                   update, e.g. a batch of live submissions)
+
+        Returns:
+            Counters: seen, unchanged, upserted, deleted, duplicates, collisions, seconds, docs_per_sec
+        """
+        start = time.perf_counter()
+        owned = self._owned_ids(source)
+        stats = {"source": source.name, "seen": 0, "unchanged": 0, "upserted": 0, "deleted": 0, "duplicates": 0,
+                 "collisions": 0}
+        seen_ids: Dict[str, str] = {}
+
+        def changed_batches() -> Iterator[List[Document]]:
+            """Parse + hash stage. Time spent downstream while suspended at yield is not counted."""
+            batch: List[Document] = []
+            resumed = time.perf_counter()
+            for doc_id, text, metadata in source.documents():
+                digest = content_hash(text, metadata)
+                if doc_id in seen_ids:
+                    stats["duplicates"] += 1
+                    if seen_ids[doc_id] != digest:
+                        # Same id, different document: only the first can be stored
+                        stats["collisions"] += 1
+                        print(f"   ⚠️ {source.name}: id collision on {doc_id}, later document not indexed")
+                    continue
+                seen_ids[doc_id] = digest
+                stats["seen"] += 1
+
+                if not full and owned.get(doc_id) == digest and not self._missing_from_doc_store(doc_id, metadata):
+                    stats["unchanged"] += 1
+                    continue
+                batch.append((doc_id, text, {**metadata, "ingest_source": source.name, "content_hash": digest}))
+                if len(batch) >= self.batch_size:
+                    self.pipeline_stats.add("read", time.perf_counter() - resumed, len(batch))
+                    yield batch
+                    batch = []
+                    resumed = time.perf_counter()
+            self.pipeline_stats.add("read", time.perf_counter() - resumed, len(batch))
+            if batch:
+                yield batch
+
+        if dry_run:
+            for batch in changed_batches():
+                stats["upserted"] += len(batch)
+        else:
+            for batch, vectors in self.embedder.embed_batches(changed_batches(), self.pipeline_stats):
+                write_start = time.perf_counter()
+                self._write(batch, vectors)
+                self.pipeline_stats.add("write", time.perf_counter() - write_start, len(batch))
+                stats["upserted"] += len(batch)
+                # Later ingest() calls on this ingestor (e.g. the next live batch) see what was just written
+                existing = self._scan_existing()
+                for doc_id, _, meta in batch:
+                    existing[doc_id] = (source.name, meta["content_hash"])
+
+        removed = [doc_id for doc_id in owned if doc_id not in seen_ids] if prune else []
+        if removed and not dry_run:
+            self._delete(removed)
+            if self.tombstones is not None:
+                self.tombstones.record(removed, source.name, owned)
+        stats["deleted"] = len(removed)
+
+        if not dry_run:
+            for doc_id in removed:
+                self._scan_existing().pop(doc_id, None)
+
+        elapsed = time.perf_counter() - start
+        stats["seconds"] = round(elapsed, 3)
+        stats["docs_per_sec"] = round(stats["seen"] / max(elapsed, 1e-9), 1)
+        return stats
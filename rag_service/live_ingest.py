@@ -0,0 +1,593 @@
+"""
+Live Ingestion Module
+Documents submitted to the running service (POST /ingest, POST /ingest/bulk) instead of edited into the
+JSON datasets and ingested offline.
+
+Submissions are validated record by record and spooled to disk as a job; a background worker embeds
+them in batches into a working copy of CURRENT. Every job queued within one commit window
+(LIVE_INGEST_COMMIT_INTERVAL seconds, up to LIVE_INGEST_COMMIT_MAX_DOCS documents) goes into the same
+copy, which is published as one snapshot: the derived mmap / quantized / corpus indexes are built, the
+engine is swapped to it, and only then does CURRENT move and are old snapshots pruned
+(index_snapshots.prune_snapshots). Queries keep being served from the previous snapshot until the swap,
+so a window becomes visible all at once or not at all. Job status lives in files next to the snapshots,
+so any worker process can report it, and a file lock serialises snapshot builds across processes.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import queue
+import shutil
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from ingestion import Document, DocumentSource, IncrementalIngestor, stable_id
+from index_snapshots import (SNAPSHOT_ROOT, abort_snapshot, begin_snapshot, current_version, prune_snapshots,
+                             publish_snapshot, set_current, snapshot_path)
+
+LIVE_SOURCE = "live"
+LIVE_BATCH_SIZE = int(os.getenv("LIVE_INGEST_BATCH_SIZE", "256"))
+# >1 embeds in a process pool (embedding_pipeline.ParallelEmbedder); 1 reuses the engine's model in a thread
+LIVE_WORKERS = int(os.getenv("LIVE_INGEST_WORKERS", "1"))
+# Jobs queued this many seconds after the first one of a window are published in the same snapshot
+LIVE_COMMIT_INTERVAL = float(os.getenv("LIVE_INGEST_COMMIT_INTERVAL", "5"))
+LIVE_COMMIT_MAX_DOCS = int(os.getenv("LIVE_INGEST_COMMIT_MAX_DOCS", "50000"))
+JOBS_DIR = os.getenv("LIVE_INGEST_JOBS_DIR", os.path.join(SNAPSHOT_ROOT, ".ingest-jobs"))
+LOCK_FILE = os.path.join(SNAPSHOT_ROOT, ".ingest.lock")
+
+DOCUMENT_TYPES = ("statute", "judgment")
+MAX_TEXT_CHARS = 50000
+# Set by the ingestor / doc store, never by submitters
+RESERVED_KEYS = ("ingest_source", "content_hash", "parent_id", "position")
+ID_PATTERN = re.compile(r'^[A-Za-z0-9_.:-]{1,200}$')
+# Rejected records reported back per job
+MAX_REPORTED_ERRORS = 50
+
+
+def validate_record(record: Any) -> Document:
+    """
+    One submitted record -> (id, text, metadata)
+
+    A record is {"type": "statute"|"judgment", "text": ..., optional "id", and flat metadata such as
+    title, act, section, source, topic}. Without an id one is derived from the type, title/section
+    and text (ingestion.stable_id), so resubmitting the same document is a no-op.
+
+    Raises:
+        ValueError: describing the first problem found
+    """
+    if not isinstance(record, dict):
+        raise ValueError("record must be a JSON object")
+    text = record.get("text")
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError("'text' must be a non-empty string")
+    text = text.strip()
+    if len(text) > MAX_TEXT_CHARS:
+        raise ValueError(f"'text' is longer than {MAX_TEXT_CHARS} characters; split it into sections")
+    if record.get("type") not in DOCUMENT_TYPES:
+        raise ValueError(f"'type' must be one of {', '.join(DOCUMENT_TYPES)}")
+
+    metadata = {}
+    for key, value in record.items():
+        if key in ("id", "text") or value is None:
+            continue
+        if key in RESERVED_KEYS:
+            raise ValueError(f"'{key}' is reserved")
+        if isinstance(value, list) and all(isinstance(v, str) for v in value):
+            value = ", ".join(value)
+        if not isinstance(value, (str, int, float, bool)):
+            raise ValueError(f"'{key}' must be a string, number, boolean or list of strings")
+        metadata[key] = value
+
+    doc_id = record.get("id")
+    if doc_id is None:
+        key = str(metadata.get("title") or metadata.get("section") or metadata.get("act") or "")
+        doc_id = stable_id(f"live_{metadata['type']}", key, text)
+    elif not isinstance(doc_id, str) or not ID_PATTERN.match(doc_id):
+        raise ValueError("'id' must be 1-200 characters of letters, digits, '_', '.', ':' or '-'")
+    return doc_id, text, metadata
+
+
+class BatchSource(DocumentSource):
+    """One committed batch of live documents"""
+
+    name = LIVE_SOURCE
+
+    def __init__(self, documents: List[Document]):
+        self.batch = documents
+
+    def documents(self) -> Iterator[Document]:
+        return iter(self.batch)
+
+
+class JobStore:
+    """
+    Job status files (<job_id>.json, replaced atomically), spooled documents (<job_id>.ndjson) and claim
+    locks (<job_id>.lock, held by the process that has the job queued or running)
+    """
+
+    def __init__(self, path: str = JOBS_DIR):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def status_path(self, job_id: str) -> str:
+        return os.path.join(self.path, f"{job_id}.json")
+
+    def spool_path(self, job_id: str) -> str:
+        return os.path.join(self.path, f"{job_id}.ndjson")
+
+    def lock_path(self, job_id: str) -> str:
+        return os.path.join(self.path, f"{job_id}.lock")
+
+    def save(self, status: Dict[str, Any]):
+        status["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        tmp = f"{self.status_path(status['job_id'])}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(status, f, indent=2)
+        os.replace(tmp, self.status_path(status["job_id"]))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        if not re.match(r'^[0-9a-f]{32}$', job_id or ""):
+            return None
+        try:
+            with open(self.status_path(job_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        """Status of every job still queued or running according to its file"""
+        statuses = []
+        for name in sorted(os.listdir(self.path)):
+            if name.endswith(".json"):
+                status = self.get(name[:-len(".json")])
+                if status and status.get("state") in ("queued", "running"):
+                    statuses.append(status)
+        return statuses
+
+
+class JobWriter:
+    """Validates records as they arrive and spools the accepted ones, so a bulk upload is never held in memory"""
+
+    def __init__(self, store: JobStore, batch_size: int = LIVE_BATCH_SIZE):
+        self.store = store
+        self.batch_size = batch_size
+        self.status = {
+            "job_id": uuid.uuid4().hex, "state": "receiving", "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "accepted": 0, "rejected": 0, "errors": [], "batches": 0, "batches_committed": 0,
+            "upserted": 0, "unchanged": 0, "index_version": None, "error": None,
+        }
+        self._spool = open(store.spool_path(self.status["job_id"]), "w", encoding="utf-8")
+
+    @property
+    def job_id(self) -> str:
+        return self.status["job_id"]
+
+    def add(self, record: Any, line: int):
+        try:
+            document = validate_record(record)
+        except ValueError as e:
+            self.reject(line, str(e))
+            return
+        self._spool.write(json.dumps(document, ensure_ascii=False) + "\n")
+        self.status["accepted"] += 1
+
+    def reject(self, line: int, error: str):
+        self.status["rejected"] += 1
+        if len(self.status["errors"]) < MAX_REPORTED_ERRORS:
+            self.status["errors"].append({"record": line, "error": error})
+
+    def close(self) -> Dict[str, Any]:
+        self._spool.close()
+        accepted = self.status["accepted"]
+        self.status["batches"] = (accepted + self.batch_size - 1) // self.batch_size
+        self.status["state"] = "queued" if accepted else "rejected"
+        if not accepted:
+            os.remove(self.store.spool_path(self.job_id))
+        self.store.save(self.status)
+        return self.status
+
+
+class FileLock:
+    """Exclusive lock on a file shared by every worker process (fcntl on Unix, msvcrt on Windows)"""
+
+    def __init__(self, path: str = LOCK_FILE):
+        self.path = path
+        self._file = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """Take the lock; with blocking=False return False straight away if another holder has it"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, "a+")
+        try:
+            if os.name == "nt":
+                import msvcrt
+                self._file.seek(0)
+                while True:
+                    try:
+                        # LK_LOCK gives up after ~10 seconds; keep waiting like flock does
+                        msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+                        return True
+                    except OSError:
+                        if not blocking:
+                            raise
+            else:
+                import fcntl
+                fcntl.flock(self._file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+        except OSError:
+            self._file.close()
+            self._file = None
+            if blocking:
+                raise
+            return False
+
+    def release(self):
+        if self._file is None:
+            return
+        if os.name == "nt":
+            import msvcrt
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        # Closing also drops a flock
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class LiveIngestor:
+    """
+    Background worker committing queued jobs one commit window at a time.
+
+    `builder()` opens the working index of a window: an object with write(batch) -> stats,
+    publish() -> index version (None when nothing changed) and abort(). The default is a SnapshotBuilder
+    over CURRENT that swaps `engine` to the published snapshot. A job's batches are counted in
+    "batches_committed" as they are written; "index_version" is set when its window is published.
+    Each queued job is claimed through its lock file (JobStore.lock_path) until it finishes, so
+    recover() in another process can tell jobs whose owner died from jobs still in progress.
+    """
+
+    def __init__(self, engine=None, builder: Optional[Callable[[], Any]] = None,
+                 jobs_dir: Optional[str] = None, batch_size: Optional[int] = None,
+                 commit_interval: Optional[float] = None, max_commit_docs: Optional[int] = None):
+        self.engine = engine
+        self.builder = builder or self._snapshot_builder
+        self.jobs = JobStore(jobs_dir or JOBS_DIR)
+        self.batch_size = batch_size or LIVE_BATCH_SIZE
+        self.commit_interval = LIVE_COMMIT_INTERVAL if commit_interval is None else commit_interval
+        self.max_commit_docs = max_commit_docs or LIVE_COMMIT_MAX_DOCS
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._embedder = None
+        self._owns_embedder = False
+        self._lock = threading.Lock()
+        self._claims: Dict[str, FileLock] = {}
+
+    # ------------------------------------------------------------------ submission
+
+    def new_job(self) -> JobWriter:
+        return JobWriter(self.jobs, self.batch_size)
+
+    def enqueue(self, writer: JobWriter) -> Dict[str, Any]:
+        # Claimed before it is marked queued, so recover() elsewhere never takes it for an orphan
+        self._claim(writer.job_id)
+        status = writer.close()
+        if status["state"] == "queued":
+            self._ensure_started()
+            self._queue.put(writer.job_id)
+        else:
+            self._release(writer.job_id)
+        return status
+
+    def submit(self, records: Iterable[Any]) -> Dict[str, Any]:
+        writer = self.new_job()
+        for line, record in enumerate(records, 1):
+            writer.add(record, line)
+        return self.enqueue(writer)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.jobs.get(job_id)
+
+    def recover(self) -> List[str]:
+        """
+        Re-queue jobs left queued or running by a worker process that died or restarted (called at startup).
+        Only jobs whose claim lock is free are taken, so jobs of live processes are left alone and each
+        orphan is picked up by one process. Re-running a partly written job is safe: unchanged documents
+        are skipped by their content hash. Returns the re-queued job ids.
+        """
+        recovered = []
+        for status in self.jobs.unfinished():
+            job_id = status["job_id"]
+            if job_id in self._claims or not self._claim(job_id, blocking=False):
+                continue
+            # Re-read under the claim: the owner may have finished between the scan and the lock
+            status = self.jobs.get(job_id)
+            if (not status or status["state"] not in ("queued", "running")
+                    or not os.path.exists(self.jobs.spool_path(job_id))):
+                self._release(job_id)
+                continue
+            status.update(state="queued", batches_committed=0, upserted=0, unchanged=0)
+            self.jobs.save(status)
+            recovered.append(job_id)
+        if recovered:
+            print(f"[LiveIngest] Re-queued {len(recovered)} unfinished job(s) from a previous worker process")
+            self._ensure_started()
+            for job_id in recovered:
+                self._queue.put(job_id)
+        return recovered
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued job is processed (tests, scripts); False on timeout"""
+        deadline = time.monotonic() + timeout if timeout else None
+        while self._queue.unfinished_tasks:
+            if deadline and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    # ------------------------------------------------------------------ worker
+
+    def _claim(self, job_id: str, blocking: bool = True) -> bool:
+        lock = FileLock(self.jobs.lock_path(job_id))
+        if not lock.acquire(blocking=blocking):
+            return False
+        self._claims[job_id] = lock
+        return True
+
+    def _release(self, job_id: str):
+        lock = self._claims.pop(job_id, None)
+        if lock is not None:
+            lock.release()
+            try:
+                os.remove(lock.path)
+            except OSError:
+                pass
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="live-ingest", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            job_ids = [self._queue.get()]
+            try:
+                self._commit_window(job_ids)
+            finally:
+                for _ in job_ids:
+                    self._queue.task_done()
+
+    def _batches(self, job_id: str) -> Iterator[List[Document]]:
+        batch: List[Document] = []
+        with open(self.jobs.spool_path(job_id), "r", encoding="utf-8") as f:
+            for line in f:
+                doc_id, text, metadata = json.loads(line)
+                batch.append((doc_id, text, metadata))
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    def _commit_window(self, job_ids: List[str]):
+        """
+        Write `job_ids` and every job queued before the window closes into one working index, then publish
+        it once. The window closes commit_interval seconds after it opened, or earlier once max_commit_docs
+        documents are written; a job is never split across windows. Ids taken from the queue are appended
+        to `job_ids`.
+        """
+        closes = time.monotonic() + self.commit_interval
+        statuses: List[Dict[str, Any]] = []
+        builder = None
+        written = 0
+        taken = 0
+        try:
+            while taken < len(job_ids):
+                job_id = job_ids[taken]
+                taken += 1
+                status = self.jobs.get(job_id)
+                if status is None:
+                    # No readable status file to report progress to; the spool is left for inspection
+                    print(f"[LiveIngest] Job {job_id} has no readable status; skipped")
+                else:
+                    status["state"] = "running"
+                    self.jobs.save(status)
+                    statuses.append(status)
+                    for batch in self._batches(job_id):
+                        builder = builder or self.builder()
+                        result = builder.write(batch)
+                        written += len(batch)
+                        status["batches_committed"] += 1
+                        status["upserted"] += result.get("upserted", 0)
+                        status["unchanged"] += result.get("unchanged", 0)
+                        self.jobs.save(status)
+                if taken == len(job_ids) and written < self.max_commit_docs:
+                    try:
+                        job_ids.append(self._queue.get(timeout=max(0.0, closes - time.monotonic())))
+                    except queue.Empty:
+                        pass
+            version = builder.publish() if builder else None
+        except Exception as e:
+            if builder:
+                builder.abort()
+            # Nothing from this window was published; the spools are kept for inspection
+            print(f"[LiveIngest] Commit of {len(statuses)} job(s) failed: {e}")
+            for status in statuses:
+                status.update(state="failed", error=str(e))
+                self.jobs.save(status)
+        else:
+            for status in statuses:
+                status["state"] = "done"
+                status["index_version"] = version or status["index_version"]
+                os.remove(self.jobs.spool_path(status["job_id"]))
+                self.jobs.save(status)
+        finally:
+            for job_id in job_ids:
+                self._release(job_id)
+
+    # ------------------------------------------------------------------ snapshot commit
+
+    def _get_embedder(self):
+        if self._embedder is None:
+            if LIVE_WORKERS > 1:
+                from embedding_pipeline import ParallelEmbedder
+                self._embedder = ParallelEmbedder(workers=LIVE_WORKERS)
+                self._owns_embedder = True
+            else:
+                from embeddings import get_embedding_provider
+                self._embedder = getattr(self.engine, "embedding_provider", None) or get_embedding_provider()
+        return self._embedder
+
+    def _snapshot_builder(self) -> "SnapshotBuilder":
+        return SnapshotBuilder(self._get_embedder(), self.engine)
+
+    def close(self):
+        # The engine's provider is shared with queries and stays open
+        if self._owns_embedder:
+            self._embedder.close()
+
+
+class SnapshotBuilder:
+    """
+    Working index of one commit window: a copy of CURRENT (of the legacy index on first use) that batches
+    are upserted into and that is published as one snapshot. The snapshot lock is held from the copy until
+    CURRENT moves, so another process never builds on a base that is about to be replaced.
+
+    Cost per commit: begin_snapshot copies the whole CURRENT tree (chroma_db, mmap_index, corpus.arrow,
+    doc store) and build_derived_indexes rewrites the derived indexes from the full collection, so a window
+    costs O(index size) in disk I/O and time however few documents it adds. Commit windows amortise
+    that over every job queued within LIVE_INGEST_COMMIT_INTERVAL; after publishing, only snapshots older
+    than the one CURRENT replaced are pruned (never one that other workers may still be serving).
+    """
+
+    def __init__(self, embedder, engine=None):
+        import chromadb
+        from embeddings import embedding_metadata, check_embedding_compatibility
+        from vector_store import CHROMA_PATH, COLLECTION_NAME, get_or_create_collection
+        from retrieval import SHARD_COLLECTIONS
+
+        self.engine = engine
+        self.stats: List[Dict[str, Any]] = []
+        self.client = None
+        self.build_path = None
+        self.lock = FileLock(LOCK_FILE)
+        self.lock.acquire()
+        try:
+            self.base_version = current_version()
+            self.version, self.build_path = begin_snapshot(base_version=self.base_version,
+                                                           base_dir=None if self.base_version else CHROMA_PATH)
+            if not self.base_version:
+                carry_legacy_files(self.build_path)
+            self.client = chromadb.PersistentClient(path=os.path.join(self.build_path, "chroma_db"))
+            self.collection = get_or_create_collection(self.client, COLLECTION_NAME, None,
+                                                       metadata=embedding_metadata(embedder.model_name, embedder.dimension))
+            check_embedding_compatibility(self.collection.metadata, embedder)
+            existing = {getattr(c, "name", c) for c in self.client.list_collections()}
+            self.shard_collections = {shard: self.client.get_collection(name=name, embedding_function=None)
+                                      for shard, name in SHARD_COLLECTIONS.items() if name in existing}
+            # One ingestor per window, so the stored ids are scanned once rather than per batch
+            self.ingestor = IncrementalIngestor(self.collection, embedder, batch_size=LIVE_BATCH_SIZE,
+                                                shard_collections=self.shard_collections)
+        except BaseException:
+            self.abort()
+            raise
+
+    def write(self, batch: List[Document]) -> Dict[str, Any]:
+        stats = self.ingestor.ingest(BatchSource(batch), prune=False)
+        self.stats.append(stats)
+        return stats
+
+    def publish(self) -> Optional[str]:
+        """Publish the window, swap the engine to it and only then move CURRENT; None when nothing changed"""
+        try:
+            if not any(stats["upserted"] for stats in self.stats):
+                self.abort()
+                return None
+            build_derived_indexes(self.build_path, self.collection)
+            count = self.collection.count()
+            self.client.clear_system_cache()
+            self.client = None
+            publish_snapshot(self.version, self.build_path, {
+                "source": "live_ingest", "sources": [LIVE_SOURCE], "base_version": self.base_version,
+                "count": count, "sharded": bool(self.shard_collections), "ingest_stats": self.stats,
+            }, activate=False)
+            # Published: from here on a failure removes the snapshot rather than the build directory
+            self.build_path = snapshot_path(self.version)
+            if self.engine is not None:
+                self.engine.reload_index(self.version)
+            # CURRENT (and so every restart) only ever points at a snapshot that has been served
+            set_current(self.version)
+            self.build_path = None
+            prune_snapshots(before=self.base_version)
+            return self.version
+        except BaseException:
+            self.abort()
+            raise
+        finally:
+            self.lock.release()
+
+    def abort(self):
+        if self.client is not None:
+            self.client.clear_system_cache()
+            self.client = None
+        if self.build_path:
+            abort_snapshot(self.build_path)
+            self.build_path = None
+        self.lock.release()
+
+
+def carry_legacy_files(build_path: str):
+    """Copy the legacy doc store and tombstone log into a snapshot started from the legacy chroma_db"""
+    from doc_store import DOC_STORE_FILE, DOC_STORE_PATH
+    from compaction import TOMBSTONE_FILE, TOMBSTONE_PATH
+
+    for name, path in ((DOC_STORE_FILE, os.getenv("DOC_STORE_PATH", DOC_STORE_PATH)), (TOMBSTONE_FILE, TOMBSTONE_PATH)):
+        if os.path.exists(path):
+            shutil.copy2(path, os.path.join(build_path, name))
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def build_derived_indexes(build_path: str, collection, backend: Optional[str] = None):
+    """
+    Rebuild the mmap / quantized / corpus indexes of a snapshot from its collection: every one the base had,
+    plus the one VECTOR_BACKEND serves from. A missing index takes its settings (dtype, quantization,
+    corpus sources) from the legacy index when there is one.
+    """
+    from vector_store import MMAP_INDEX_PATH, MmapVectorStore, export_collection
+    from corpus import CORPUS_FILE, CORPUS_PATH, Corpus, write_corpus_from_collection
+
+    backend = (backend or os.getenv("VECTOR_BACKEND", "chroma")).lower()
+    mmap_path = os.path.join(build_path, "mmap_index")
+    manifest = _read_json(os.path.join(mmap_path, "manifest.json"))
+    if manifest is not None or backend in ("mmap", "quantized"):
+        if manifest is None:
+            manifest = _read_json(os.path.join(os.getenv("MMAP_INDEX_DIR", MMAP_INDEX_PATH), "manifest.json")) or {}
+        MmapVectorStore.build(mmap_path, *export_collection(collection), dtype=manifest.get("dtype", "float32"),
+                              extra_manifest={"collection_metadata": collection.metadata or {}})
+        quantization = manifest.get("quantization") or ({"mode": "binary"} if backend == "quantized" else None)
+        if quantization:
+            from quantized_index import build_quantized_codes
+            build_quantized_codes(mmap_path, quantization["mode"], quantization.get("pca_dim"))
+
+    corpus_path = os.path.join(build_path, CORPUS_FILE)
+    if os.path.exists(corpus_path) or backend == "corpus":
+        previous = corpus_path if os.path.exists(corpus_path) else os.getenv("CORPUS_FILE_PATH", CORPUS_PATH)
+        extra = {}
+        if os.path.exists(previous):
+            extra = {k: v for k, v in Corpus(previous).manifest.items() if k == "sources"}
+        write_corpus_from_collection(collection, corpus_path, extra_manifest=extra)
@@ -1,13 +1,19 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
 import os
+import json
+import asyncio
+from typing import List, Dict, Any
 os.environ["TOKENIZERS_PARALLELISM"] = "false" # Prevent deadlock
 
 from dotenv import load_dotenv
 import pathlib
 from rag_engine import RAGEngine
+from index_snapshots import list_snapshots, set_current, current_version, snapshot_embedding_model
+from shared_assets import get_shared_assets, memory_report
+from live_ingest import LiveIngestor
 
 # Load .env from parent directory (root of project)
 base_path = pathlib.Path(__file__).parent.parent
@@ -24,13 +30,70 @@ app.add_middleware(
 )
 
 engine = None
+engine_status = {"state": "starting", "error": None}
+live_ingestor = None
 
 @app.on_event("startup")
 async def startup_event():
+    # Load the model, vector DB and language detector in the background so the port opens immediately.
+    # /health answers right away (liveness); /ready returns 503 until the engine is usable (readiness).
+    asyncio.create_task(load_engine())
+    asyncio.create_task(watch_index_pointer())
+
+async def load_engine():
     global engine
-    print("[Main] Initializing RAG Engine...", flush=True)
-    engine = RAGEngine()
-    print("[Main] RAG Engine Initialized", flush=True)
+    engine_status["state"] = "loading"
+    print(f"[Main] Initializing RAG Engine in background (pid {os.getpid()})...", flush=True)
+    try:
+        # Under gunicorn (gunicorn.conf.py) the model/detector/index were preloaded in the master
+        engine = await asyncio.to_thread(RAGEngine, get_shared_assets())
+        engine_status["state"] = "ready"
+        print("[Main] RAG Engine Initialized", flush=True)
+    except Exception as e:
+        engine_status.update(state="failed", error=str(e))
+        print(f"[Main] ⚠️ RAG Engine failed to initialize: {e}", flush=True)
+        return
+    try:
+        # Ingestion jobs a previous (dead or restarted) worker process left queued or running
+        await asyncio.to_thread(get_live_ingestor().recover)
+    except Exception as e:
+        print(f"[Main] ⚠️ Could not recover ingestion jobs: {e}", flush=True)
+
+def require_engine():
+    """Raise 503 (with Retry-After) while the engine is still loading"""
+    if engine is None:
+        raise HTTPException(
+            status_code=503,
+            detail=f"RAG engine is {engine_status['state']}. Please retry shortly.",
+            headers={"Retry-After": "5"},
+        )
+    return engine
+
+async def watch_index_pointer():
+    """
+    With several workers, POST /admin/reload only reaches one of them. When INDEX_WATCH_INTERVAL
+    is set, every worker polls the CURRENT snapshot pointer and swaps when it moves (unless the
+    snapshot records another embedding model than the one this worker queries with).
+    """
+    interval = float(os.getenv("INDEX_WATCH_INTERVAL", "0"))
+    if interval <= 0:
+        return
+    skipped = None
+    while True:
+        await asyncio.sleep(interval)
+        version = current_version()
+        if engine and version and version != engine.index_version and version != skipped:
+            model = snapshot_embedding_model(version)
+            serving = getattr(getattr(engine, "embedding_provider", None), "model_name", None)
+            if model and serving and model != serving:
+                # Re-embedded with another model: wait for EMBEDDING_MODEL to be switched and a restart
+                print(f"[Main] Index watch: {version} was embedded with {model}, not {serving}; not reloading")
+                skipped = version
+                continue
+            try:
+                await asyncio.to_thread(engine.reload_index, version)
+            except Exception as e:
+                print(f"[Main] Index watch reload to {version} failed: {e}")
 
 class QueryRequest(BaseModel):
     query: str
@@ -46,8 +109,133 @@ def read_root():
 
 @app.get("/health")
 def health_check():
+    """Liveness: the process is up and serving HTTP"""
     return {"status": "healthy"}
 
+@app.get("/ready")
+def readiness_check():
+    """Readiness: model, vector DB and detector are loaded"""
+    if engine is None:
+        raise HTTPException(status_code=503, detail=engine_status)
+    return {"status": "ready", "index_version": engine.index_version, "vector_db": engine.collection is not None}
+
+@app.get("/metrics/embeddings")
+def embedding_metrics():
+    """Micro-batcher batch-size distribution and queueing latency"""
+    if not engine or not engine.embedding_batcher:
+        return {"status": "unavailable"}
+    return engine.embedding_batcher.stats()
+
+@app.get("/metrics/extraction")
+def extraction_metrics():
+    """PDF pages extracted per method (text layer / OCR / skipped) since start-up, per-page OCR latency, extraction cache use and the last document's timings"""
+    if not engine:
+        return {"status": "unavailable"}
+    processor = engine.text_processor
+    cache = processor.cache
+    return {"pages_by_method": dict(processor.page_counters), "ocr": processor.ocr_stats(),
+            "cache": cache.stats() if cache is not None else {"enabled": False},
+            "last_document": processor.last_extraction_stats}
+
+@app.get("/metrics/memory")
+def worker_memory():
+    """Shared vs unique resident memory of the worker that served this request"""
+    return memory_report()
+
+def require_admin(token: str):
+    """Admin endpoints are disabled unless ADMIN_TOKEN is set, and then require it in X-Admin-Token"""
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin endpoints disabled (ADMIN_TOKEN not set)")
+    if token != expected:
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+class ReloadRequest(BaseModel):
+    version: str = None  # Defaults to the CURRENT snapshot pointer
+    activate: bool = True  # Also move CURRENT so restarts load the same version
+
+@app.get("/admin/index")
+def index_info(x_admin_token: str = Header(None)):
+    """Active index version and all published snapshots"""
+    require_admin(x_admin_token)
+    return {"active_version": engine.index_version if engine else None, "snapshots": list_snapshots()}
+
+@app.post("/admin/reload")
+async def reload_index(request: ReloadRequest, x_admin_token: str = Header(None)):
+    """Hot-swap the engine to another index snapshot without restarting"""
+    require_admin(x_admin_token)
+    require_engine()
+    try:
+        # Opening the new store is slow; do it off the event loop so queries keep flowing
+        result = await asyncio.to_thread(engine.reload_index, request.version)
+        if request.version and request.activate:
+            set_current(request.version)
+        return {"status": "reloaded", **result}
+    except Exception as e:
+        print(f"[Main] Index reload failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def get_live_ingestor():
+    """Background embedding worker for POST /ingest (started with the first job)"""
+    global live_ingestor
+    if live_ingestor is None:
+        live_ingestor = LiveIngestor(require_engine())
+    return live_ingestor
+
+class IngestRequest(BaseModel):
+    records: List[Dict[str, Any]]
+
+@app.post("/ingest", status_code=202)
+async def ingest_documents(request: IngestRequest, x_admin_token: str = Header(None)):
+    """
+    Queue statutes / judgments for indexing. Records are validated now; the returned job is embedded in
+    the background with the other jobs of its commit window and becomes searchable atomically when that
+    window's snapshot is published.
+    """
+    require_admin(x_admin_token)
+    ingestor = get_live_ingestor()
+    job = await asyncio.to_thread(ingestor.submit, request.records)
+    if not job["accepted"]:
+        raise HTTPException(status_code=422, detail=job)
+    return job
+
+@app.post("/ingest/bulk", status_code=202)
+async def ingest_documents_bulk(request: Request, x_admin_token: str = Header(None)):
+    """Same as POST /ingest for an NDJSON body (one record per line), spooled as it streams in"""
+    require_admin(x_admin_token)
+    writer = get_live_ingestor().new_job()
+    line = 0
+
+    def add(raw: bytes):
+        nonlocal line
+        if not raw.strip():
+            return
+        line += 1
+        try:
+            writer.add(json.loads(raw), line)
+        except json.JSONDecodeError as e:
+            writer.reject(line, f"invalid JSON: {e.msg}")
+
+    pending = b""
+    async for chunk in request.stream():
+        *lines, pending = (pending + chunk).split(b"\n")
+        for raw in lines:
+            add(raw)
+    add(pending)
+    job = live_ingestor.enqueue(writer)
+    if not job["accepted"]:
+        raise HTTPException(status_code=422, detail=job)
+    return job
+
+@app.get("/ingest/{job_id}")
+def ingest_status(job_id: str, x_admin_token: str = Header(None)):
+    """Progress of an ingestion job (readable from any worker process)"""
+    require_admin(x_admin_token)
+    status = get_live_ingestor().status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown ingestion job")
+    return status
+
 class DraftRequest(BaseModel):
     draft_type: str
     details: str
@@ -55,6 +243,7 @@ class DraftRequest(BaseModel):
 
 @app.post("/draft")
 async def generate_draft(request: DraftRequest):
+    require_engine()
     try:
         print(f"[Main] Drafting request received: {request.draft_type} in {request.language}", flush=True)
         draft_text = engine.generate_draft(
@@ -129,6 +318,9 @@ async def query_rag(request: QueryRequest):
                         "related_judgments": []
                     }
         
+        # Everything past the greeting fast path needs the loaded engine
+        require_engine()
+
         # Add user message to conversation memory if session exists
         if request.session_id:
             engine.conversation_memory.add_message(request.session_id, "user", request.query)
@@ -146,6 +338,8 @@ async def query_rag(request: QueryRequest):
             engine.conversation_memory.add_message(request.session_id, "assistant", response["answer"])
         
         return response
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -155,6 +349,7 @@ async def query_rag(request: QueryRequest):
 async def handle_summarize(file: UploadFile = File(...)):
     if not file:
         raise HTTPException(status_code=400, detail="No file uploaded")
+    require_engine()
     try:
         content = await file.read()
         summary = await engine.summarize(content, file.filename)
@@ -168,6 +363,7 @@ class CompareRequest(BaseModel):
 
 @app.post("/compare")
 async def handle_compare(request: CompareRequest):
+    require_engine()
     try:
         comparison = await engine.compare_clauses(request.text1, request.text2)
         return {"comparison": comparison}
@@ -178,6 +374,7 @@ async def handle_compare(request: CompareRequest):
 @app.post("/session/create")
 async def create_session():
     """Create a new conversation session"""
+    require_engine()
     try:
         session_id = engine.conversation_memory.create_session()
         return {"session_id": session_id, "status": "created"}
@@ -187,6 +384,7 @@ async def create_session():
 @app.post("/session/clear")
 async def clear_session(session_id: str):
     """Clear conversation history for a session"""
+    require_engine()
     try:
         engine.conversation_memory.clear_session(session_id)
         return {"session_id": session_id, "status": "cleared"}
@@ -196,6 +394,7 @@ async def clear_session(session_id: str):
 @app.get("/session/{session_id}/history")
 async def get_session_history(session_id: str, max_messages: int = 10):
     """Get conversation history for a session"""
+    require_engine()
     try:
         history = engine.conversation_memory.get_history(session_id, max_messages)
         metadata = engine.conversation_memory.get_session_info(session_id)
@@ -206,6 +405,7 @@ async def get_session_history(session_id: str, max_messages: int = 10):
 @app.delete("/session/{session_id}")
 async def delete_session(session_id: str):
     """Delete a conversation session"""
+    require_engine()
     try:
         engine.conversation_memory.delete_session(session_id)
         return {"session_id": session_id, "status": "deleted"}
@@ -0,0 +1,118 @@
+"""
+Micro-Batching Module for Query Embeddings
+Collects concurrent embedding requests for a few milliseconds and encodes them in one batched forward pass
+"""
+
+import os
+import time
+import asyncio
+from collections import deque, Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+
+class EmbeddingMicroBatcher:
+    """
+    Async front-end for an EmbeddingProvider.
+
+    The first request after an idle period opens a batching window of `max_wait_ms`; every request
+    arriving within the window (up to `max_batch_size`) is encoded together on a single worker thread
+    and each caller's future is resolved with its own vector. While a batch is encoding, new requests
+    queue up and form the next batch, so under load batches fill without waiting for the window.
+    """
+
+    def __init__(self, provider, max_batch_size: Optional[int] = None, max_wait_ms: Optional[float] = None):
+        self.provider = provider
+        self.max_batch_size = max_batch_size or int(os.getenv("EMBED_BATCH_MAX_SIZE", "32"))
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else float(os.getenv("EMBED_BATCH_WAIT_MS", "3"))) / 1000
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed-batch")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.requests = 0
+        self.batches = 0
+        self.batch_sizes: Counter = Counter()
+        self._queue_wait_ms = deque(maxlen=2000)
+        self._encode_ms = deque(maxlen=2000)
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed one text, sharing a forward pass with any concurrent callers"""
+        self._ensure_started()
+        future = self._loop.create_future()
+        self.requests += 1
+        await self._queue.put((text, future, time.perf_counter()))
+        return await future
+
+    async def _collect_batch(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already queued without waiting
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect_batch()
+            dispatched = time.perf_counter()
+
+            # Identical concurrent queries are encoded once
+            unique_texts = list(dict.fromkeys(text for text, _, _ in batch))
+            try:
+                vectors = await self._loop.run_in_executor(self._executor, self.provider.embed, unique_texts)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            finished = time.perf_counter()
+            self.batches += 1
+            self.batch_sizes[len(batch)] += 1
+            self._encode_ms.append((finished - dispatched) * 1000)
+
+            by_text = {text: vectors[i].tolist() for i, text in enumerate(unique_texts)}
+            for text, future, enqueued in batch:
+                self._queue_wait_ms.append((dispatched - enqueued) * 1000)
+                if not future.done():
+                    future.set_result(by_text[text])
+
+    @staticmethod
+    def _percentile(values, pct: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 3)
+
+    def stats(self) -> dict:
+        """Batch-size distribution and the queueing latency added by batching"""
+        waits = list(self._queue_wait_ms)
+        encodes = list(self._encode_ms)
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": round(sum(k * v for k, v in self.batch_sizes.items()) / self.batches, 2) if self.batches else 0.0,
+            "batch_size_distribution": dict(sorted(self.batch_sizes.items())),
+            "queue_wait_ms": {"p50": self._percentile(waits, 0.50), "p95": self._percentile(waits, 0.95), "p99": self._percentile(waits, 0.99)},
+            "encode_ms": {"p50": self._percentile(encodes, 0.50), "p95": self._percentile(encodes, 0.95)},
+            "config": {"max_batch_size": self.max_batch_size, "max_wait_ms": self.max_wait * 1000},
+        }
@@ -0,0 +1,185 @@
+"""
+Quantized Index Module
+Memory-lean search over an MmapVectorStore directory: a fast first pass over compact codes
+(1-bit binary with Hamming distance, or int8 per dimension, optionally PCA-reduced) followed by
+exact rescoring of the top candidates against the full-precision vectors.
+
+Files added to the index directory by build_quantized_codes():
+    codes_binary.npy / codes_int8.npy  - (N, bytes) uint8 or (N, dim) int8 codes
+    quantization.npz                   - centering mean, PCA components, int8 scales
+    manifest.json["quantization"]      - mode, pca_dim, code bytes per vector
+"""
+
+import os
+import json
+from typing import List, Dict, Any, Optional
+
+from vector_store import MmapVectorStore
+
+QUANT_MODES = ("binary", "int8")
+CHUNK_ROWS = 65536
+MIN_CANDIDATES = 50
+
+_POPCOUNT = None
+
+
+def _popcount(bytes_array):
+    """Per-byte bit counts (numpy >= 2.0 has a native ufunc; older versions use a lookup table)"""
+    import numpy as np
+
+    global _POPCOUNT
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bytes_array)
+    if _POPCOUNT is None:
+        _POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+    return _POPCOUNT[bytes_array]
+
+
+def _code_file(mode: str) -> str:
+    return f"codes_{mode}.npy"
+
+
+def build_quantized_codes(path: str, mode: str = "binary", pca_dim: Optional[int] = None,
+                          sample_size: int = 20000, seed: int = 0) -> Dict[str, Any]:
+    """
+    Compute compact codes for an existing MmapVectorStore directory
+
+    Args:
+        path: Index directory (must contain embeddings.npy)
+        mode: 'binary' (1 bit per dimension) or 'int8' (1 byte per dimension)
+        pca_dim: Optional PCA output dimension applied before quantization
+        sample_size: Rows used to fit the mean / PCA / int8 scales
+
+    Returns:
+        The 'quantization' manifest entry
+    """
+    import numpy as np
+
+    if mode not in QUANT_MODES:
+        raise ValueError(f"Unknown quantization mode '{mode}'. Expected one of {QUANT_MODES}")
+
+    matrix = np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r")
+    n, dim = matrix.shape
+    rng = np.random.default_rng(seed)
+    sample_rows = np.sort(rng.choice(n, size=min(n, sample_size), replace=False))
+    sample = np.asarray(matrix[sample_rows], dtype=np.float32)
+
+    mean = sample.mean(axis=0)
+    components = np.zeros((0, dim), dtype=np.float32)
+    if pca_dim and pca_dim < dim:
+        _, _, vt = np.linalg.svd(sample - mean, full_matrices=False)
+        components = vt[:pca_dim].astype(np.float32)
+    out_dim = components.shape[0] or dim
+
+    def transform(block):
+        centered = np.asarray(block, dtype=np.float32) - mean
+        return centered @ components.T if components.size else centered
+
+    scale = np.zeros(0, dtype=np.float32)
+    if mode == "binary":
+        shape, dtype = (n, (out_dim + 7) // 8), np.uint8
+    else:
+        scale = np.clip(np.abs(transform(sample)).max(axis=0) / 127.0, 1e-8, None).astype(np.float32)
+        shape, dtype = (n, out_dim), np.int8
+
+    codes = np.lib.format.open_memmap(os.path.join(path, _code_file(mode)), mode="w+", dtype=dtype, shape=shape)
+    for start in range(0, n, CHUNK_ROWS):
+        block = transform(matrix[start:start + CHUNK_ROWS])
+        if mode == "binary":
+            codes[start:start + len(block)] = np.packbits(block > 0, axis=1)
+        else:
+            codes[start:start + len(block)] = np.clip(np.rint(block / scale), -127, 127)
+    codes.flush()
+    del codes
+
+    np.savez(os.path.join(path, "quantization.npz"), mean=mean, components=components, scale=scale)
+
+    info = {"mode": mode, "pca_dim": int(out_dim) if components.size else None, "code_bytes_per_vector": int(shape[1])}
+    manifest_path = os.path.join(path, "manifest.json")
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    manifest["quantization"] = info
+    tmp = f"{manifest_path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, manifest_path)
+
+    print(f"[QuantizedIndex] Wrote {mode} codes for {n} vectors ({shape[1]} bytes/vector vs {dim * 4} float32)")
+    return info
+
+
+class QuantizedVectorStore(MmapVectorStore):
+    """
+    Two-stage search over an MmapVectorStore directory with codes from build_quantized_codes().
+
+    The full-precision matrix stays memory-mapped and is only paged in for the rescored candidate rows,
+    so resident memory is dominated by the codes (48 bytes/vector for 384-dim binary).
+    """
+
+    def __init__(self, path: str, embedding_function=None, rescore_factor: Optional[int] = None):
+        import numpy as np
+
+        super().__init__(path, embedding_function)
+        info = self.manifest.get("quantization")
+        if not info:
+            raise ValueError(f"{path} has no quantized codes. Run build_quantized_codes() first.")
+
+        self.mode = info["mode"]
+        params = np.load(os.path.join(path, "quantization.npz"))
+        self.mean = params["mean"]
+        self.components = params["components"] if params["components"].size else None
+        self.scale = params["scale"] if params["scale"].size else None
+        self.codes = np.load(os.path.join(path, _code_file(self.mode)), mmap_mode="r")
+        self.rescore_factor = rescore_factor or int(os.getenv("QUANT_RESCORE_FACTOR", "10"))
+        print(f"[QuantizedVectorStore] {self.mode} codes ({info['code_bytes_per_vector']} B/vector), rescoring top {self.rescore_factor}x")
+
+    def _transform(self, queries):
+        centered = queries - self.mean
+        return centered @ self.components.T if self.components is not None else centered
+
+    def _first_pass_scores(self, query_t):
+        """Higher is better. Hamming similarity for binary codes, approximate dot product for int8."""
+        import numpy as np
+
+        n = self.codes.shape[0]
+        scores = np.empty(n, dtype=np.float32)
+        if self.mode == "binary":
+            query_code = np.packbits(query_t > 0)
+            for start in range(0, n, CHUNK_ROWS):
+                block = self.codes[start:start + CHUNK_ROWS]
+                scores[start:start + len(block)] = -_popcount(np.bitwise_xor(block, query_code)).sum(axis=1, dtype=np.int32)
+        else:
+            weights = (query_t * self.scale).astype(np.float32)
+            for start in range(0, n, CHUNK_ROWS):
+                block = self.codes[start:start + CHUNK_ROWS]
+                scores[start:start + len(block)] = block.astype(np.float32) @ weights
+        return scores
+
+    def query(self, query_texts: Optional[List[str]] = None, query_embeddings=None, n_results: int = 10,
+              where: Optional[Dict[str, Any]] = None, include: Optional[List[str]] = None) -> Dict[str, Any]:
+        import numpy as np
+
+        include = include or ["documents", "metadatas", "distances"]
+        queries = self._query_matrix(query_texts, query_embeddings)
+        transformed = self._transform(queries)
+        allowed = self._where_mask(where) if where else None
+
+        n = self.codes.shape[0]
+        k = min(n_results, n)
+        n_candidates = min(n, max(k * self.rescore_factor, MIN_CANDIDATES))
+
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for query, query_t in zip(queries, transformed):
+            scores = self._first_pass_scores(query_t)
+            if allowed is not None:
+                scores[~allowed] = -np.inf
+            candidates = np.argpartition(-scores, n_candidates - 1)[:n_candidates] if n_candidates < n else np.arange(n)
+            candidates = np.sort(candidates[np.isfinite(scores[candidates])])  # sorted rows read the memmap sequentially
+
+            vectors = np.asarray(self.matrix[candidates], dtype=np.float32)
+            # Norms of the candidates only: the full matrix's would page in every row
+            sq_norms = None if self.normalized else np.einsum("ij,ij->i", vectors, vectors)
+            distances = self._exact_distances(query[None, :], vectors, sq_norms)[0]
+            order = np.argsort(distances)[:k]
+            self._append_result(result, candidates[order], distances[order], include)
+        return result
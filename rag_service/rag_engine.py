@@ -2,16 +2,22 @@
 import os
 import json
 import re
-from typing import List, Dict, Any, Optional
-import chromadb
-from chromadb.utils import embedding_functions
-import requests
+import asyncio
+import threading
+from typing import List, Dict, Any, Optional, Tuple
 import io
 from text_processor import TextProcessor
 from conversation_memory import ConversationMemory
+from embeddings import get_embedding_provider, ProviderEmbeddingFunction, check_embedding_compatibility
+from vector_store import open_vector_store
+from doc_store import open_doc_store, CONTEXT_TOKENS
+from index_snapshots import current_version
+from micro_batcher import EmbeddingMicroBatcher
 
 class RAGEngine:
-    def __init__(self):
+    def __init__(self, assets: Optional[Dict[str, Any]] = None):
+        # assets: read-only objects preloaded in a pre-fork master (see shared_assets.py)
+        assets = assets or {}
         self.api_key = os.getenv("OPENROUTER_API_KEY") 
         # Default to free Mistral, but allow override via .env (e.g., 'openai/gpt-4o')
         self.model_name = os.getenv("OPENROUTER_MODEL", "mistralai/mistral-7b-instruct") # Valid model ID
@@ -25,25 +31,89 @@ class RAGEngine:
             print("[RAGEngine] ⚠️ Warning: OPENROUTER_API_KEY not found. LLM features disabled.")
 
         # Initialize Enhanced Text Processor
-        self.text_processor = TextProcessor()
+        self.text_processor = assets.get("text_processor") or TextProcessor()
         
         # Initialize Conversation Memory
         self.conversation_memory = ConversationMemory()
         # Simple in-memory response cache
         self._cache: Dict[str, Dict[str, Any]] = {}
 
-        # Initialize ChromaDB Client
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        chroma_path = os.path.join(base_dir, "chroma_db")
-        
+        # Initialize Vector Store (VECTOR_BACKEND=chroma|mmap|quantized|corpus)
+        # (index_version, store, doc_store) is swapped as one tuple so readers never see a mixed set
+        self._index_state: Tuple[Optional[str], Any, Any] = (None, None, None)
+        self._index_lock = threading.Lock()
+        self.embedding_batcher = None
         try:
-            self.db_client = chromadb.PersistentClient(path=chroma_path)
-            self.ef = embedding_functions.SentenceTransformerEmbeddingFunction(model_name="all-MiniLM-L6-v2")
-            self.collection = self.db_client.get_collection(name="legal_knowledge", embedding_function=self.ef)
-            print(f"[RAGEngine] Connected to Vector DB at {chroma_path}. ({self.collection.count()} docs)")
+            # Embedding backend is selectable via EMBEDDING_BACKEND (torch / onnx / onnx-int8)
+            self.embedding_provider = assets.get("embedding_provider") or get_embedding_provider()
+            self.ef = ProviderEmbeddingFunction(self.embedding_provider)
+            # Concurrent queries share batched forward passes instead of encoding one by one
+            self.embedding_batcher = EmbeddingMicroBatcher(self.embedding_provider)
+            if "index" in assets:
+                version, store = assets["index"]
+            else:
+                version = current_version()
+                store = open_vector_store(self.ef, version=version)
+            # Vectors from another model would return plausible-looking but wrong neighbours
+            check_embedding_compatibility(store.metadata, self.embedding_provider)
+            self._index_state = (version, store, open_doc_store(version))
+            print(f"[RAGEngine] Connected to Vector DB '{type(store).__name__}' (snapshot: {version or 'legacy'}). ({store.count()} docs)")
         except Exception as e:
              print(f"[RAGEngine] ⚠️ Vector DB Connection Error: {e}. Ensure 'ingest_vector.py' has been run.")
-             self.collection = None
+
+    @property
+    def collection(self):
+        return self._index_state[1]
+
+    @property
+    def index_version(self) -> Optional[str]:
+        return self._index_state[0]
+
+    @staticmethod
+    def _cache_prefix(version: Optional[str]) -> str:
+        return f"{version or 'legacy'}::"
+
+    def reload_index(self, version: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Atomically swap to another index snapshot without restarting.
+        The new store is fully opened before the swap; in-flight queries finish on the old one.
+        Cached search results and answers tied to the old version are dropped.
+
+        Args:
+            version: Snapshot version (default: the CURRENT pointer)
+        """
+        version = version or current_version()
+        store = open_vector_store(self.ef, version=version)
+        check_embedding_compatibility(store.metadata, self.embedding_provider)
+        doc_store = open_doc_store(version)
+        count = store.count()
+
+        with self._index_lock:
+            old_version = self.index_version
+            self._index_state = (version, store, doc_store)
+            stale_prefix = self._cache_prefix(old_version)
+            stale_keys = [k for k in list(self._cache) if k.startswith(stale_prefix)]
+            for key in stale_keys:
+                self._cache.pop(key, None)
+
+        print(f"[RAGEngine] Index swapped {old_version or 'legacy'} -> {version or 'legacy'} ({count} docs, {len(stale_keys)} cache entries dropped)")
+        return {"previous_version": old_version, "version": version, "count": count, "invalidated_cache_entries": len(stale_keys)}
+
+    @staticmethod
+    def _context_snippet(doc_id: str, doc: str, meta: Dict[str, Any], doc_store) -> Tuple[str, Optional[str]]:
+        """
+        Prompt text for a hit: a child chunk is widened to its token-bounded neighbourhood in the parent
+        document (doc store); other documents are used as stored, capped at the same budget.
+
+        Returns:
+            (snippet, parent_id or None)
+        """
+        if doc_store is not None and meta.get("parent_id"):
+            hood = doc_store.neighbourhood(doc_id, CONTEXT_TOKENS)
+            if hood:
+                return hood["text"], hood["parent_id"]
+        # ~4 characters per token
+        return doc[:CONTEXT_TOKENS * 4], None
 
     def _classify_query(self, query: str) -> str:
         """Classify query as 'simple' or 'legal' for optimization."""
@@ -106,6 +176,8 @@ class RAGEngine:
     
     def _call_llm(self, messages: List[Dict], max_tokens: int = 1500, timeout: int = 30, model_override: Optional[str] = None) -> str:
         """Helper to call OpenRouter API with timeout."""
+        import requests
+
         if not self.api_key:
             raise Exception("API Key missing")
 
@@ -169,23 +241,24 @@ class RAGEngine:
         extraction_method = "unknown"
         
         try:
-            # 1. Extract Text (Enhanced with multi-modal support)
+            # 1-2. Extract Text (Enhanced with multi-modal support) and clean with 12-stage pipeline;
+            # a PDF uploaded before comes back from the extraction cache without either step
             if filename.lower().endswith(".pdf"):
-                full_text, extraction_method = self.text_processor.extract_text_from_pdf(
-                    file_content, filename, max_ocr_pages=100
+                # Off the event loop: extraction waits on the page-range pool (and OCR) for seconds
+                full_text, cleaned_text, extraction_method = await asyncio.to_thread(
+                    self.text_processor.extract_and_clean_pdf, file_content, filename, max_ocr_pages=100
                 )
                 
                 if extraction_method == "failed":
                     return full_text  # Error message
             else:
                 full_text = file_content.decode("utf-8", errors="ignore")
+                cleaned_text = self.text_processor.clean_text(full_text) if full_text.strip() else ""
                 extraction_method = "text"
 
             if not full_text.strip():
                 return "Error: Could not extract text from document."
 
-            # 2. Clean with 12-stage pipeline
-            cleaned_text = self.text_processor.clean_text(full_text)
             print(f"[RAGEngine] Extracted {len(cleaned_text)} characters using {extraction_method}.")
             
             # 3. Detect language
@@ -407,24 +480,30 @@ class RAGEngine:
             except Exception as e:
                 print(f"[RAGEngine] Translation failed: {e}. Using original query.")
 
-        # 1. Retrieve from Vector DB
+        # 1. Retrieve from Vector DB (pin the index for this request; a hot-swap won't affect it)
+        index_version, collection, doc_store = self._index_state
         try:
             print(f"[RAGEngine] Starting Vector Search for '{search_query}'...", flush=True)
             
-            search_cache_key = f"search::{search_query}"
+            search_cache_key = f"{self._cache_prefix(index_version)}search::{search_query}"
+            results = None
             if search_cache_key in self._cache:
                  print(f"[RAGEngine] Using Cached Search Results.")
                  results = self._cache[search_cache_key]
-            elif self.collection:
-                results = self.collection.query(
-                    query_texts=[search_query], # Use the (potentially) translated query
+            elif collection:
+                # Use the (potentially) translated query; embedded via the micro-batcher
+                query_embedding = await self.embedding_batcher.embed(search_query)
+                results = collection.query(
+                    query_embeddings=[query_embedding],
                     n_results=5,
                     include=["documents", "metadatas", "distances"]
                 )
                 # Cache the raw search results
                 self._cache[search_cache_key] = results
                 print(f"[RAGEngine] Vector Search Complete. Found: {len(results['documents'][0])} docs", flush=True)
-                
+
+            if results:
+                ids = results['ids'][0]
                 docs = results['documents'][0]
                 metas = results['metadatas'][0]
                 
@@ -432,6 +511,7 @@ class RAGEngine:
                 min_dist = min(dists) if dists else 1.0
                 
                 doc_count = 0
+                used_parents = set()
                 for i, doc in enumerate(docs):
                     meta = metas[i]
                     dist = dists[i]
@@ -444,9 +524,15 @@ class RAGEngine:
                     # Limit context size: max 4 docs
                     if doc_count >= 4:
                         break
+
+                    snippet, parent_id = self._context_snippet(ids[i], doc, meta, doc_store)
+                    # Neighbouring chunks of one judgment would repeat the same passage
+                    if parent_id:
+                        if parent_id in used_parents:
+                            continue
+                        used_parents.add(parent_id)
                     doc_count += 1
-                        
-                    snippet = doc[:2000]
+
                     src = meta.get('source', 'Unknown')
                     law = meta.get('law')
                     section = meta.get('section') or meta.get('bns_section') or meta.get('ipc_section')
@@ -559,7 +645,7 @@ class RAGEngine:
             try:
                 print(f"[RAGEngine] Calling LLM now...", flush=True)
                 # Check cache (keyed by query + language + top sources)
-                cache_key = f"{language}|{query.strip()}|{','.join([c.get('source','') for c in citations[:2]])}"
+                cache_key = f"{self._cache_prefix(index_version)}{language}|{query.strip()}|{','.join([c.get('source','') for c in citations[:2]])}"
                 if cache_key in self._cache:
                     cached = self._cache[cache_key]
                     return {
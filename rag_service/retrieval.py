@@ -0,0 +1,135 @@
+"""
+Sharded Retrieval Module
+Per-document-type shards (statutes, judgments, act chunks) queried concurrently and merged,
+so judgment-heavy neighbourhoods cannot crowd statutes out of the top-k (and vice versa).
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+# shard name -> Chroma collection name
+SHARD_COLLECTIONS = {
+    "statutes": "legal_statutes",
+    "judgments": "legal_judgments",
+    "act_chunks": "legal_act_chunks",
+}
+DEFAULT_SHARD_K = {"statutes": 4, "judgments": 3, "act_chunks": 2}
+
+# Equivalent metadata filters, used when all documents live in one store (mmap backends)
+SHARD_FILTERS = {
+    "statutes": {"$and": [{"type": "statute"}, {"source": {"$ne": "IT Act 2000"}}]},
+    "judgments": {"type": "judgment"},
+    "act_chunks": {"source": "IT Act 2000"},
+}
+
+
+def shard_for(metadata: Dict[str, Any]) -> str:
+    """Shard a document belongs to, from its metadata"""
+    if metadata.get("type") == "judgment":
+        return "judgments"
+    if metadata.get("source") == "IT Act 2000":
+        return "act_chunks"
+    return "statutes"
+
+
+def parse_shard_k(spec: Optional[str]) -> Dict[str, int]:
+    """'statutes=4,judgments=3' -> {'statutes': 4, 'judgments': 3, 'act_chunks': 2}"""
+    shard_k = dict(DEFAULT_SHARD_K)
+    for part in (spec or "").split(","):
+        if "=" in part:
+            name, k = part.split("=", 1)
+            shard_k[name.strip()] = int(k)
+    return shard_k
+
+
+class ShardedRetriever:
+    """
+    Fans one query out to every shard in parallel and merges the hits.
+
+    Distances are normalised to cosine distance per shard (so shards built with different
+    hnsw:space settings are comparable), then reported on the squared-L2 scale of unit vectors
+    (2 x cosine distance) that RAGEngine's relevance cutoff expects. The best hit of every shard
+    is placed first, so each document type is represented whenever it returned anything.
+    """
+
+    def __init__(self, shards: List[Tuple[str, Any, Optional[Dict[str, Any]]]], embedding_function,
+                 shard_k: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            shards: (name, store, where) triples; `where` restricts a shared store to the shard
+            embedding_function: Used once per query; shards receive the embedding
+            shard_k: Results requested from each shard
+        """
+        self.shards = shards
+        self.embedding_function = embedding_function
+        self.shard_k = shard_k or parse_shard_k(os.getenv("SHARD_K"))
+        self._executor = ThreadPoolExecutor(max_workers=len(shards), thread_name_prefix="shard")
+        self.name = "sharded:" + ",".join(name for name, _, _ in shards)
+
+    @property
+    def metadata(self) -> dict:
+        return getattr(self.shards[0][1], "metadata", None) or {}
+
+    def count(self) -> int:
+        counts = {}
+        for name, store, where in self.shards:
+            if where:
+                counts[name] = len(store.get(where=where, include=[])["ids"])
+            else:
+                counts[name] = store.count()
+        return sum(counts.values())
+
+    @staticmethod
+    def _to_cosine(distance: float, space: str) -> float:
+        # l2 on unit vectors: |a-b|^2 = 2 - 2cos ; cosine / ip: 1 - cos
+        return distance / 2.0 if space == "l2" else distance
+
+    def _query_shard(self, name: str, store, shard_where, where, embeddings, include) -> List[dict]:
+        if where and shard_where:
+            where = {"$and": [where, shard_where]}
+        result = store.query(query_embeddings=embeddings, n_results=self.shard_k.get(name, 3),
+                             where=where or shard_where, include=include)
+        space = (getattr(store, "metadata", None) or {}).get("hnsw:space", "l2")
+        hits = []
+        for i, doc_id in enumerate(result["ids"][0]):
+            hits.append({
+                "id": doc_id,
+                "shard": name,
+                "cosine": self._to_cosine(result["distances"][0][i], space),
+                "document": result["documents"][0][i] if result.get("documents") else None,
+                "metadata": result["metadatas"][0][i] if result.get("metadatas") else None,
+            })
+        return hits
+
+    def query(self, query_texts: Optional[List[str]] = None, query_embeddings=None, n_results: int = 5,
+              where: Optional[Dict[str, Any]] = None, include: Optional[List[str]] = None) -> Dict[str, Any]:
+        include = list(include or ["documents", "metadatas", "distances"])
+        if "distances" not in include:
+            include.append("distances")
+        if query_embeddings is None:
+            query_embeddings = self.embedding_function(query_texts)
+
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for embedding in query_embeddings:
+            futures = [
+                self._executor.submit(self._query_shard, name, store, shard_where, where, [embedding], include)
+                for name, store, shard_where in self.shards
+            ]
+            per_shard = []
+            for future in futures:
+                try:
+                    per_shard.append(sorted(future.result(), key=lambda h: h["cosine"]))
+                except Exception as e:
+                    print(f"[ShardedRetriever] ⚠️ Shard query failed: {e}")
+
+            # Best hit of each shard first, then everything else by distance
+            leaders = sorted((hits[0] for hits in per_shard if hits), key=lambda h: h["cosine"])
+            rest = sorted((h for hits in per_shard for h in hits[1:]), key=lambda h: h["cosine"])
+            merged = (leaders + rest)[:n_results]
+
+            result["ids"].append([h["id"] for h in merged])
+            result["documents"].append([h["document"] for h in merged])
+            result["metadatas"].append([h["metadata"] for h in merged])
+            result["distances"].append([2.0 * h["cosine"] for h in merged])
+        return result
@@ -0,0 +1,93 @@
+"""
+Shared Read-Only Assets for Multi-Worker Serving
+Loads the embedding model, language detector and memory-mapped index once in the pre-fork master
+so forked workers inherit them copy-on-write instead of each loading their own copy.
+"""
+
+import os
+import gc
+from typing import Dict, Any, Optional
+
+_ASSETS: Optional[Dict[str, Any]] = None
+
+
+def load_shared_assets() -> Dict[str, Any]:
+    """
+    Load fork-safe, read-only assets in the current (master) process
+
+    Loaded here:
+        - torch embedding model (weights are never written, so their pages stay shared)
+        - TextProcessor with the lingua language detector
+        - Mmap/Quantized/Corpus vector store when VECTOR_BACKEND=mmap|quantized|corpus (pages shared via the page cache)
+    Not loaded here (created per worker after fork):
+        - ONNX Runtime sessions and Chroma clients, which own thread pools / SQLite handles
+          that do not survive fork()
+    """
+    global _ASSETS
+    if _ASSETS is not None:
+        return _ASSETS
+
+    from embeddings import get_embedding_provider, ProviderEmbeddingFunction
+    from text_processor import TextProcessor
+
+    assets: Dict[str, Any] = {"text_processor": TextProcessor()}
+
+    backend = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+    if backend == "torch":
+        provider = get_embedding_provider(backend="torch")
+        assets["embedding_provider"] = provider
+
+        if os.getenv("VECTOR_BACKEND", "chroma").lower() in ("mmap", "quantized", "corpus"):
+            from vector_store import open_vector_store
+            from index_snapshots import current_version
+
+            version = current_version()
+            assets["index"] = (version, open_vector_store(ProviderEmbeddingFunction(provider), version=version))
+    else:
+        print(f"[SharedAssets] EMBEDDING_BACKEND={backend} is loaded per worker (ONNX Runtime is not fork-safe)")
+
+    _ASSETS = assets
+    print(f"[SharedAssets] Preloaded in master (pid {os.getpid()}): {', '.join(sorted(assets))}")
+    return assets
+
+
+def get_shared_assets() -> Dict[str, Any]:
+    """Assets inherited from the master, or an empty dict in single-process mode"""
+    return _ASSETS or {}
+
+
+def freeze_for_fork():
+    """
+    Move every object allocated so far into the permanent GC generation.
+    Without this the first collection in each worker touches (and so copies) every inherited page.
+    """
+    gc.collect()
+    gc.freeze()
+    print(f"[SharedAssets] Froze {gc.get_freeze_count()} objects before fork")
+
+
+def memory_report(pid: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Shared vs unique resident memory for a process, from /proc/<pid>/smaps_rollup (Linux only)
+
+    Returns:
+        Sizes in MB: rss, pss (proportional share), shared (clean+dirty) and unique (private clean+dirty)
+    """
+    pid = pid or os.getpid()
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 3 and parts[0].endswith(":") and parts[2] == "kB":
+                    fields[parts[0][:-1]] = int(parts[1]) / 1024
+    except OSError:
+        return {"pid": pid, "error": "smaps_rollup not available on this platform"}
+
+    return {
+        "pid": pid,
+        "rss_mb": round(fields.get("Rss", 0), 1),
+        "pss_mb": round(fields.get("Pss", 0), 1),
+        "shared_mb": round(fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0), 1),
+        "unique_mb": round(fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0), 1),
+    }
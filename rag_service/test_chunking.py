@@ -0,0 +1,63 @@
+from chunking import HEADING_PATTERNS, SPECIAL_TOKENS, chunk_act, pack_sentences, split_sections
+
+
+def count_words(text):
+    # Deterministic stand-in for the model tokenizer: one token per word
+    return len(text.split())
+
+
+GAZETTE = """THE INFORMATION TECHNOLOGY ACT, 2000
+ARRANGEMENT OF SECTIONS
+CHAPTER IX
+PENALTIES, COMPENSATION AND ADJUDICATION
+43. Penalty and compensation for damage to computer, computer system, etc.—If any person without
+permission of the owner accesses such computer, he shall be liable to pay damages by way of compensation.
+2. Subs. by Act 10 of 2009, s. 21, for certain words (w.e.f. 27-10-2009).
+17
+[43A. Compensation for failure to protect data.—Where a body corporate is negligent in implementing
+reasonable security practices, it shall be liable to pay damages. The damages shall be paid to the person
+so affected. No limit applies to the compensation payable.
+"""
+
+RECORD = """Section: IPC 302
+Offense: Murder
+Punishment: Death or imprisonment for life, and fine.
+Section: IPC 379
+Offense: Theft
+Punishment: Imprisonment up to three years, or fine, or both.
+"""
+
+
+print("Testing Act Text Chunking...")
+try:
+    # Gazette headings: number, title (with the inserted-section bracket), chapter, footnotes dropped
+    sections = split_sections(GAZETTE, "gazette")
+    assert [s["number"] for s in sections] == ["43", "43A"], sections
+    assert sections[1]["title"] == "Compensation for failure to protect data", sections[1]["title"]
+    assert sections[0]["chapter"] == "Chapter IX - Penalties, Compensation And Adjudication", sections[0]["chapter"]
+    assert "Subs. by" not in sections[0]["text"] and not sections[0]["text"].endswith("17")
+    assert HEADING_PATTERNS["gazette"].search("1. Short title.—This Act") is not None
+
+    # Record headings: "Section: IPC n" with the offense as the title
+    records = split_sections(RECORD, "record")
+    assert [(s["number"], s["title"]) for s in records] == [("302", "Murder"), ("379", "Theft")], records
+    assert split_sections("No headings here.", "record")[0]["number"] is None
+
+    # Packed pieces stay within the budget; a sentence longer than the budget is split on words
+    text = "First short sentence here. " + " ".join(f"Word{i}" for i in range(25)) + ". Last one."
+    pieces = pack_sentences(text, 10, count_words)
+    assert all(count_words(p) <= 10 for p in pieces), pieces
+    assert " ".join(pieces).split() == text.split(), "no words lost or reordered"
+    assert pieces[0] == "First short sentence here.", pieces
+
+    # Every chunk (heading prefix included) fits the model window and carries its section metadata
+    chunks = list(chunk_act(GAZETTE, "IT Act, 2000", count_words, max_tokens=40))
+    assert all(count_words(c["document"]) + SPECIAL_TOKENS <= 40 for c in chunks), chunks
+    assert {c["section"] for c in chunks} == {"43", "43A"}
+    for c in chunks:
+        assert c["document"].startswith(f"Statute: IT Act, 2000, Section {c['section']} ({c['section_title']}). Text: ")
+        assert c["chapter"].startswith("Chapter IX") and 0 <= c["part"] < c["parts"]
+    assert max(c["parts"] for c in chunks if c["section"] == "43A") > 1
+    print("SUCCESS")
+except Exception as e:
+    print(f"FAILED: {e}")
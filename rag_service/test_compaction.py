@@ -0,0 +1,112 @@
+import os
+import json
+import shutil
+import sqlite3
+import tempfile
+
+from compaction import TombstoneLog, compact_collections, vacuum_doc_store
+from ingestion import GoldenJudgmentSource, IncrementalIngestor
+
+
+class FakeVectors(list):
+    def tolist(self):
+        return list(self)
+
+
+class FakeProvider:
+    def embed(self, texts):
+        return FakeVectors([[float(len(t))] for t in texts])
+
+
+class FakeCollection:
+    def __init__(self, name="legal_knowledge", metadata=None):
+        self.name = name
+        self.metadata = metadata
+        self.rows = {}
+
+    def count(self):
+        return len(self.rows)
+
+    def get(self, include=None, limit=None, offset=0):
+        ids = sorted(self.rows)[offset:offset + limit]
+        return {"ids": ids, "documents": [self.rows[i][0] for i in ids],
+                "metadatas": [self.rows[i][1] for i in ids], "embeddings": [self.rows[i][2] for i in ids]}
+
+    def upsert(self, ids, documents, metadatas, embeddings):
+        self.rows.update({i: row for i, row in zip(ids, zip(documents, metadatas, embeddings))})
+
+    add = upsert
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self.rows.pop(doc_id, None)
+
+
+class FakeClient:
+    def __init__(self, *collections):
+        self.collections = {c.name: c for c in collections}
+
+    def list_collections(self):
+        return list(self.collections.values())
+
+    def get_collection(self, name, embedding_function=None):
+        return self.collections[name]
+
+    def create_collection(self, name, embedding_function=None, metadata=None):
+        self.collections[name] = FakeCollection(name, metadata)
+        return self.collections[name]
+
+
+def write_golden(path, topics):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([{"keywords": [k], "case_laws": [{"title": t, "summary": f"{t} held ..."} for t in titles]}
+                   for k, titles in topics], f)
+
+
+print("Testing Stable IDs, Tombstones and Compaction...")
+tmp = tempfile.mkdtemp()
+try:
+    golden = os.path.join(tmp, "golden_dataset.json")
+    write_golden(golden, [("murder", ["Case A", "Case B"]), ("bail", ["Case C"])])
+    collection = FakeCollection(metadata={"hnsw:space": "l2"})
+    tombstones = TombstoneLog(os.path.join(tmp, "tombstones.ndjson"))
+    ingestor = IncrementalIngestor(collection, FakeProvider(), tombstones=tombstones)
+    ingestor.ingest(GoldenJudgmentSource(golden))
+    first_ids = set(collection.rows)
+
+    # Reordering the input re-keys nothing
+    write_golden(golden, [("bail", ["Case C"]), ("murder", ["Case B", "Case A"])])
+    stats = IncrementalIngestor(collection, FakeProvider(), tombstones=tombstones).ingest(GoldenJudgmentSource(golden))
+    assert stats["upserted"] == 0 and stats["deleted"] == 0 and set(collection.rows) == first_ids, stats
+
+    # Removed records are deleted and tombstoned
+    write_golden(golden, [("murder", ["Case A"])])
+    stats = IncrementalIngestor(collection, FakeProvider(), tombstones=tombstones).ingest(GoldenJudgmentSource(golden))
+    assert stats["deleted"] == 2 and tombstones.pending() == 2 and collection.count() == 1, stats
+    assert tombstones.pending(live_ids=set(collection.rows)) == 2
+
+    # Compaction copies only live documents, keeping collection metadata
+    target = FakeClient()
+    copied = compact_collections(FakeClient(collection), target, ["legal_knowledge", "legal_judgments"])
+    assert copied == {"legal_knowledge": 1}, copied
+    rebuilt = target.collections["legal_knowledge"]
+    assert rebuilt.rows == collection.rows and rebuilt.metadata == {"hnsw:space": "l2"}
+    tombstones.clear()
+    assert tombstones.pending() == 0
+
+    db = os.path.join(tmp, "docstore.sqlite")
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE chunks (text TEXT)")
+    conn.executemany("INSERT INTO chunks VALUES (?)", [("x" * 1000,)] * 2000)
+    conn.commit()
+    conn.execute("DELETE FROM chunks")
+    conn.commit()
+    conn.close()
+    reclaimed = vacuum_doc_store(db)
+    print(f"Doc store reclaimed: {reclaimed / 1e6:.1f} MB")
+    assert reclaimed > 1_000_000, reclaimed
+    print("SUCCESS")
+except Exception as e:
+    print(f"FAILED: {e}")
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
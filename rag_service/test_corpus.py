@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import corpus as corpus_module
+from corpus import Corpus, CorpusVectorStore, write_corpus_from_collection
+from vector_store import MmapVectorStore
+
+
+class FakeCollection:
+    """The parts of a Chroma collection write_corpus_from_collection() pages through"""
+
+    def __init__(self, n, dim):
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(n, dim)).astype(np.float32)
+        self.embeddings = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.ids = [f"statute_bns_{i}" for i in range(n)]
+        self.documents = [f"Statute: BNS Section {i}" for i in range(n)]
+        self.metadatas = [{"type": "statute" if i % 3 else "judgment", "law": "BNS", "bns_section": str(i)} for i in range(n)]
+        self.metadata = {"embedding:model": "all-MiniLM-L6-v2", "embedding:normalized": True}
+
+    def count(self):
+        return len(self.ids)
+
+    def get(self, include=None, limit=None, offset=0):
+        rows = slice(offset, offset + limit)
+        return {"ids": self.ids[rows], "documents": self.documents[rows], "metadatas": self.metadatas[rows],
+                "embeddings": self.embeddings[rows].tolist()}
+
+
+print("Testing Columnar Corpus...")
+tmp = tempfile.mkdtemp()
+batch_rows = corpus_module.BATCH_ROWS
+try:
+    collection = FakeCollection(250, 16)
+    path = os.path.join(tmp, "corpus.arrow")
+    assert write_corpus_from_collection(collection, path, page_size=64) == 250
+
+    corpus = Corpus(path)
+    embeddings = corpus.embeddings()
+    assert corpus.count() == 250 and corpus.dimension == 16
+    assert not embeddings.flags.owndata, "Single-batch corpus should be a view of the mapped file"
+    assert np.allclose(embeddings, collection.embeddings)
+    row = corpus.table.slice(7, 1).to_pylist()[0]
+    assert (row["type"], row["act"], row["section"]) == ("statute", "BNS", "7"), row
+
+    # Index backends built from the corpus answer like the directory-based mmap index
+    MmapVectorStore.build(os.path.join(tmp, "mmap"), *corpus.export())
+    mmap_store = MmapVectorStore(os.path.join(tmp, "mmap"))
+    corpus_store = CorpusVectorStore(path)
+    queries = collection.embeddings[:3]
+    a = mmap_store.query(query_embeddings=queries, n_results=5, where={"type": "judgment"})
+    b = corpus_store.query(query_embeddings=queries, n_results=5, where={"type": "judgment"})
+    assert a["ids"] == b["ids"] and a["documents"] == b["documents"], (a["ids"], b["ids"])
+
+    # Corpora streamed in several batches are merged into one, so they still map without a copy
+    corpus_module.BATCH_ROWS = 100
+    write_corpus_from_collection(collection, path, page_size=64)
+    merged = Corpus(path)
+    assert merged.table.column("embedding").num_chunks == 1 and not merged.embeddings().flags.owndata
+    assert np.allclose(merged.embeddings(), collection.embeddings) and merged.ids() == collection.ids
+    print("SUCCESS")
+except Exception as e:
+    print(f"FAILED: {e}")
+finally:
+    corpus_module.BATCH_ROWS = batch_rows
+    shutil.rmtree(tmp, ignore_errors=True)
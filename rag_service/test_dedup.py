@@ -0,0 +1,56 @@
+from ingestion import DocumentSource
+from dedup import NearDuplicateFilter, dedup_sources
+
+
+class CaseSource(DocumentSource):
+    name = "cases"
+    id_prefixes = ("case_",)
+    deduplicate = True
+    merge_fields = ("title",)
+
+    def documents(self):
+        for i in range(40):
+            # Templated summaries that differ only in the case title
+            yield (f"case_{i}", f"Case {i}: A landmark case regarding Murder. The court held verifyable observations "
+                                f"on the matter and the prosecution proved the guilt beyond reasonable doubt.",
+                   {"type": "judgment", "title": f"Case {i}"})
+        yield ("case_real", "The death penalty may be imposed only in the rarest of rare cases, when the "
+                            "alternative option of life imprisonment is unquestionably foreclosed.",
+               {"type": "judgment", "title": "Bachan Singh vs State of Punjab"})
+
+    def dedup_text(self, text, metadata):
+        return text.split(": ", 1)[-1]
+
+
+class RepeatingSource(CaseSource):
+    def documents(self):
+        # Source files that list the same record twice
+        yield from super().documents()
+        yield from super().documents()
+
+
+class StatuteSource(CaseSource):
+    name = "statutes"
+    deduplicate = False
+
+
+print("Testing Near-Duplicate Elimination...")
+try:
+    source = NearDuplicateFilter(CaseSource())
+    docs = list(source.documents())
+    print(f"Report: {source.report}")
+    assert [d[0] for d in docs] == ["case_0", "case_real"], [d[0] for d in docs]
+    canonical = docs[0][2]
+    assert canonical["duplicates"] == 39, canonical
+    assert canonical["merged_title"].startswith("Case 1; Case 2"), canonical["merged_title"]
+    assert "duplicates" not in docs[1][2]
+
+    repeated = NearDuplicateFilter(RepeatingSource())
+    ids = [d[0] for d in repeated.documents()]
+    assert ids == ["case_0", "case_real"] and repeated.report["kept"] == len(ids), (ids, repeated.report)
+
+    wrapped = dedup_sources([CaseSource(), StatuteSource()])
+    assert isinstance(wrapped[0], NearDuplicateFilter) and isinstance(wrapped[1], StatuteSource)
+    print("SUCCESS")
+except Exception as e:
+    print(f"FAILED: {e}")
@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+
+from doc_store import DocStore
+from ingestion import DocumentSource, IncrementalIngestor
+
+
+class FakeVectors(list):
+    def tolist(self):
+        return list(self)
+
+
+class FakeProvider:
+    def embed(self, texts):
+        return FakeVectors([[0.0] for _ in texts])
+
+
+class FakeCollection:
+    def __init__(self):
+        self.rows = {}
+
+    def count(self):
+        return len(self.rows)
+
+    def get(self, include=None, limit=None, offset=0):
+        ids = sorted(self.rows)[offset:offset + limit]
+        return {"ids": ids, "metadatas": [self.rows[i] for i in ids]}
+
+    def upsert(self, ids, documents, metadatas, embeddings):
+        self.rows.update(zip(ids, metadatas))
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self.rows.pop(doc_id, None)
+
+
+class JudgmentChunks(DocumentSource):
+    name = "judgment_texts"
+    id_prefixes = ("judgment_text_",)
+    hierarchical = True
+
+    def __init__(self, parts):
+        self.parts = parts
+
+    def documents(self):
+        for position in range(self.parts):
+            yield (f"judgment_text_a_{position}", f"P{position}",
+                   {"type": "judgment", "title": "State vs A", "parent_id": "judgment_text_a",
+                    "position": position, "parts": self.parts, "tokens": 100})
+
+
+print("Testing Parent/Child Doc Store...")
+tmp = tempfile.mkdtemp()
+try:
+    store = DocStore(os.path.join(tmp, "docstore.sqlite"))
+    collection = FakeCollection()
+    IncrementalIngestor(collection, FakeProvider(), batch_size=4, doc_store=store).ingest(JudgmentChunks(10))
+    assert store.count() == {"parents": 1, "chunks": 10}, store.count()
+
+    reader = DocStore(store.path, readonly=True)
+    hood = reader.neighbourhood("judgment_text_a_5", max_tokens=350)
+    print(f"Neighbourhood of chunk 5 (350 tokens): {hood['text']}")
+    assert (hood["start"], hood["end"], hood["tokens"]) == (4, 6, 300), hood
+    assert hood["parent"]["title"] == "State vs A" and "position" not in hood["parent"]
+    edge = reader.neighbourhood("judgment_text_a_0", max_tokens=350)
+    assert edge["text"] == "P0 P1 P2", edge["text"]
+    assert reader.neighbourhood("judgment_text_missing", 350) is None
+
+    # Shrinking the judgment deletes the trailing chunks from the index and the doc store
+    IncrementalIngestor(collection, FakeProvider(), batch_size=4, doc_store=store).ingest(JudgmentChunks(6))
+    assert store.count()["chunks"] == 6 and len(collection.rows) == 6
+    # A doc store added to an existing index is filled even though nothing changed
+    fresh = DocStore(os.path.join(tmp, "fresh.sqlite"))
+    stats = IncrementalIngestor(collection, FakeProvider(), doc_store=fresh).ingest(JudgmentChunks(6))
+    assert stats["upserted"] == 6 and fresh.count()["chunks"] == 6, stats
+    print("SUCCESS")
+except Exception as e:
+    print(f"FAILED: {e}")
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
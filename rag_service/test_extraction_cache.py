@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+
+import text_processor
+from extraction_cache import ExtractionCache
+from text_processor import TextProcessor
+
+
+def make_pdf(pages) -> bytes:
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    for kind in pages:
+        page = doc.new_page()
+        if kind == "text":
+            page.insert_textbox(fitz.Rect(40, 40, 550, 800), "The appeal under Section 302 IPC is dismissed. " * 8, fontsize=9)
+        else:
+            # The same "scan" in every document
+            pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 120, 160), False)
+            pix.clear_with(180)
+            page.insert_image(page.rect, pixmap=pix)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+print("Testing Extraction Cache...")
+tmp = tempfile.mkdtemp()
+try:
+    cache = ExtractionCache(os.path.join(tmp, "lru.sqlite"), max_bytes=1200)
+    assert cache.get("doc:missing") is None
+    for key in "abcd":
+        cache.put(f"doc:{key}", "pymupdf", {"text": os.urandom(200).hex()})  # ~250 bytes compressed
+    assert cache.get("doc:a")[0] == "pymupdf"  # a is now the most recently used
+    cache.put("doc:e", "ocr", {"text": os.urandom(200).hex()})
+    assert cache.get("doc:b") is None and cache.get("doc:a") is not None, "least recently used entry goes first"
+    stats = cache.stats()
+    assert stats["bytes"] <= 1200 and stats["evictions"] >= 1 and stats["doc_hits"] == 2, stats
+
+    tp = TextProcessor()
+    tp.cache = ExtractionCache(os.path.join(tmp, "extraction.sqlite"))
+    data = make_pdf(["text", "text"])
+    first = tp.extract_and_clean_pdf(data, "judgment.pdf")
+    again = tp.extract_and_clean_pdf(data, "judgment (1).pdf")
+    assert first == again and first[2] == "pymupdf" and "Section 302" in first[1], first
+    assert tp.cache.counters["doc_hits"] == 1 and tp.last_extraction_stats["pages"] == 2
+
+    # Scanned pages: not cached while OCR is unavailable, then cached per page across documents
+    real_ocr, available = text_processor.ocr_image, text_processor._OCR_AVAILABLE
+    try:
+        text_processor._OCR_AVAILABLE = False
+        scanned = make_pdf(["text", "scan"])
+        tp.extract_and_clean_pdf(scanned, "scan.pdf")
+        assert tp.cache.stats()["entries"] == 1, "incomplete extractions must not be cached"
+
+        text_processor._OCR_AVAILABLE = True
+        text_processor.ocr_image = lambda image, languages: "Certified copy of the order dated 1 March 2024"
+        text, cleaned, method = tp.extract_and_clean_pdf(scanned, "scan.pdf")
+        assert method == "hybrid" and "Certified copy" in text, method
+        tp.extract_and_clean_pdf(make_pdf(["scan", "text", "text"]), "bundle.pdf")
+        print(f"Cache: {tp.cache.stats()}")
+        assert tp.last_extraction_stats["ocr_pages_cached"] == 1, tp.last_extraction_stats
+    finally:
+        text_processor.ocr_image, text_processor._OCR_AVAILABLE = real_ocr, available
+    print("SUCCESS")
+except Exception as e:
+    print(f"FAILED: {e}")
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
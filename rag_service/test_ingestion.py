@@ -0,0 +1,84 @@
+from ingestion import DocumentSource, IncrementalIngestor
+
+
+class FakeVectors(list):
+    def tolist(self):
+        return list(self)
+
+
+class FakeProvider:
+    def __init__(self):
+        self.embedded = 0
+
+    def embed(self, texts):
+        self.embedded += len(texts)
+        return FakeVectors([[float(len(t))] for t in texts])
+
+
+class FakeCollection:
+    """In-memory stand-in for the parts of a Chroma collection the ingestor uses"""
+
+    def __init__(self):
+        self.rows = {}
+        self.upsert_sizes = []
+
+    def count(self):
+        return len(self.rows)
+
+    def get(self, include=None, limit=None, offset=0):
+        ids = sorted(self.rows)[offset:offset + limit]
+        return {"ids": ids, "metadatas": [self.rows[i][1] for i in ids]}
+
+    def upsert(self, ids, documents, metadatas, embeddings):
+        self.upsert_sizes.append(len(ids))
+        for doc_id, doc, meta in zip(ids, documents, metadatas):
+            self.rows[doc_id] = (doc, meta)
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self.rows.pop(doc_id, None)
+
+
+class ListSource(DocumentSource):
+    name = "sections"
+    id_prefixes = ("sec_",)
+
+    def __init__(self, texts):
+        self.texts = texts
+
+    def documents(self):
+        for key, text in self.texts.items():
+            yield f"sec_{key}", text, {"type": "statute"}
+
+
+class RepeatingSource(ListSource):
+    def documents(self):
+        yield from super().documents()
+        yield "sec_0", "Section 0 text", {"type": "statute"}  # exact repeat
+        yield "sec_1", "A different section under the same heading", {"type": "statute"}
+
+
+print("Testing Incremental Ingestion...")
+try:
+    collection, provider = FakeCollection(), FakeProvider()
+    texts = {i: f"Section {i} text" for i in range(10)}
+    collection.rows["sec_legacy"] = ("untagged legacy document", {})
+
+    stats = IncrementalIngestor(collection, provider, batch_size=4).ingest(ListSource(texts))
+    print(f"First run:  {stats}")
+    assert stats["upserted"] == 10 and stats["deleted"] == 1, stats
+    assert max(collection.upsert_sizes) <= 4, f"Unbounded batch: {collection.upsert_sizes}"
+
+    texts[3] = "Section 3 amended text"
+    del texts[7]
+    stats = IncrementalIngestor(collection, provider, batch_size=4).ingest(ListSource(texts))
+    print(f"Second run: {stats}")
+    assert (stats["unchanged"], stats["upserted"], stats["deleted"]) == (8, 1, 1), stats
+    assert provider.embedded == 11, f"Unchanged documents were re-embedded ({provider.embedded})"
+    assert collection.rows["sec_3"][0] == "Section 3 amended text" and "sec_7" not in collection.rows
+
+    stats = IncrementalIngestor(FakeCollection(), provider).ingest(RepeatingSource({0: "Section 0 text", 1: "Section 1 text"}))
+    assert (stats["seen"], stats["duplicates"], stats["collisions"]) == (2, 2, 1), stats
+    print("SUCCESS")
+except Exception as e:
+    print(f"FAILED: {e}")
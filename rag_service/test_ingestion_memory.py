@@ -0,0 +1,102 @@
+"""
+Memory ceiling for streaming ingestion: a synthetic golden_dataset.json-shaped corpus (1 GB by default,
+STREAM_TEST_MB to change) is pushed through IncrementalIngestor, and peak RSS growth must stay under
+MEMORY_CEILING_MB no matter how large the file is.
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+
+from ingestion import GoldenJudgmentSource, IncrementalIngestor
+
+TARGET_MB = int(os.getenv("STREAM_TEST_MB", "1024"))
+CEILING_MB = int(os.getenv("MEMORY_CEILING_MB", "256"))
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # KB on Linux, bytes on macOS
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        import psutil
+
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+
+
+def write_corpus(path: str, target_bytes: int) -> int:
+    """Stream a JSON array of topic groups to disk without holding it in memory. Returns the case count."""
+    filler = "The appellant contended that the evidence on record did not establish the charge. " * 100
+    cases = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("[\n")
+        while f.tell() < target_bytes:
+            group = {
+                "keywords": ["murder", "supreme court", f"case {cases}"],
+                "case_laws": [{"title": f"Synthetic Case {cases + i}", "summary": f"{cases + i}: {filler}"} for i in range(3)],
+            }
+            f.write(("," if cases else "") + json.dumps(group) + "\n")
+            cases += 3
+        f.write("]\n")
+    return cases
+
+
+class NullVectors:
+    def __init__(self, n):
+        self.n = n
+
+    def tolist(self):
+        return [[0.0]] * self.n
+
+
+class NullProvider:
+    def embed(self, texts):
+        return NullVectors(len(texts))
+
+
+class DiscardingCollection:
+    """Accepts writes without keeping documents, so only the ingestion pipeline's memory is measured"""
+
+    def __init__(self):
+        self.written = 0
+
+    def count(self):
+        return 0
+
+    def get(self, include=None, limit=None, offset=0):
+        return {"ids": [], "metadatas": []}
+
+    def upsert(self, ids, documents, metadatas, embeddings):
+        self.written += len(ids)
+
+    def delete(self, ids):
+        pass
+
+
+print(f"Testing Streaming Ingestion Memory ({TARGET_MB} MB corpus, {CEILING_MB} MB ceiling)...")
+try:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "golden_dataset.json")
+        cases = write_corpus(path, TARGET_MB * 1024 * 1024)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        baseline = peak_rss_mb()
+        print(f"Corpus: {size_mb:.0f} MB, {cases} cases; baseline peak RSS {baseline:.0f} MB")
+
+        collection = DiscardingCollection()
+        start = time.perf_counter()
+        stats = IncrementalIngestor(collection, NullProvider(), batch_size=256).ingest(GoldenJudgmentSource(path))
+        elapsed = time.perf_counter() - start
+        growth = peak_rss_mb() - baseline
+        print(f"Ingested {stats['upserted']} documents in {elapsed:.1f}s ({size_mb / elapsed:.0f} MB/s); "
+              f"peak RSS growth {growth:.0f} MB")
+
+        assert stats["upserted"] == cases == collection.written, stats
+        assert growth < CEILING_MB, f"Peak RSS grew by {growth:.0f} MB (ceiling {CEILING_MB} MB)"
+    print("SUCCESS")
+except Exception as e:
+    print(f"FAILED: {e}")
@@ -0,0 +1,164 @@
+import os
+import shutil
+import tempfile
+
+import index_snapshots
+from ingestion import IncrementalIngestor
+from live_ingest import BatchSource, FileLock, JobStore, JobWriter, LiveIngestor, validate_record
+
+
+class FakeVectors(list):
+    def tolist(self):
+        return list(self)
+
+
+class FakeProvider:
+    def embed(self, texts):
+        return FakeVectors([[0.0] for _ in texts])
+
+
+class FakeCollection:
+    def __init__(self, rows=None):
+        self.rows = dict(rows or {})
+
+    def count(self):
+        return len(self.rows)
+
+    def get(self, include=None, limit=None, offset=0):
+        ids = sorted(self.rows)[offset:offset + limit]
+        return {"ids": ids, "metadatas": [self.rows[i] for i in ids]}
+
+    def upsert(self, ids, documents, metadatas, embeddings):
+        self.rows.update(zip(ids, metadatas))
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self.rows.pop(doc_id, None)
+
+
+print("Testing Live Ingestion Jobs...")
+tmp = tempfile.mkdtemp()
+try:
+    doc_id, text, meta = validate_record({"type": "statute", "text": " BNS 303: Theft ", "act": "BNS",
+                                          "section": "303", "keywords": ["theft", "property"]})
+    assert doc_id.startswith("live_statute_303_") and text == "BNS 303: Theft", doc_id
+    assert meta == {"type": "statute", "act": "BNS", "section": "303", "keywords": "theft, property"}, meta
+    for bad in ({"type": "order", "text": "x"}, {"type": "statute", "text": ""},
+                {"type": "statute", "text": "x", "content_hash": "1"}, {"type": "statute", "text": "x", "id": "a b"}):
+        try:
+            validate_record(bad)
+            raise AssertionError(f"accepted {bad}")
+        except ValueError:
+            pass
+
+    # The "published" index is replaced once per commit window, never modified in place
+    published = {"version": 0, "collection": FakeCollection()}
+
+    class FakeBuilder:
+        """Working copy of the published collection, swapped in by publish()"""
+
+        def __init__(self):
+            self.staged = FakeCollection(published["collection"].rows)
+            self.ingestor = IncrementalIngestor(self.staged, FakeProvider())
+            self.upserted = 0
+
+        def write(self, batch):
+            stats = self.ingestor.ingest(BatchSource(batch), prune=False)
+            self.upserted += stats["upserted"]
+            return stats
+
+        def publish(self):
+            if not self.upserted:
+                return None
+            published.update(version=published["version"] + 1, collection=self.staged)
+            return published["version"]
+
+        def abort(self):
+            pass
+
+    published["collection"].rows["statute_bns_1"] = {"type": "statute", "ingest_source": "statutes"}
+    ingestor = LiveIngestor(builder=FakeBuilder, jobs_dir=tmp, batch_size=4, commit_interval=0.5)
+    records = [{"type": "judgment", "title": f"Case {i}", "text": f"Held {i}"} for i in range(10)]
+    job = ingestor.submit(records + [{"type": "judgment"}])
+    assert (job["state"], job["accepted"], job["rejected"], job["batches"]) == ("queued", 10, 1, 3), job
+    # Queued inside the first job's window: published in the same snapshot
+    second = ingestor.submit([{"type": "statute", "section": "304", "text": "BNS 304: Snatching"}])
+    assert ingestor.wait(timeout=10)
+    status = ingestor.status(job["job_id"])
+    print(f"Job: {status['state']}, {status['batches_committed']} batches, {status['upserted']} upserted")
+    assert (status["state"], status["batches_committed"], status["upserted"]) == ("done", 3, 10), status
+    assert published["version"] == 1 and published["collection"].count() == 12, "one snapshot, other sources kept"
+    assert status["index_version"] == ingestor.status(second["job_id"])["index_version"] == 1
+
+    # Resubmitting the same documents changes nothing and publishes nothing
+    ingestor.submit(records[:4])
+    assert ingestor.wait(timeout=10)
+    assert published["version"] == 1
+    assert ingestor.submit([{"type": "x"}])["state"] == "rejected"
+    assert ingestor.status("not-a-job") is None
+
+    # A window that cannot be served is never published; its jobs fail and keep their spools
+    class BrokenBuilder(FakeBuilder):
+        def publish(self):
+            raise RuntimeError("reload failed")
+
+    broken = LiveIngestor(builder=BrokenBuilder, jobs_dir=tmp, batch_size=4, commit_interval=0)
+    failed = broken.submit([{"type": "judgment", "title": "Case 99", "text": "Held 99"}])
+    assert broken.wait(timeout=10)
+    assert broken.status(failed["job_id"])["state"] == "failed" and published["version"] == 1
+    assert os.path.exists(broken.jobs.spool_path(failed["job_id"]))
+
+    # A job whose status file disappeared is skipped; the rest of its window is still published
+    lost, kept = ingestor.new_job(), ingestor.new_job()
+    lost.add({"type": "judgment", "title": "Case 50", "text": "Held 50"}, 1)
+    kept.add({"type": "judgment", "title": "Case 51", "text": "Held 51"}, 1)
+    ingestor._release(lost.job_id)
+    lost.close()
+    os.remove(ingestor.jobs.status_path(lost.job_id))
+    ingestor._ensure_started()
+    ingestor._queue.put(lost.job_id)
+    ingestor.enqueue(kept)
+    assert ingestor.wait(timeout=10)
+    assert ingestor.status(kept.job_id)["state"] == "done" and published["version"] == 2
+
+    # Jobs left queued by a worker process that died are re-queued once; a live owner's jobs are not
+    restart_dir = os.path.join(tmp, "restart")
+    store = JobStore(restart_dir)
+    orphan, owned = JobWriter(store), JobWriter(store)
+    orphan.add({"type": "judgment", "title": "Case 60", "text": "Held 60"}, 1)
+    owned.add({"type": "judgment", "title": "Case 61", "text": "Held 61"}, 1)
+    orphan.close()
+    owned.close()
+    owner = FileLock(store.lock_path(owned.job_id))
+    assert owner.acquire(blocking=False)
+    restarted = LiveIngestor(builder=FakeBuilder, jobs_dir=restart_dir, batch_size=4, commit_interval=0)
+    other = LiveIngestor(builder=FakeBuilder, jobs_dir=restart_dir, batch_size=4, commit_interval=0)
+    assert restarted.recover() == [orphan.job_id] and other.recover() == []
+    assert restarted.wait(timeout=10)
+    assert restarted.status(orphan.job_id)["state"] == "done" and restarted.status(owned.job_id)["state"] == "queued"
+    owner.release()
+
+    # Retention: CURRENT, the newest N before it and anything published after it survive
+    root, index_snapshots.SNAPSHOT_ROOT = index_snapshots.SNAPSHOT_ROOT, os.path.join(tmp, "snapshots")
+    try:
+        versions = [f"20260101-00000{i}-abcdef" for i in range(6)]
+        for version in versions:
+            os.makedirs(index_snapshots.snapshot_path(version))
+        index_snapshots.set_current(versions[4])
+        # The version CURRENT replaced (and anything newer) may still be served by other workers
+        assert index_snapshots.prune_snapshots(keep=0, before=versions[1]) == versions[:1]
+        assert index_snapshots.prune_snapshots(keep=2) == versions[1:2]
+        assert sorted(os.listdir(index_snapshots.SNAPSHOT_ROOT)) == sorted(versions[2:] + ["CURRENT"])
+    finally:
+        index_snapshots.SNAPSHOT_ROOT = root
+
+    lock_path = os.path.join(tmp, ".ingest.lock")
+    with FileLock(lock_path):
+        pass
+    with FileLock(lock_path):
+        pass
+    print("SUCCESS")
+except Exception as e:
+    print(f"FAILED: {e}")
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
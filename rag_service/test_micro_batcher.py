@@ -0,0 +1,39 @@
+import time
+import asyncio
+import numpy as np
+from micro_batcher import EmbeddingMicroBatcher
+
+
+class FakeProvider:
+    """Sleeps like a CPU forward pass and records the batch sizes it was called with"""
+
+    def __init__(self):
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(len(texts))
+        time.sleep(0.02)
+        return np.array([[float(len(t)), 1.0] for t in texts], dtype=np.float32)
+
+
+async def main():
+    provider = FakeProvider()
+    batcher = EmbeddingMicroBatcher(provider, max_batch_size=16, max_wait_ms=5)
+
+    texts = [f"query {'x' * i}" for i in range(40)]
+    start = time.time()
+    vectors = await asyncio.gather(*(batcher.embed(t) for t in texts))
+    elapsed = time.time() - start
+
+    assert all(v[0] == float(len(t)) for v, t in zip(vectors, texts)), "Vectors returned to the wrong caller"
+    assert len(provider.calls) < len(texts), f"No batching happened: {provider.calls}"
+    print(f"40 concurrent requests -> {len(provider.calls)} forward passes {provider.calls} in {elapsed:.3f}s")
+    print(f"Stats: {batcher.stats()}")
+
+
+print("Testing Embedding Micro-Batcher...")
+try:
+    asyncio.run(main())
+    print("SUCCESS")
+except Exception as e:
+    print(f"FAILED: {e}")
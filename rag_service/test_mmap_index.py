@@ -0,0 +1,41 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import vector_store
+from vector_store import MmapVectorStore
+
+
+print("Testing Memory-Mapped Vector Index...")
+tmp = tempfile.mkdtemp()
+block_rows = vector_store.SCORE_BLOCK_ROWS
+try:
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(300, 16)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [f"statute_bns_{i}" for i in range(300)]
+    documents = [f"Statute: BNS Section {i}" for i in range(300)]
+    metadatas = [{"type": "statute" if i % 3 else "judgment", "bns_section": str(i)} for i in range(300)]
+
+    MmapVectorStore.build(os.path.join(tmp, "mmap"), ids, vectors.tolist(), documents, metadatas)
+    full = MmapVectorStore(os.path.join(tmp, "mmap"))
+    queries = vectors[:3]
+    a = full.query(query_embeddings=queries, n_results=5, where={"type": "judgment"})
+    assert a["ids"][0][0] == "statute_bns_0" and all(int(i.rsplit("_", 1)[1]) % 3 == 0 for i in a["ids"][1]), a["ids"]
+
+    # A float16 index stays memory-mapped (shared page cache) and is scored block by block
+    vector_store.SCORE_BLOCK_ROWS = 64
+    MmapVectorStore.build(os.path.join(tmp, "mmap16"), ids, vectors.tolist(), documents, metadatas, dtype="float16")
+    half = MmapVectorStore(os.path.join(tmp, "mmap16"))
+    assert isinstance(half.matrix, np.memmap) and half.matrix.dtype == np.float16
+    b = half.query(query_embeddings=queries, n_results=5, where={"type": "judgment"})
+    assert b["ids"] == a["ids"] and np.allclose(b["distances"], a["distances"], atol=1e-2), (b["ids"], a["ids"])
+    assert half.get(ids=["statute_bns_4"], include=["embeddings"])["embeddings"].dtype == np.float32
+    print("SUCCESS")
+except Exception as e:
+    print(f"FAILED: {e}")
+finally:
+    vector_store.SCORE_BLOCK_ROWS = block_rows
+    shutil.rmtree(tmp, ignore_errors=True)
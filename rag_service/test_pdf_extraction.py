@@ -0,0 +1,99 @@
+import os
+
+# OCR is stubbed below; keep its output out of the service's extraction cache
+os.environ["EXTRACTION_CACHE"] = "0"
+
+import text_processor
+from text_processor import (TextProcessor, choose_dpi, choose_languages, classify_page, line_height_px,
+                            ocr_available, render_page)
+
+
+def make_pdf() -> bytes:
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    body = "The appellant was convicted under Section 302 of the Indian Penal Code. " * 6
+    for kind in ("text", "image", "text", "garbage", "blank", "text"):
+        page = doc.new_page()
+        if kind == "text":
+            page.insert_textbox(fitz.Rect(40, 40, 550, 800), body, fontsize=9)
+        elif kind == "image":
+            # A scan: one full-page image and a short stamp in the text layer
+            pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 200, 200), False)
+            pix.clear_with(200)
+            page.insert_image(page.rect, pixmap=pix)
+            page.insert_text((40, 40), "Certified copy", fontsize=9)
+        elif kind == "garbage":
+            page.insert_textbox(fitz.Rect(40, 40, 550, 800), "(cid:71)(cid:82)(cid:70) " * 40, fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+# Pool workers are spawned and re-import this module
+if __name__ == "__main__":
+    print("Testing Hybrid Per-Page PDF Extraction...")
+    try:
+        assert classify_page("(cid:3)(cid:4)(cid:5) (cid:6)", False) == "garbage"
+        assert classify_page("धारा 302 के अंतर्गत हत्या के लिए दंड का प्रावधान है " * 3, False) == "text"
+        assert classify_page("", True) == "image" and classify_page("  ", False) == "blank"
+
+        # Adaptive OCR: one language for a confidently detected script, DPI scaled to the text size
+        both = "eng+hin"
+        assert choose_languages("Latin", 3.0, configured=both) == "eng"
+        assert choose_languages("Devanagari", 3.0, configured=both) == "hin"
+        assert choose_languages("Latin", 0.2, configured=both) == both and choose_languages(None, 0.0, configured=both) == both
+        assert choose_languages("Latin", 3.0, text_hint="धारा (cid:12)", configured=both) == both
+        assert choose_languages("Cyrillic", 5.0, configured=both) == both
+        assert choose_languages("Latin", 3.0, configured="hin") == "hin"
+        import fitz  # PyMuPDF
+        dpis = []
+        for size in (7, 10, 16):
+            with fitz.open() as doc:
+                page = doc.new_page()
+                page.insert_textbox(fitz.Rect(40, 40, 550, 800), "The appellant was convicted under Section 302 of the Penal Code. " * 30,
+                                      fontsize=size)
+                dpis.append(choose_dpi(line_height_px(render_page(page, 150)), 150))
+        print(f"DPI for 7/10/16pt text: {dpis}")
+        assert dpis[0] > dpis[1] > dpis[2] and dpis[1] == 300 and choose_dpi(None) == text_processor.OCR_DPI, dpis
+
+        tp = TextProcessor()
+        data = make_pdf()
+        pages = tp.extract_pages(data, workers=1)
+        stats = tp.last_extraction_stats
+        print(f"Classes: {stats['page_classes']}, methods: {stats['pages_by_method']}")
+        assert stats["page_classes"] == {"text": 3, "image": 1, "garbage": 1, "blank": 1}, stats
+        unread = "ocr" if ocr_available() else "ocr_unavailable"
+        assert [m for _, m in pages] == ["text", unread, "text", unread, "blank", "text"], pages
+        assert "Section 302" in pages[0][0] and "Section 302" in pages[5][0]
+
+        # OCR budget: pages past it are skipped, never silently dropped from the counters
+        pages = tp.extract_pages(data, workers=1, max_ocr_pages=1)
+        assert [m for _, m in pages].count("ocr_skipped") == 1, pages
+
+        # Page-range sharding across the pool returns the same pages in the same order
+        text_processor.PARALLEL_MIN_PAGES = 1
+        parallel = tp.extract_pages(data, workers=2, ocr=False)
+        assert [t for t, _ in parallel] == [t for t, _ in tp.extract_pages(data, workers=1, ocr=False)]
+        assert tp.last_extraction_stats["workers"] == 1 and tp.page_counters["text"] == 12
+        tp.close()
+
+        # In-process OCR path: pages are read one at a time and each page's latency is recorded
+        real_ocr, available = text_processor.ocr_image, text_processor._OCR_AVAILABLE
+        text_processor.ocr_image = lambda image, languages: f"OCR {image.width}x{image.height}"
+        text_processor._OCR_AVAILABLE = True
+        ocr_tp = TextProcessor()
+        try:
+            pages = ocr_tp.extract_pages(data, workers=1)
+        finally:
+            text_processor.ocr_image, text_processor._OCR_AVAILABLE = real_ocr, available
+        assert [m for _, m in pages].count("ocr") == 2 and pages[1][0].startswith("OCR "), pages
+        ocr_stats = ocr_tp.ocr_stats()
+        assert sum(ocr_stats["pages_by_languages"].values()) == 2 == sum(ocr_stats["pages_by_dpi"].values()), ocr_stats
+        assert ocr_stats["pages"] == 2 and ocr_stats["latency_ms"]["p99"] >= ocr_stats["latency_ms"]["p50"], ocr_stats
+
+        text, method = TextProcessor().extract_text_from_pdf(data, "mixed.pdf")
+        assert method in ("pymupdf", "hybrid") and text.count("Section 302") >= 3, method
+        print("SUCCESS")
+    except Exception as e:
+        print(f"FAILED: {e}")
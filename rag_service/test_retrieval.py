@@ -0,0 +1,47 @@
+from retrieval import ShardedRetriever, shard_for
+
+
+class FakeShard:
+    """Returns canned hits (id, squared-L2 distance), nearest first"""
+
+    def __init__(self, hits, space="l2"):
+        self.hits = hits
+        self.metadata = {"hnsw:space": space}
+
+    def count(self):
+        return len(self.hits)
+
+    def query(self, query_embeddings=None, n_results=5, where=None, include=None):
+        hits = self.hits[:n_results]
+        return {
+            "ids": [[h[0] for h in hits]],
+            "documents": [[f"doc {h[0]}" for h in hits]],
+            "metadatas": [[{"id": h[0]} for h in hits]],
+            "distances": [[h[1] for h in hits]],
+        }
+
+
+print("Testing Sharded Retrieval...")
+try:
+    # Judgments are all closer than statutes: a single merged top-k would contain no statute
+    shards = [
+        ("statutes", FakeShard([("bns_103", 0.40), ("bns_101", 0.42)]), None),
+        ("judgments", FakeShard([("j1", 0.10), ("j2", 0.11), ("j3", 0.12), ("j4", 0.13)]), None),
+        # cosine space: 0.15 cosine distance == 0.30 squared L2
+        ("act_chunks", FakeShard([("it_act_0", 0.15)], space="cosine"), None),
+    ]
+    retriever = ShardedRetriever(shards, embedding_function=None,
+                                 shard_k={"statutes": 2, "judgments": 4, "act_chunks": 1})
+    result = retriever.query(query_embeddings=[[0.0, 1.0]], n_results=4)
+    ids, distances = result["ids"][0], result["distances"][0]
+    print(f"Merged: {list(zip(ids, distances))}")
+
+    assert ids[:3] == ["j1", "it_act_0", "bns_103"], f"Shard leaders not placed first: {ids}"
+    assert abs(distances[1] - 0.30) < 1e-9, f"Cosine shard not normalised to L2 scale: {distances[1]}"
+    assert retriever.count() == 7
+    assert shard_for({"type": "judgment"}) == "judgments"
+    assert shard_for({"type": "statute", "source": "IT Act 2000"}) == "act_chunks"
+    assert shard_for({"type": "statute", "source": "Indian Penal Code, 1860"}) == "statutes"
+    print("SUCCESS")
+except Exception as e:
+    print(f"FAILED: {e}")
@@ -0,0 +1,58 @@
+"""
+Startup budget test: importing the service must stay cheap so the port opens in well under a second.
+Heavy libraries (model, vector DB, PDF/OCR, language detection) must only load in the background task.
+
+Usage:
+    python test_startup.py            (budget from STARTUP_IMPORT_BUDGET_MS, default 1500 ms)
+"""
+
+import os
+import sys
+import subprocess
+
+BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500"))
+HEAVY_MODULES = ["chromadb", "sentence_transformers", "torch", "transformers", "onnxruntime",
+                 "lingua", "fitz", "pdfplumber", "pypdf", "pytesseract", "numpy"]
+
+
+def measure_imports(module: str = "main") -> dict:
+    """Run `python -X importtime -c 'import <module>'` and return {module name: cumulative us}"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
+
+
+def test_startup_budget():
+    print("Testing service import time...")
+    cumulative = measure_imports("main")
+
+    total_ms = cumulative.get("main", 0) / 1000
+    slowest = sorted(((v, k) for k, v in cumulative.items() if "." not in k and k != "main"), reverse=True)[:8]
+    print(f"   import main: {total_ms:.0f} ms (budget {BUDGET_MS:.0f} ms)")
+    for us, name in slowest:
+        print(f"      {us / 1000:>8.1f} ms  {name}")
+
+    loaded_heavy = sorted({name.split(".")[0] for name in cumulative} & set(HEAVY_MODULES))
+    assert not loaded_heavy, f"Heavy modules imported at startup: {loaded_heavy}"
+    assert total_ms <= BUDGET_MS, f"Import time {total_ms:.0f} ms exceeds the {BUDGET_MS:.0f} ms budget"
+
+
+if __name__ == "__main__":
+    try:
+        test_startup_budget()
+        print("SUCCESS")
+    except Exception as e:
+        print(f"FAILED: {e}")
+        sys.exit(1)
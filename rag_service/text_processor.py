@@ -1,13 +1,337 @@
 """
 Advanced Text Processing Module for Legal Documents
 Implements 12-stage text cleaning pipeline, language detection, and multi-modal PDF extraction
+
+PDFs are read in one pass with PyMuPDF. Every page is classified from its text layer (usable text,
+image-only, garbage such as "(cid:NN)" runs from fonts without a Unicode map, or blank), and only
+image-only and garbage pages are rendered and OCR'd, each with the languages and DPI chosen from a
+low-resolution probe of that page. Long documents are sharded by page range across a process pool:
+the document is written once to a temp file that every worker opens itself, pages come back with their
+page number and timing, and the text is assembled in page order with a single join.
 """
 
+import os
 import re
+import time
+import uuid
+import hashlib
+import tempfile
+import threading
 import unicodedata
-from typing import Tuple, Optional
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter, deque
+from typing import List, Tuple, Optional, Dict, Any, Union, Iterator, Deque
 import io
 
+from extraction_cache import CACHE_FORMAT, ExtractionCache, file_digest, open_extraction_cache
+
+# Worker processes for native PDF extraction (1 = always in-process)
+PDF_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(max(1, min(8, (os.cpu_count() or 2) // 2)))))
+# Below this many pages the pool's dispatch overhead outweighs the speed-up
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "24"))
+# Shards per worker: more, smaller ranges balance scanned-heavy and text-light parts of a document
+SHARDS_PER_WORKER = 4
+# Fewer characters than this on a page with images means the text is a stamp / header over a scan
+MIN_PAGE_CHARS = int(os.getenv("PDF_MIN_PAGE_CHARS", "80"))
+OCR_DPI = int(os.getenv("PDF_OCR_DPI", "300"))
+OCR_LANGUAGES = os.getenv("OCR_LANGUAGES", "eng+hin")
+# Page classes that are OCR'd
+OCR_CLASSES = ("image", "garbage")
+# Outstanding OCR tasks per worker: enough to keep workers busy, few enough to bound queued work
+OCR_IN_FLIGHT_PER_WORKER = 2
+OCR_LATENCY_WINDOW = 2000
+# Adaptive OCR: a low-resolution probe render per page picks the Tesseract languages (OSD script
+# detection) and the full render's DPI (from text line height), so English-only pages skip the
+# Devanagari model and large print is not rendered at the resolution small print needs
+OCR_ADAPTIVE = os.getenv("PDF_OCR_ADAPTIVE", "1") == "1"
+OCR_PROBE_DPI = int(os.getenv("PDF_OCR_PROBE_DPI", "150"))
+OCR_MIN_DPI = int(os.getenv("PDF_OCR_MIN_DPI", "200"))
+OCR_MAX_DPI = int(os.getenv("PDF_OCR_MAX_DPI", "400"))
+# Rendered height in pixels of one line of ink that Tesseract reads best (10pt body text at 300 DPI)
+OCR_TARGET_LINE_PX = 40
+# OSD script confidence below which a page is read with every configured language
+OCR_SCRIPT_MIN_CONF = float(os.getenv("PDF_OCR_SCRIPT_MIN_CONF", "1.0"))
+SCRIPT_LANGUAGES = {"Latin": "eng", "Devanagari": "hin"}
+DEVANAGARI_PATTERN = re.compile(r'[\u0900-\u097F]')
+# Everything OCR output depends on, part of every extraction cache key
+OCR_SETTINGS = f"{OCR_LANGUAGES}|{OCR_ADAPTIVE}|{OCR_DPI}|{OCR_MIN_DPI}-{OCR_MAX_DPI}|{CACHE_FORMAT}"
+CID_PATTERN = re.compile(r'\(cid:\d+\)')
+
+
+def page_ranges(total_pages: int, shards: int) -> List[Tuple[int, int]]:
+    """Split [0, total_pages) into at most `shards` contiguous (start, stop) ranges of near-equal size"""
+    shards = max(1, min(shards, total_pages))
+    size, extra = divmod(total_pages, shards)
+    ranges, start = [], 0
+    for i in range(shards):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def classify_page(text: str, has_images: bool) -> str:
+    """
+    'text' (usable text layer), 'image' (scan: images and little or no text), 'garbage' (text layer
+    that is mostly (cid:NN) glyph ids, replacement characters or symbols) or 'blank'
+    """
+    stripped = CID_PATTERN.sub("\0", text).strip()
+    if stripped:
+        visible = [c for c in stripped if not c.isspace()]
+        undecodable = sum(1 for c in visible if c in "\0\ufffd" or unicodedata.category(c) == "Co")
+        # Combining marks count as word characters (Devanagari vowel signs are not alphanumeric)
+        wordlike = sum(1 for c in visible if c.isalnum() or unicodedata.category(c).startswith("M"))
+        if undecodable > 0.1 * len(visible) or wordlike < 0.5 * len(visible):
+            return "garbage"
+    if len(stripped) < MIN_PAGE_CHARS and has_images:
+        return "image"
+    return "text" if stripped else "blank"
+
+
+def _open_pdf(source: Union[str, bytes]):
+    import fitz  # PyMuPDF
+
+    return fitz.open(stream=source, filetype="pdf") if isinstance(source, bytes) else fitz.open(source)
+
+
+def page_digests(pdf, page_numbers: List[int]) -> Dict[int, str]:
+    """
+    {page_number: SHA-256 of what the page draws}: its content streams plus the raw data of its images
+    and fonts, so the same scanned page hashes the same inside any PDF
+    """
+    resources: Dict[int, bytes] = {}
+
+    def resource(xref: int, font: bool) -> bytes:
+        if xref not in resources:
+            data = pdf.extract_font(xref)[3] if font else pdf.xref_stream_raw(xref)
+            resources[xref] = hashlib.sha256(data or b"").digest()
+        return resources[xref]
+
+    digests = {}
+    for page_num in page_numbers:
+        page = pdf[page_num]
+        h = hashlib.sha256(page.read_contents())
+        for image in page.get_images(full=True):
+            h.update(resource(image[0], font=False))
+        for font in page.get_fonts(full=True):
+            h.update(resource(font[0], font=True) if font[0] else font[3].encode("utf-8"))
+        digests[page_num] = h.hexdigest()
+    return digests
+
+
+def extract_page_range(source: Union[str, bytes], start: int, stop: int) -> List[Tuple[int, str, float, str]]:
+    """
+    [(page_number, text, seconds, page_class)] for pages [start, stop) of a PDF given as a file path
+    (pool workers, so the bytes are not pickled once per shard) or as bytes (in-process)
+    """
+    pages = []
+    with _open_pdf(source) as pdf:
+        for page_num in range(start, min(stop, len(pdf))):
+            t0 = time.perf_counter()
+            page = pdf[page_num]
+            text = page.get_text()
+            page_class = classify_page(text, bool(page.get_images(full=False)))
+            pages.append((page_num, text, time.perf_counter() - t0, page_class))
+    return pages
+
+
+# Per worker process: the open document of the current extraction and one Tesseract engine per language set
+_WORKER_PDF: Tuple[Optional[str], Any] = (None, None)
+_TESSERACT_APIS: Dict[str, Any] = {}
+
+
+def _init_pdf_worker():
+    # One Tesseract thread per worker: parallelism comes from the worker processes, and OpenMP threads
+    # inside each would oversubscribe the cores
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+# Where Tesseract's *.traineddata live when TESSDATA_PREFIX is not set (the tesserocr wheels bundle
+# libtesseract but no language data)
+TESSDATA_DIRS = ("/usr/share/tesseract-ocr/5/tessdata", "/usr/share/tesseract-ocr/4.00/tessdata",
+                 "/usr/share/tessdata", "/usr/local/share/tessdata", "/opt/homebrew/share/tessdata",
+                 r"C:\Program Files\Tesseract-OCR\tessdata")
+_TESSEROCR_READY: Optional[bool] = None
+
+
+def tessdata_path() -> Optional[str]:
+    return os.getenv("TESSDATA_PREFIX") or next((d for d in TESSDATA_DIRS if os.path.isdir(d)), None)
+
+
+def tesserocr_available() -> bool:
+    """tesserocr is installed and finds every OCR_LANGUAGES model (checked once per process)"""
+    global _TESSEROCR_READY
+    if _TESSEROCR_READY is None:
+        try:
+            import tesserocr
+            path = tessdata_path()
+            _, languages = tesserocr.get_languages(path) if path else tesserocr.get_languages()
+            _TESSEROCR_READY = set(OCR_LANGUAGES.split("+")) <= set(languages)
+        except Exception:
+            _TESSEROCR_READY = False
+    return _TESSEROCR_READY
+
+
+def _tesseract_api(languages: str, osd: bool = False):
+    """Long-lived tesserocr engine (models loaded once per worker), or None to use pytesseract"""
+    key = "osd" if osd else languages
+    if key not in _TESSERACT_APIS:
+        _TESSERACT_APIS[key] = None
+        if tesserocr_available():
+            import tesserocr
+            options: Dict[str, Any] = {"lang": languages}
+            if tessdata_path():
+                options["path"] = tessdata_path()
+            if osd:
+                options["psm"] = tesserocr.PSM.OSD_ONLY
+            try:
+                _TESSERACT_APIS[key] = tesserocr.PyTessBaseAPI(**options)
+            except RuntimeError as e:
+                print(f"[TextProcessor] ⚠️ Tesseract engine for '{key}' unavailable: {e}")
+    return _TESSERACT_APIS[key]
+
+
+def ocr_image(image, languages: str = OCR_LANGUAGES) -> str:
+    """
+    OCR one PIL image: in-process tesserocr when installed (the default install outside Windows), else
+    one tesseract process per call via pytesseract
+    """
+    api = _tesseract_api(languages)
+    if api is not None:
+        api.SetImage(image)
+        return api.GetUTF8Text()
+    import pytesseract
+    return pytesseract.image_to_string(image, lang=languages)
+
+
+def detect_script(image) -> Tuple[Optional[str], float]:
+    """
+    (script name, confidence) from Tesseract orientation and script detection, or (None, 0.0). Only
+    with tesserocr: through pytesseract the probe would start a second tesseract process per page.
+    """
+    api = _tesseract_api("osd", osd=True)
+    if api is None:
+        return None, 0.0
+    try:
+        api.SetImage(image)
+        osd = api.DetectOrientationScript() or {}
+        return osd.get("script_name"), float(osd.get("script_conf") or 0.0)
+    except Exception:
+        # Too little text on the page to detect a script
+        return None, 0.0
+
+
+def choose_languages(script: Optional[str], confidence: float, text_hint: str = "",
+                     configured: str = OCR_LANGUAGES) -> str:
+    """
+    The single configured language for a confidently detected script, otherwise every configured language.
+    A Latin page whose (undecodable) text layer still contains Devanagari keeps both.
+    """
+    allowed = configured.split("+")
+    language = SCRIPT_LANGUAGES.get(script or "")
+    if language not in allowed or confidence < OCR_SCRIPT_MIN_CONF:
+        return configured
+    if language == "eng" and "hin" in allowed and DEVANAGARI_PATTERN.search(text_hint):
+        return configured
+    return language
+
+
+def line_height_px(image) -> Optional[float]:
+    """Median height in pixels of the horizontal bands of ink (text lines) in a page image"""
+    import numpy as np
+
+    ink = np.asarray(image.convert("L")) < 128
+    rows = (ink.sum(axis=1) > max(2, ink.shape[1] // 500)).astype(np.int8)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], rows, [0]))))
+    heights = edges[1::2] - edges[::2]
+    heights = heights[heights >= 3]
+    return float(np.median(heights)) if len(heights) else None
+
+
+def choose_dpi(line_px: Optional[float], probe_dpi: int = OCR_PROBE_DPI) -> int:
+    """Render DPI (a multiple of 50 within OCR_MIN_DPI..OCR_MAX_DPI) that scales text lines to OCR_TARGET_LINE_PX"""
+    if not line_px:
+        return OCR_DPI
+    dpi = round(OCR_TARGET_LINE_PX * probe_dpi / line_px / 50) * 50
+    return int(min(OCR_MAX_DPI, max(OCR_MIN_DPI, dpi)))
+
+
+def render_page(page, dpi: int):
+    from PIL import Image
+
+    pix = page.get_pixmap(dpi=dpi, alpha=False)
+    return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+
+def ocr_pdf_page(pdf, page_num: int, dpi: Optional[int] = None,
+                 languages: Optional[str] = None) -> Tuple[int, Optional[str], float, str, int]:
+    """
+    (page_number, text or None if OCR failed, seconds, languages, dpi) for one page of an open document.
+    The page is rendered, read and released before the next one, so memory holds one page image per
+    worker. DPI and languages left as None are chosen from a probe render when OCR_ADAPTIVE is on.
+    """
+    t0 = time.perf_counter()
+    try:
+        page = pdf[page_num]
+        if OCR_ADAPTIVE and (dpi is None or languages is None):
+            probe = render_page(page, OCR_PROBE_DPI)
+            if languages is None:
+                languages = choose_languages(*detect_script(probe), text_hint=page.get_text())
+            if dpi is None:
+                dpi = choose_dpi(line_height_px(probe))
+            del probe
+        dpi, languages = dpi or OCR_DPI, languages or OCR_LANGUAGES
+        text = ocr_image(render_page(page, dpi), languages)
+    except Exception as e:
+        print(f"[TextProcessor] OCR failed on page {page_num + 1}: {e}")
+        text = None
+    return page_num, text, time.perf_counter() - t0, languages or OCR_LANGUAGES, dpi or OCR_DPI
+
+
+def ocr_page(path: str, doc_key: str, page_num: int, dpi: Optional[int] = None,
+             languages: Optional[str] = None) -> Tuple[int, Optional[str], float, str, int]:
+    """Pool task: OCR one page, reusing this worker's open copy of the document identified by `doc_key`"""
+    global _WORKER_PDF
+    key, pdf = _WORKER_PDF
+    if key != doc_key:
+        if pdf is not None:
+            pdf.close()
+        pdf = _open_pdf(path)
+        _WORKER_PDF = (doc_key, pdf)
+    return ocr_pdf_page(pdf, page_num, dpi, languages)
+
+
+_OCR_AVAILABLE: Optional[bool] = None
+
+
+def ocr_available() -> bool:
+    """Pillow and either tesserocr with the OCR_LANGUAGES models or pytesseract with the tesseract binary (checked once)"""
+    global _OCR_AVAILABLE
+    if _OCR_AVAILABLE is None:
+        try:
+            from PIL import Image  # noqa: F401
+            if not tesserocr_available():
+                import pytesseract
+                pytesseract.get_tesseract_version()
+            _OCR_AVAILABLE = True
+        except Exception:
+            _OCR_AVAILABLE = False
+    return _OCR_AVAILABLE
+
+
+def timing_summary(page_seconds: List[float]) -> Dict[str, float]:
+    """p50 / p95 / max per-page extraction time in milliseconds"""
+    if not page_seconds:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(page_seconds)
+
+    def pct(q: float) -> float:
+        return round(1000 * ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)
+
+    return {"p50_ms": pct(0.5), "p95_ms": pct(0.95), "max_ms": round(1000 * ordered[-1], 2)}
+
+
 class TextProcessor:
     """Handles advanced text extraction and cleaning for legal documents"""
     
@@ -21,7 +345,225 @@ class TextProcessor:
             print("[TextProcessor] Language detector initialized (English/Hindi)")
         except ImportError:
             print("[TextProcessor] ⚠️ Lingua not installed. Language detection disabled.")
-    
+        # Created on first use: a pool must not be forked along with a pre-fork master (shared_assets.py)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        # Most recent extraction: pages, workers, seconds, per-page percentiles, pages per method
+        self.last_extraction_stats: Dict[str, Any] = {}
+        # Pages per extraction method since start-up (GET /metrics/extraction)
+        self.page_counters: Counter = Counter()
+        # Per-page OCR latency over the last OCR_LATENCY_WINDOW pages, and the languages / DPI chosen per page
+        self.ocr_latency_ms: Deque[float] = deque(maxlen=OCR_LATENCY_WINDOW)
+        self.ocr_languages: Counter = Counter()
+        self.ocr_dpi: Counter = Counter()
+        # Opened on first use, like the pool; TextProcessor.cache = None (or EXTRACTION_CACHE=0) disables it
+        self._cache: Optional[ExtractionCache] = None
+        self._cache_opened = False
+
+    @property
+    def cache(self) -> Optional[ExtractionCache]:
+        if not self._cache_opened:
+            self._cache, self._cache_opened = open_extraction_cache(), True
+        return self._cache
+
+    @cache.setter
+    def cache(self, cache: Optional[ExtractionCache]):
+        self._cache, self._cache_opened = cache, True
+
+    def _get_pool(self, workers: int) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is not None and self._pool._max_workers != workers:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+            if self._pool is None:
+                # spawn: the service process is multi-threaded, and fork would copy its locks mid-use
+                self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_init_pdf_worker)
+            return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _map_pages(self, workers: int, func, tasks: List[tuple]) -> list:
+        """Run func(*task) for each task, on the pool when workers > 1, and concatenate the results in task order"""
+        if workers > 1 and len(tasks) > 1:
+            pool = self._get_pool(workers)
+            futures = [pool.submit(func, *task) for task in tasks]
+            return [item for future in futures for item in future.result()]
+        return [item for task in tasks for item in func(*task)]
+
+    def _ocr_pages(self, file_content: bytes, path: Optional[str], page_numbers: List[int],
+                   workers: int) -> Iterator[Tuple[int, Optional[str], float, str, int]]:
+        """
+        OCR pages one task each on the pool's long-lived workers, with at most OCR_IN_FLIGHT_PER_WORKER
+        tasks per worker outstanding: each worker rasterises only the page it is reading, so peak memory
+        is O(workers) page images whatever the page count, and a slow page never holds up a whole range.
+        """
+        if not page_numbers:
+            return
+        if workers <= 1 or len(page_numbers) <= 1:
+            with _open_pdf(file_content) as pdf:
+                for page_num in page_numbers:
+                    yield ocr_pdf_page(pdf, page_num)
+            return
+
+        temp_path = None
+        if path is None:
+            fd, temp_path = tempfile.mkstemp(suffix=".pdf")
+            with os.fdopen(fd, "wb") as f:
+                f.write(file_content)
+        try:
+            pool = self._get_pool(workers)
+            doc_key = uuid.uuid4().hex
+            in_flight: Deque = deque()
+            for page_num in page_numbers:
+                in_flight.append(pool.submit(ocr_page, path or temp_path, doc_key, page_num))
+                if len(in_flight) >= workers * OCR_IN_FLIGHT_PER_WORKER:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+        finally:
+            if temp_path:
+                os.remove(temp_path)
+
+    def ocr_stats(self) -> Dict[str, Any]:
+        """Per-page OCR latency (probe + render + recognise) and the languages and DPI pages were read with"""
+        latencies = sorted(self.ocr_latency_ms)
+
+        def pct(q: float) -> float:
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * q))], 1) if latencies else 0.0
+
+        return {
+            "pages": len(latencies),
+            "engine": "tesserocr" if tesserocr_available() else "pytesseract",
+            "latency_ms": {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99)},
+            "adaptive": OCR_ADAPTIVE,
+            "pages_by_languages": dict(self.ocr_languages),
+            "pages_by_dpi": dict(self.ocr_dpi),
+        }
+
+    def extract_pages(self, file_content: bytes, workers: Optional[int] = None,
+                      max_ocr_pages: Optional[int] = 100, ocr: bool = True) -> List[Tuple[str, str]]:
+        """
+        Single-pass hybrid extraction: (text, method) for every page, in page order.
+
+        Pages with a usable text layer keep it ('text'); image-only and garbage pages are OCR'd ('ocr'),
+        up to `max_ocr_pages` of them ('ocr_skipped' beyond that, 'ocr_unavailable' without Tesseract,
+        'ocr_failed' on errors - these keep their text layer); empty pages are 'blank'. Documents of
+        PARALLEL_MIN_PAGES or more are split into page ranges handled concurrently by the process pool,
+        and OCR is streamed page by page to the same long-lived workers.
+
+        Args:
+            file_content: PDF file bytes
+            workers: Override for PDF_EXTRACT_WORKERS (1 extracts in-process)
+            max_ocr_pages: OCR budget per document (None = unlimited)
+            ocr: False classifies but never OCRs
+        """
+        import fitz  # PyMuPDF
+
+        workers = workers or PDF_WORKERS
+        start = time.perf_counter()
+        with fitz.open(stream=file_content, filetype="pdf") as pdf:
+            total_pages = len(pdf)
+        parallel = workers > 1 and total_pages >= PARALLEL_MIN_PAGES
+        print(f"[TextProcessor] PDF has {total_pages} pages. Classifying pages...")
+
+        path = None
+        try:
+            source: Union[str, bytes] = file_content
+            if parallel:
+                fd, path = tempfile.mkstemp(suffix=".pdf")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(file_content)
+                source = path
+            ranges = page_ranges(total_pages, workers * SHARDS_PER_WORKER) if parallel else [(0, total_pages)]
+            results = self._map_pages(workers if parallel else 1, extract_page_range,
+                                      [(source, a, b) for a, b in ranges])
+
+            pages: List[Tuple[str, str]] = [("", "blank")] * total_pages
+            classes: Counter = Counter()
+            page_seconds = [0.0] * total_pages
+            for page_num, text, seconds, page_class in results:
+                classes[page_class] += 1
+                page_seconds[page_num] = seconds
+                pages[page_num] = (text, "text" if page_class in OCR_CLASSES else page_class)
+
+            needs_ocr = [page_num for page_num, _, _, page_class in results if page_class in OCR_CLASSES]
+            budget = len(needs_ocr) if max_ocr_pages is None else max_ocr_pages
+            selected, skipped = needs_ocr[:budget], needs_ocr[budget:]
+            cached_pages = 0
+            if selected and ocr and ocr_available():
+                cache, page_keys, to_ocr = self.cache, {}, selected
+                if cache is not None:
+                    # Pages OCR'd before (in this or any other PDF) are read back instead
+                    with _open_pdf(file_content) as pdf:
+                        page_keys = {n: f"page:{d}:{OCR_SETTINGS}" for n, d in page_digests(pdf, selected).items()}
+                    to_ocr = []
+                    for page_num in selected:
+                        hit = cache.get(page_keys[page_num])
+                        if hit:
+                            pages[page_num] = (hit[1]["text"], "ocr")
+                            cached_pages += 1
+                        else:
+                            to_ocr.append(page_num)
+                print(f"[TextProcessor] OCR on {len(to_ocr)} of {total_pages} pages "
+                      f"({classes['image']} image-only, {classes['garbage']} garbage text, {cached_pages} cached)")
+                for page_num, text, seconds, languages, dpi in self._ocr_pages(file_content, path, to_ocr, workers):
+                    page_seconds[page_num] += seconds
+                    self.ocr_latency_ms.append(seconds * 1000)
+                    self.ocr_languages[languages] += 1
+                    self.ocr_dpi[dpi] += 1
+                    if text is None:
+                        pages[page_num] = (pages[page_num][0], "ocr_failed")
+                    else:
+                        pages[page_num] = (text, "ocr")
+                        if cache is not None:
+                            cache.put(page_keys[page_num], "ocr", {"text": text})
+            elif selected:
+                for page_num in selected:
+                    pages[page_num] = (pages[page_num][0], "ocr_unavailable" if ocr else "ocr_skipped")
+            for page_num in skipped:
+                pages[page_num] = (pages[page_num][0], "ocr_skipped")
+        finally:
+            if path:
+                os.remove(path)
+
+        by_method = Counter(method for _, method in pages)
+        self.page_counters.update(by_method)
+        seconds = time.perf_counter() - start
+        self.last_extraction_stats = {
+            "pages": total_pages,
+            "workers": workers if parallel else 1,
+            "shards": len(ranges),
+            "seconds": round(seconds, 3),
+            "pages_per_sec": round(total_pages / max(seconds, 1e-9), 1),
+            "page_classes": dict(classes),
+            "pages_by_method": dict(by_method),
+            "ocr_pages_cached": cached_pages,
+            **timing_summary(page_seconds),
+        }
+        return pages
+
+    def _extract_text_pypdf(self, file_content: bytes) -> Tuple[str, str]:
+        """Pure-Python parser for files PyMuPDF cannot open (or when it is not installed)"""
+        try:
+            import pypdf
+            print(f"[TextProcessor] Trying pypdf extraction...")
+
+            pdf_reader = pypdf.PdfReader(io.BytesIO(file_content))
+            full_text = "".join((page.extract_text() or "") + "\n" for page in pdf_reader.pages)
+            if len(full_text.strip()) > 50:
+                print(f"[TextProcessor] pypdf extraction successful ({len(full_text)} chars)")
+                return full_text, "pypdf"
+            return "Error: Could not extract text from this PDF.", "failed"
+        except ImportError:
+            return "Error: No PDF parser available. Install pymupdf.", "failed"
+        except Exception as e:
+            print(f"[TextProcessor] pypdf extraction failed: {e}")
+            return f"Error: All extraction methods failed. {str(e)}", "failed"
+
     def detect_language(self, text: str) -> str:
         """
         Detect language of text (English or Hindi)
@@ -53,7 +595,8 @@ class TextProcessor:
     
     def extract_text_from_pdf(self, file_content: bytes, filename: str, max_ocr_pages: int = 100) -> Tuple[str, str]:
         """
-        Advanced multi-modal PDF text extraction with automatic fallback
+        Hybrid per-page PDF text extraction: text layer where usable, OCR only for pages that need it
+        (see extract_pages), pypdf when PyMuPDF cannot open the file
         
         Args:
             file_content: PDF file bytes
@@ -61,113 +604,66 @@ class TextProcessor:
             max_ocr_pages: Maximum pages to process with OCR (default: 100)
             
         Returns:
-            Tuple of (extracted_text, extraction_method)
+            Tuple of (extracted_text, extraction_method) - method is 'pymupdf', 'ocr', 'hybrid',
+            'pypdf' or 'failed' (the text is then an error message)
         """
+        text, method, _ = self._extract_pdf(file_content, filename, max_ocr_pages)
+        return text, method
+
+    def _extract_pdf(self, file_content: bytes, filename: str, max_ocr_pages: int) -> Tuple[str, str, bool]:
+        """extract_text_from_pdf plus whether the result is final (no page lost to missing or failing OCR)"""
         try:
             print(f"[TextProcessor] Processing PDF: {filename.encode('utf-8', 'replace').decode('utf-8')} ({len(file_content)} bytes)")
         except Exception:
             print(f"[TextProcessor] Processing PDF: (filename encoding error) ({len(file_content)} bytes)")
         
-        # Try PyMuPDF first (fast, for digital PDFs)
         try:
-            import fitz  # PyMuPDF
-            full_text = ""
-            
-            with fitz.open(stream=file_content, filetype="pdf") as pdf:
-                total_pages = len(pdf)
-                print(f"[TextProcessor] PDF has {total_pages} pages. Trying native extraction...")
-                
-                for page_num in range(total_pages):
-                    page = pdf[page_num]
-                    text = page.get_text()
-                    if text:
-                        full_text += text + "\n"
-                
-                # Check if we got meaningful text (at least 100 chars)
-                if len(full_text.strip()) > 100:
-                    print(f"[TextProcessor] Native extraction successful ({len(full_text)} chars)")
-                    return full_text, "pymupdf"
-                else:
-                    print(f"[TextProcessor] Native extraction yielded insufficient text. Falling back to OCR...")
-        
+            pages = self.extract_pages(file_content, max_ocr_pages=max_ocr_pages)
         except Exception as e:
             print(f"[TextProcessor] PyMuPDF failed: {e}. Trying fallback...")
-        
-        # Fallback to pdfplumber
-        try:
-            import pdfplumber
-            full_text = ""
-            
-            with pdfplumber.open(io.BytesIO(file_content)) as pdf:
-                total_pages = len(pdf.pages)
-                print(f"[TextProcessor] Trying pdfplumber extraction...")
-                
-                for page in pdf.pages:
-                    extracted = page.extract_text()
-                    if extracted:
-                        full_text += extracted + "\n"
-                
-                if len(full_text.strip()) > 100:
-                    print(f"[TextProcessor] pdfplumber extraction successful ({len(full_text)} chars)")
-                    return full_text, "pdfplumber"
-        
-        except ImportError:
-             print("[TextProcessor] pdfplumber not installed. Skipping.")
-        except Exception as e:
-            print(f"[TextProcessor] pdfplumber failed: {e}")
+            text, method = self._extract_text_pypdf(file_content)
+            return text, method, method != "failed"
 
-        # Fallback to pypdf (Pure Python, very reliable)
-        try:
-            import pypdf
-            full_text = ""
-            print(f"[TextProcessor] Trying pypdf extraction...")
-            
-            pdf_reader = pypdf.PdfReader(io.BytesIO(file_content))
-            for page in pdf_reader.pages:
-                full_text += page.extract_text() + "\n"
-            
-            if len(full_text.strip()) > 50:
-                 print(f"[TextProcessor] pypdf extraction successful ({len(full_text)} chars)")
-                 return full_text, "pypdf"
-        except ImportError:
-            print("[TextProcessor] pypdf not installed. Skipping.")
-        except Exception as e:
-             print(f"[TextProcessor] pypdf extraction failed: {e}")
+        full_text = "".join(text + "\n" for text, _ in pages if text.strip())
+        by_method = Counter(method for _, method in pages)
+        stats = self.last_extraction_stats
+        print(f"[TextProcessor] {stats['pages']} pages in {stats['seconds']}s on {stats['workers']} worker(s): "
+              + ", ".join(f"{method} {count}" for method, count in sorted(by_method.items())))
+        final = not (by_method.get("ocr_unavailable") or by_method.get("ocr_failed"))
+        if len(full_text.strip()) > 50:
+            if by_method.get("ocr") and by_method.get("text"):
+                method = "hybrid"
+            else:
+                method = "ocr" if by_method.get("ocr") else "pymupdf"
+            print(f"[TextProcessor] Extraction successful ({len(full_text)} chars, {method})")
+            return full_text, method, final
+        if by_method.get("ocr_unavailable"):
+            print("[TextProcessor] ⚠️ Scanned PDF but OCR is unavailable (pytesseract / tesseract binary)")
+            return "Error: OCR not available. Install pytesseract and the tesseract binary.", "failed", False
+        return "Error: OCR extraction yielded no meaningful text.", "failed", False
 
+    def extract_and_clean_pdf(self, file_content: bytes, filename: str, max_ocr_pages: int = 100) -> Tuple[str, str, str]:
+        """
+        (extracted text, cleaned text, method) for a PDF, from the extraction cache when the same file
+        was processed before with the same settings. Results with pages missing because OCR was
+        unavailable or failed are not cached, so a later upload gets the full text.
+        """
+        cache = self.cache
+        key = f"doc:{file_digest(file_content)}:{max_ocr_pages}:{OCR_SETTINGS}"
+        hit = cache.get(key) if cache is not None else None
+        if hit:
+            method, payload = hit
+            print(f"[TextProcessor] Extraction cache hit for {filename} ({len(payload['cleaned'])} chars, {method})")
+            return payload["text"], payload["cleaned"], method
+
+        text, method, final = self._extract_pdf(file_content, filename, max_ocr_pages)
+        if method == "failed":
+            return text, "", method
+        cleaned = self.clean_text(text)
+        if cache is not None and final:
+            cache.put(key, method, {"text": text, "cleaned": cleaned})
+        return text, cleaned, method
 
-        # Last resort: OCR with Pytesseract
-        try:
-            import pytesseract
-            from pdf2image import convert_from_bytes
-            
-            print(f"[TextProcessor] Attempting OCR extraction (max {max_ocr_pages} pages)...")
-            
-            # Convert PDF to images (limit pages for performance)
-            try:
-                images = convert_from_bytes(file_content, dpi=300, first_page=1, last_page=max_ocr_pages)
-            except Exception as poppler_error:
-                print(f"[TextProcessor] ⚠️ OCR Failed: {poppler_error}. Is Poppler installed and in PATH?")
-                return f"Error: Could not process PDF. Please install Poppler or ensure the PDF is text-readable.", "failed"
-
-            full_text = ""
-            for i, image in enumerate(images):
-                print(f"[TextProcessor] OCR processing page {i+1}/{len(images)}...")
-                text = pytesseract.image_to_string(image, lang='eng+hin')
-                full_text += text + "\n"
-            
-            if len(full_text.strip()) > 50:
-                print(f"[TextProcessor] OCR extraction successful ({len(full_text)} chars)")
-                return full_text, "ocr"
-            else:
-                return "Error: OCR extraction yielded no meaningful text.", "failed"
-        
-        except ImportError:
-            print("[TextProcessor] ⚠️ OCR dependencies not installed (pytesseract/pdf2image)")
-            return "Error: OCR not available. Install pytesseract and pdf2image.", "failed"
-        except Exception as e:
-            print(f"[TextProcessor] OCR failed: {e}")
-            return f"Error: All extraction methods failed. {str(e)}", "failed"
-    
     def clean_text(self, text: str) -> str:
         """
         12-stage text cleaning pipeline for legal documents
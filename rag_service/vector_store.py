@@ -0,0 +1,425 @@
+"""
+Vector Store Module
+Backends behind the Chroma-style query interface used by RAGEngine:
+- chroma: persistent ChromaDB collection (HNSW)
+- mmap:   exact brute-force search over a memory-mapped .npy matrix with a columnar metadata sidecar
+- quantized: binary/int8 first pass + exact rescoring over the same directory (see quantized_index.py)
+- corpus:  exact search straight from the memory-mapped Arrow corpus file (see corpus.py)
+"""
+
+import os
+import json
+import shutil
+from typing import List, Dict, Any, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CHROMA_PATH = os.path.join(BASE_DIR, "chroma_db")
+MMAP_INDEX_PATH = os.path.join(BASE_DIR, "mmap_index")
+COLLECTION_NAME = "legal_knowledge"
+
+# Columns with at most this many distinct values get their equality masks precomputed at load
+MASK_CARDINALITY_LIMIT = 64
+# Rows of a float16 matrix upcast to float32 at a time while scoring (~12 MB at 384 dimensions)
+SCORE_BLOCK_ROWS = 8192
+
+# Chroma's own HNSW defaults. Keep space=l2: RAGEngine's relevance cutoff is a squared-L2 distance.
+HNSW_DEFAULTS = {"space": "l2", "M": 16, "construction_ef": 100, "search_ef": 10}
+
+
+def hnsw_metadata(**overrides) -> Dict[str, Any]:
+    """
+    Collection metadata carrying the HNSW build/search parameters
+
+    Values come from keyword overrides, then HNSW_SPACE / HNSW_M / HNSW_CONSTRUCTION_EF / HNSW_SEARCH_EF,
+    then Chroma's defaults. Chroma reads them only when the collection is created, so they are
+    persisted with the collection and reported back by collection.metadata.
+    """
+    params = {}
+    for key, default in HNSW_DEFAULTS.items():
+        value = overrides.get(key)
+        if value is None:
+            value = os.getenv(f"HNSW_{key.upper()}", default)
+        params[f"hnsw:{key}"] = value if key == "space" else int(value)
+    return params
+
+
+def get_or_create_collection(client, name: str, embedding_function, metadata: Optional[Dict[str, Any]] = None,
+                             **hnsw_overrides):
+    """
+    get_or_create_collection() with HNSW parameters from hnsw_metadata(). An existing collection keeps
+    the parameters it was built with; a mismatch is reported so a rebuild (--fresh) can be scheduled.
+    """
+    wanted = hnsw_metadata(**hnsw_overrides)
+    collection = client.get_or_create_collection(
+        name=name, embedding_function=embedding_function, metadata={**(metadata or {}), **wanted}
+    )
+    built = {k: v for k, v in (collection.metadata or {}).items() if k.startswith("hnsw:")}
+    stale = {k: (built.get(k), v) for k, v in wanted.items() if built.get(k) != v}
+    if stale:
+        print(f"[VectorStore] ⚠️ '{name}' keeps its build-time HNSW params (built, requested): {stale}. Rebuild with --fresh to apply.")
+    return collection
+
+
+class MmapVectorStore:
+    """
+    Exact top-k search over a read-only, memory-mapped embedding matrix.
+
+    On-disk layout (one directory):
+        embeddings.npy  - (N, D) float32 or float16 matrix, opened with mmap_mode='r'
+        columns.json    - {"ids": [...], "documents": [...], "metadata": {key: [value per row]}}
+        manifest.json   - count, dimension, dtype, model, normalized
+
+    The matrix is never copied into private memory, so every worker process that opens the same
+    directory shares one copy through the OS page cache. A float16 matrix stays float16 in the page
+    cache (half the size) and is upcast one SCORE_BLOCK_ROWS block at a time while scoring.
+    """
+
+    def __init__(self, path: str = MMAP_INDEX_PATH, embedding_function=None):
+        import numpy as np
+
+        self.path = path
+        self.embedding_function = embedding_function
+
+        self.manifest, self.ids, self.documents, self.columns, matrix = self._load(path)
+        self.name = self.manifest.get("name", COLLECTION_NAME)
+
+        self.matrix = matrix
+        self.normalized = bool(self.manifest.get("normalized", True))
+        self._sq_norms_cache = None
+
+        self._id_index = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        self._masks: Dict[tuple, Any] = {}
+        self._precompute_masks()
+        print(f"[MmapVectorStore] Loaded {len(self.ids)} vectors ({matrix.shape[1]}-dim, {self.manifest.get('dtype')}) from {path}")
+
+    def _load(self, path: str) -> tuple:
+        """(manifest, ids, documents, metadata columns, memory-mapped matrix) of an index directory"""
+        import numpy as np
+
+        with open(os.path.join(path, "manifest.json"), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        with open(os.path.join(path, "columns.json"), "r", encoding="utf-8") as f:
+            columns = json.load(f)
+        matrix = np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r")
+        return manifest, columns["ids"], columns["documents"], columns["metadata"], matrix
+
+    @staticmethod
+    def _float32_blocks(vectors):
+        """(start, float32 block) over the rows of a matrix; a float32 matrix is one block, never copied"""
+        import numpy as np
+
+        if vectors.dtype == np.float32:
+            yield 0, vectors
+            return
+        for start in range(0, len(vectors), SCORE_BLOCK_ROWS):
+            yield start, np.asarray(vectors[start:start + SCORE_BLOCK_ROWS], dtype=np.float32)
+
+    def _sq_norms(self, matrix):
+        import numpy as np
+
+        sq_norms = np.empty(len(matrix), dtype=np.float32)
+        for start, block in self._float32_blocks(matrix):
+            sq_norms[start:start + len(block)] = np.einsum("ij,ij->i", block, block)
+        return sq_norms
+
+    @property
+    def sq_norms(self):
+        """Squared row norms for L2 distances over a non-normalized matrix, computed on the first full scan"""
+        if self.normalized:
+            return None
+        if self._sq_norms_cache is None:
+            self._sq_norms_cache = self._sq_norms(self.matrix)
+        return self._sq_norms_cache
+
+    @property
+    def metadata(self) -> dict:
+        return self.manifest.get("collection_metadata", {})
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    # ------------------------------------------------------------------ filters
+
+    def _precompute_masks(self):
+        import numpy as np
+
+        for key, values in self.columns.items():
+            distinct = {self._hashable(v) for v in values}
+            if len(distinct) > MASK_CARDINALITY_LIMIT:
+                continue
+            column = np.array([self._hashable(v) for v in values], dtype=object)
+            for value in distinct:
+                self._masks[(key, value)] = column == value
+
+    @staticmethod
+    def _hashable(value):
+        return json.dumps(value, sort_keys=True) if isinstance(value, (list, dict)) else value
+
+    def _eq_mask(self, key: str, value):
+        import numpy as np
+
+        value = self._hashable(value)
+        cached = self._masks.get((key, value))
+        if cached is not None:
+            return cached
+        column = self.columns.get(key)
+        if column is None:
+            return np.zeros(len(self.ids), dtype=bool)
+        return np.fromiter((self._hashable(v) == value for v in column), dtype=bool, count=len(column))
+
+    def _compare_mask(self, key: str, op: str, value):
+        import numpy as np
+        import operator
+
+        ops = {"$gt": operator.gt, "$gte": operator.ge, "$lt": operator.lt, "$lte": operator.le}
+        column = self.columns.get(key)
+        if column is None:
+            return np.zeros(len(self.ids), dtype=bool)
+        return np.fromiter(
+            (isinstance(v, (int, float)) and ops[op](v, value) for v in column),
+            dtype=bool, count=len(column),
+        )
+
+    def _where_mask(self, where: Dict[str, Any]):
+        """Evaluate a Chroma-style `where` filter into a boolean row mask"""
+        import numpy as np
+
+        mask = np.ones(len(self.ids), dtype=bool)
+        for key, condition in where.items():
+            if key == "$and":
+                for sub in condition:
+                    mask &= self._where_mask(sub)
+            elif key == "$or":
+                any_mask = np.zeros(len(self.ids), dtype=bool)
+                for sub in condition:
+                    any_mask |= self._where_mask(sub)
+                mask &= any_mask
+            elif isinstance(condition, dict):
+                for op, value in condition.items():
+                    if op == "$eq":
+                        mask &= self._eq_mask(key, value)
+                    elif op == "$ne":
+                        mask &= ~self._eq_mask(key, value)
+                    elif op == "$in":
+                        mask &= np.logical_or.reduce([self._eq_mask(key, v) for v in value]) if value else False
+                    elif op == "$nin":
+                        for v in value:
+                            mask &= ~self._eq_mask(key, v)
+                    elif op in ("$gt", "$gte", "$lt", "$lte"):
+                        mask &= self._compare_mask(key, op, value)
+                    else:
+                        raise ValueError(f"Unsupported where operator: {op}")
+            else:
+                mask &= self._eq_mask(key, condition)
+        return mask
+
+    # ------------------------------------------------------------------ queries
+
+    def _row_metadata(self, row: int) -> Dict[str, Any]:
+        return {key: values[row] for key, values in self.columns.items() if values[row] is not None}
+
+    def _embed(self, query_texts: List[str]):
+        if self.embedding_function is None:
+            raise ValueError("MmapVectorStore needs an embedding_function to query by text")
+        return self.embedding_function(query_texts)
+
+    def _query_matrix(self, query_texts: Optional[List[str]], query_embeddings):
+        import numpy as np
+
+        if query_embeddings is None:
+            query_embeddings = self._embed(query_texts)
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        return queries[None, :] if queries.ndim == 1 else queries
+
+    def _exact_distances(self, queries, vectors, sq_norms=None):
+        """Squared L2 distances (Q, N) between queries and vectors with one matrix product"""
+        import numpy as np
+
+        if vectors.dtype == np.float32:
+            scores = queries @ vectors.T  # (Q, N) - one BLAS call for the whole batch
+        else:
+            scores = np.empty((len(queries), len(vectors)), dtype=np.float32)
+            for start, block in self._float32_blocks(vectors):
+                scores[:, start:start + len(block)] = queries @ block.T
+        if self.normalized:
+            distances = 2.0 - 2.0 * scores
+        else:
+            distances = (queries * queries).sum(axis=1, keepdims=True) + sq_norms[None, :] - 2.0 * scores
+        np.maximum(distances, 0.0, out=distances)
+        return distances
+
+    def query(self, query_texts: Optional[List[str]] = None, query_embeddings=None, n_results: int = 10,
+              where: Optional[Dict[str, Any]] = None, include: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Exact top-k search. All queries are scored with a single matrix product.
+
+        Returns:
+            Chroma-shaped result dict: ids/documents/metadatas/distances, one list per query.
+            Distances are squared L2, matching Chroma's default 'l2' space.
+        """
+        import numpy as np
+
+        include = include or ["documents", "metadatas", "distances"]
+        queries = self._query_matrix(query_texts, query_embeddings)
+        distances = self._exact_distances(queries, self.matrix, self.sq_norms)
+
+        if where:
+            distances[:, ~self._where_mask(where)] = np.inf
+
+        k = min(n_results, distances.shape[1])
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for row in distances:
+            top = np.argpartition(row, k - 1)[:k] if k < len(row) else np.arange(len(row))
+            top = top[np.argsort(row[top])]
+            top = top[np.isfinite(row[top])]
+            self._append_result(result, top, row[top], include)
+        return result
+
+    def _append_result(self, result: Dict[str, Any], rows, distances, include: List[str]):
+        """Append one query's hits (row indices + distances, best first) to a Chroma-shaped result"""
+        result["ids"].append([self.ids[i] for i in rows])
+        result["documents"].append([self.documents[i] for i in rows] if "documents" in include else None)
+        result["metadatas"].append([self._row_metadata(i) for i in rows] if "metadatas" in include else None)
+        result["distances"].append([float(d) for d in distances] if "distances" in include else None)
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None,
+            include: Optional[List[str]] = None) -> Dict[str, Any]:
+        import numpy as np
+
+        include = include or ["documents", "metadatas"]
+        if ids is not None:
+            rows = [self._id_index[i] for i in ids if i in self._id_index]
+        else:
+            rows = list(range(len(self.ids)))
+        if where:
+            mask = self._where_mask(where)
+            rows = [r for r in rows if mask[r]]
+        return {
+            "ids": [self.ids[r] for r in rows],
+            "documents": [self.documents[r] for r in rows] if "documents" in include else None,
+            "metadatas": [self._row_metadata(r) for r in rows] if "metadatas" in include else None,
+            "embeddings": np.asarray(self.matrix[rows], dtype=np.float32) if "embeddings" in include else None,
+        }
+
+    # ------------------------------------------------------------------ building
+
+    @staticmethod
+    def build(path: str, ids: List[str], embeddings, documents: List[str], metadatas: List[Dict[str, Any]],
+              dtype: str = "float32", extra_manifest: Optional[Dict[str, Any]] = None):
+        """
+        Write an index directory. The new index is written next to `path` and renamed into place,
+        so readers never see a half-written directory.
+        """
+        import numpy as np
+
+        matrix = np.asarray(embeddings, dtype=dtype)
+        norms = np.linalg.norm(matrix.astype(np.float32), axis=1)
+        keys = sorted({key for meta in metadatas for key in (meta or {})})
+        columns = {
+            "ids": list(ids),
+            "documents": list(documents),
+            "metadata": {key: [(meta or {}).get(key) for meta in metadatas] for key in keys},
+        }
+        manifest = {
+            "name": COLLECTION_NAME,
+            "count": len(ids),
+            "dimension": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+            "dtype": dtype,
+            "normalized": bool(len(norms) == 0 or np.allclose(norms, 1.0, atol=1e-3)),
+        }
+        manifest.update(extra_manifest or {})
+
+        tmp_path = f"{path}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        np.save(os.path.join(tmp_path, "embeddings.npy"), matrix)
+        with open(os.path.join(tmp_path, "columns.json"), "w", encoding="utf-8") as f:
+            json.dump(columns, f, ensure_ascii=False)
+        with open(os.path.join(tmp_path, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        old_path = f"{path}.old"
+        shutil.rmtree(old_path, ignore_errors=True)
+        if os.path.exists(path):
+            os.rename(path, old_path)
+        os.rename(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+        print(f"[MmapVectorStore] Wrote {len(ids)} vectors to {path}")
+
+
+def export_collection(collection, page_size: int = 1000) -> tuple:
+    """Page through a Chroma collection and return (ids, embeddings, documents, metadatas)"""
+    ids, embeddings, documents, metadatas = [], [], [], []
+    total = collection.count()
+    for offset in range(0, total, page_size):
+        page = collection.get(include=["embeddings", "documents", "metadatas"], limit=page_size, offset=offset)
+        ids.extend(page["ids"])
+        embeddings.extend(page["embeddings"])
+        documents.extend(page["documents"])
+        metadatas.extend(page["metadatas"])
+    return ids, embeddings, documents, metadatas
+
+
+def open_vector_store(embedding_function, backend: Optional[str] = None, version: Optional[str] = None,
+                      sharded: Optional[bool] = None):
+    """
+    Open the configured vector store (VECTOR_BACKEND=chroma|mmap|quantized|corpus)
+
+    Args:
+        embedding_function: Chroma-compatible embedding function used for text queries
+        backend: Override for VECTOR_BACKEND
+        version: Index snapshot to open (see index_snapshots); None uses the legacy directories
+        sharded: Override for VECTOR_SHARDS - fan queries out per document type (see retrieval.py)
+
+    Returns:
+        Object exposing query()/count() - a Chroma collection, MmapVectorStore, QuantizedVectorStore,
+        CorpusVectorStore or a ShardedRetriever over any of them
+    """
+    backend = (backend or os.getenv("VECTOR_BACKEND", "chroma")).lower()
+    if sharded is None:
+        sharded = os.getenv("VECTOR_SHARDS", "false").lower() == "true"
+    chroma_path = os.getenv("CHROMA_DB_PATH", CHROMA_PATH)
+    mmap_path = os.getenv("MMAP_INDEX_DIR", MMAP_INDEX_PATH)
+    corpus_path = os.getenv("CORPUS_FILE_PATH", os.path.join(BASE_DIR, "corpus.arrow"))
+    if version:
+        from index_snapshots import snapshot_path
+        chroma_path = os.path.join(snapshot_path(version), "chroma_db")
+        mmap_path = os.path.join(snapshot_path(version), "mmap_index")
+        corpus_path = os.path.join(snapshot_path(version), "corpus.arrow")
+
+    if backend == "mmap":
+        store = MmapVectorStore(mmap_path, embedding_function=embedding_function)
+    elif backend == "quantized":
+        from quantized_index import QuantizedVectorStore
+        store = QuantizedVectorStore(mmap_path, embedding_function=embedding_function)
+    elif backend == "corpus":
+        from corpus import CorpusVectorStore
+        store = CorpusVectorStore(corpus_path, embedding_function=embedding_function)
+    elif backend != "chroma":
+        raise ValueError(f"Unknown VECTOR_BACKEND '{backend}'. Expected 'chroma', 'mmap', 'quantized' or 'corpus'")
+    else:
+        if not os.path.isdir(chroma_path):
+            raise FileNotFoundError(f"Chroma directory {chroma_path} not found")
+
+        import chromadb
+
+        client = chromadb.PersistentClient(path=chroma_path)
+        if sharded:
+            from retrieval import ShardedRetriever, SHARD_COLLECTIONS
+
+            existing = {c if isinstance(c, str) else c.name for c in client.list_collections()}
+            shards = [
+                (shard, client.get_collection(name=name, embedding_function=embedding_function), None)
+                for shard, name in SHARD_COLLECTIONS.items() if name in existing
+            ]
+            if shards:
+                return ShardedRetriever(shards, embedding_function)
+            print("[VectorStore] No shard collections in this index, filtering the main collection instead")
+        store = client.get_collection(name=COLLECTION_NAME, embedding_function=embedding_function)
+
+    if not sharded:
+        return store
+
+    # Single store: each shard is a metadata filter over it
+    from retrieval import ShardedRetriever, SHARD_FILTERS
+    return ShardedRetriever([(shard, store, where) for shard, where in SHARD_FILTERS.items()], embedding_function)
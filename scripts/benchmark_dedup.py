@@ -0,0 +1,92 @@
+"""
+Near-duplicate elimination benchmark
+Embeds the selected sources with and without the MinHash/LSH dedup stage, builds an exact mmap index
+for each, and compares index size, query latency and how much of the top-k is taken by near-duplicates.
+
+Usage:
+    python scripts/benchmark_dedup.py [--sources statutes,judgments,it_act] [--k 5] [--queries 200] [--threshold 0.8]
+"""
+
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rag_service'))
+
+from embeddings import get_embedding_provider, ProviderEmbeddingFunction
+from vector_store import MmapVectorStore
+from ingestion import DEFAULT_SOURCES, get_sources
+from dedup import dedup_sources
+from benchmark_quantized_index import load_queries, dir_size_mb, timed_search
+
+
+def collect(sources) -> tuple:
+    ids, documents, metadatas = [], [], []
+    for source in sources:
+        for doc_id, text, metadata in source.documents():
+            ids.append(doc_id)
+            documents.append(text)
+            metadatas.append(metadata)
+    return ids, documents, metadatas
+
+
+def redundancy(results: list, duplicate_of: dict) -> float:
+    """Share of top-k slots holding a near-duplicate of a higher-ranked result"""
+    shares = []
+    for ids in results:
+        clusters = [duplicate_of.get(doc_id, doc_id) for doc_id in ids]
+        shares.append(1 - len(set(clusters)) / max(1, len(clusters)))
+    return statistics.mean(shares)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index size / latency / top-k redundancy with and without dedup")
+    parser.add_argument("--sources", default=",".join(DEFAULT_SOURCES))
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--threshold", type=float, default=None)
+    args = parser.parse_args()
+
+    names = [s.strip() for s in args.sources.split(",") if s.strip()]
+    provider = get_embedding_provider()
+    ef = ProviderEmbeddingFunction(provider)
+
+    deduped_sources = dedup_sources(get_sources(names), args.threshold)
+    kept = collect(deduped_sources)
+    duplicate_of = {}
+    for source in deduped_sources:
+        duplicate_of.update(getattr(source, "duplicate_of", {}))
+        if getattr(source, "report", None):
+            print(f"🧹 {source.name}: {source.report}")
+    full = collect(get_sources(names))
+
+    queries = load_queries(args.queries)
+    query_embeddings = ef(queries)
+    scratch = tempfile.mkdtemp(prefix="dedup_bench_")
+    rows = []
+    try:
+        for label, (ids, documents, metadatas) in (("full", full), ("deduplicated", kept)):
+            print(f"⏳ Embedding {len(ids)} documents ({label})...")
+            path = os.path.join(scratch, label)
+            MmapVectorStore.build(path, ids, provider.embed(documents), documents, metadatas)
+            store = MmapVectorStore(path, embedding_function=ef)
+            found, p50, p99 = timed_search(store, query_embeddings, args.k)
+            rows.append((label, len(ids), dir_size_mb(path), p50, p99, redundancy(found, duplicate_of)))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    print(f"\n📊 {len(queries)} queries, k={args.k}\n")
+    print(f"{'index':<14} {'documents':>10} {'size MB':>9} {'p50 ms':>8} {'p99 ms':>8} {'dup share@' + str(args.k):>12}")
+    for label, count, size_mb, p50, p99, dup_share in rows:
+        print(f"{label:<14} {count:>10} {size_mb:>9.2f} {p50:>8.2f} {p99:>8.2f} {dup_share:>12.1%}")
+    (_, n_full, size_full, p50_full, _, _), (_, n_kept, size_kept, p50_kept, _, _) = rows
+    print(f"\nIndex: -{1 - n_kept / max(n_full, 1):.0%} documents, -{1 - size_kept / max(size_full, 1e-9):.0%} on disk; "
+          f"p50 latency {p50_full:.2f} -> {p50_kept:.2f} ms")
+    print("'dup share' is the fraction of top-k slots spent on near-duplicates of a higher-ranked result")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark embedding backends (torch / onnx / onnx-int8)
+Reports load time, per-batch latency, throughput and resident memory at batch sizes 1-256.
+
+Each backend runs in its own subprocess so memory numbers are not polluted by the others.
+
+Usage:
+    python scripts/benchmark_embeddings.py [--backends torch,onnx,onnx-int8] [--repeats 5]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rag_service'))
+
+BATCH_SIZES = [1, 8, 32, 64, 128, 256]
+SAMPLE_TEXT = (
+    "Statute: Bharatiya Nyaya Sanhita (BNS) Section 103. Topic: Murder. Description: Whoever commits murder "
+    "shall be punished with death or imprisonment for life, and shall also be liable to fine."
+)
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (Linux /proc, falls back to peak RSS)"""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def peak_rss_mb() -> float:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_backend(backend: str, repeats: int) -> dict:
+    from embeddings import get_embedding_provider
+
+    baseline_rss = rss_mb()
+    start = time.perf_counter()
+    provider = get_embedding_provider(backend=backend)
+    load_s = time.perf_counter() - start
+    provider.batch_size = max(BATCH_SIZES)
+    provider.embed(["warmup"])
+
+    result = {
+        "backend": provider.backend,
+        "load_s": round(load_s, 3),
+        "model_rss_mb": round(rss_mb() - baseline_rss, 1),
+        "batches": [],
+    }
+    for batch_size in BATCH_SIZES:
+        texts = [f"{SAMPLE_TEXT} ({i})" for i in range(batch_size)]
+        timings = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            provider.embed(texts)
+            timings.append(time.perf_counter() - t0)
+        timings.sort()
+        p50 = statistics.median(timings)
+        result["batches"].append({
+            "batch_size": batch_size,
+            "p50_ms": round(p50 * 1000, 2),
+            "max_ms": round(timings[-1] * 1000, 2),
+            "texts_per_s": round(batch_size / p50, 1),
+        })
+    result["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark embedding backends")
+    parser.add_argument("--backends", default="torch,onnx,onnx-int8")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_backend(args.worker, args.repeats)))
+        return
+
+    results = []
+    for backend in args.backends.split(","):
+        proc = subprocess.run(
+            [sys.executable, __file__, "--worker", backend, "--repeats", str(args.repeats)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(f"❌ {backend} failed:\n{proc.stderr[-2000:]}")
+            continue
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print("\n" + "=" * 78)
+    print("EMBEDDING BACKEND BENCHMARK")
+    print("=" * 78)
+    for r in results:
+        print(f"\n▶ {r['backend']}: load {r['load_s']}s, model RSS +{r['model_rss_mb']} MB, peak RSS {r['peak_rss_mb']} MB")
+        print(f"   {'batch':>6} {'p50 ms':>10} {'max ms':>10} {'texts/s':>10}")
+        for b in r["batches"]:
+            print(f"   {b['batch_size']:>6} {b['p50_ms']:>10} {b['max_ms']:>10} {b['texts_per_s']:>10}")
+
+
+if __name__ == "__main__":
+    main()
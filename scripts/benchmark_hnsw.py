@@ -0,0 +1,120 @@
+"""
+HNSW tuning benchmark
+Rebuilds the active index's vectors into scratch Chroma collections for a grid of
+M / construction_ef / search_ef and reports build time, on-disk size, query latency,
+recall@k against exact search and hit@k on a labeled statute query set.
+
+Usage:
+    python scripts/benchmark_hnsw.py [--k 5] [--queries 200] [--m 8,16,32] [--construction-ef 100,200] [--search-ef 10,50,100]
+
+Apply the chosen setting with HNSW_M / HNSW_CONSTRUCTION_EF / HNSW_SEARCH_EF and re-run
+scripts/ingest_vector.py --fresh (parameters are fixed when a collection is created).
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import itertools
+import tempfile
+import statistics
+
+import chromadb
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rag_service'))
+
+from embeddings import get_embedding_provider, ProviderEmbeddingFunction
+from vector_store import open_vector_store, export_collection, get_or_create_collection
+from index_snapshots import current_version
+from ingestion import StatuteMappingSource
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "rag_service", "data")
+UPSERT_BATCH = 2000
+
+
+def int_list(value: str) -> list:
+    return [int(v) for v in value.split(",") if v]
+
+
+def load_labeled_queries(limit: int) -> list:
+    """(question, expected document id) pairs built from the IPC/BNS mapping topics"""
+    # Ids come from the ingestion source itself, so they match what scripts/ingest.py stored
+    source = StatuteMappingSource(os.path.join(DATA_DIR, "ipc_bns_mapping.json"))
+    labeled = list({meta["topic"].lower(): (f"What is the punishment for {meta['topic'].lower()}?", doc_id)
+                    for doc_id, _, meta in source.documents()
+                    if meta["law"] == "BNS" and meta.get("topic") and meta.get("bns_section")}.values())
+    step = max(1, len(labeled) // limit)
+    return labeled[::step][:limit]
+
+
+def exact_top_k(embeddings, query_embeddings, k: int) -> list:
+    import numpy as np
+
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    queries = np.asarray(query_embeddings, dtype=np.float32)
+    distances = (queries ** 2).sum(1)[:, None] + (matrix ** 2).sum(1)[None, :] - 2 * queries @ matrix.T
+    return [list(np.argsort(row)[:k]) for row in distances]
+
+
+def dir_size_mb(path: str) -> float:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HNSW parameter sweep")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--m", type=int_list, default=[8, 16, 32])
+    parser.add_argument("--construction-ef", type=int_list, default=[100, 200])
+    parser.add_argument("--search-ef", type=int_list, default=[10, 50, 100])
+    args = parser.parse_args()
+
+    ef = ProviderEmbeddingFunction(get_embedding_provider())
+    source = open_vector_store(ef, backend="chroma", version=current_version(), sharded=False)
+    ids, embeddings, documents, metadatas = export_collection(source)
+    labeled = load_labeled_queries(args.queries)
+    query_embeddings = ef([q for q, _ in labeled])
+    truth = [[ids[row] for row in rows] for rows in exact_top_k(embeddings, query_embeddings, args.k)]
+    print(f"\n📊 {len(ids)} vectors, {len(labeled)} labeled queries, k={args.k}\n")
+
+    rows = []
+    scratch = tempfile.mkdtemp(prefix="hnsw_bench_")
+    try:
+        for m, construction_ef, search_ef in itertools.product(args.m, args.construction_ef, args.search_ef):
+            path = os.path.join(scratch, f"m{m}_c{construction_ef}_s{search_ef}")
+            client = chromadb.PersistentClient(path=path)
+            collection = get_or_create_collection(client, "bench", ef, M=m, construction_ef=construction_ef,
+                                                  search_ef=search_ef)
+            start = time.perf_counter()
+            for i in range(0, len(ids), UPSERT_BATCH):
+                collection.add(ids=ids[i:i + UPSERT_BATCH], embeddings=embeddings[i:i + UPSERT_BATCH],
+                               documents=documents[i:i + UPSERT_BATCH], metadatas=metadatas[i:i + UPSERT_BATCH])
+            build_s = time.perf_counter() - start
+
+            latencies, recalls, hits = [], [], []
+            for (_, expected), embedding, exact in zip(labeled, query_embeddings, truth):
+                t0 = time.perf_counter()
+                found = collection.query(query_embeddings=[embedding], n_results=args.k, include=["distances"])["ids"][0]
+                latencies.append((time.perf_counter() - t0) * 1000)
+                recalls.append(len(set(found) & set(exact)) / max(1, len(exact)))
+                hits.append(expected in found)
+            latencies.sort()
+            client.clear_system_cache()
+            rows.append((m, construction_ef, search_ef, build_s, dir_size_mb(path), statistics.median(latencies),
+                         latencies[max(0, int(len(latencies) * 0.99) - 1)], statistics.mean(recalls),
+                         statistics.mean(hits)))
+            print(f"   M={m} construction_ef={construction_ef} search_ef={search_ef} done")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    print(f"\n{'M':>4} {'c_ef':>5} {'s_ef':>5} {'build s':>8} {'disk MB':>8} {'p50 ms':>7} {'p99 ms':>7} "
+          f"{'recall@' + str(args.k):>9} {'hit@' + str(args.k):>7}")
+    for m, c_ef, s_ef, build_s, size_mb, p50, p99, rec, hit in rows:
+        print(f"{m:>4} {c_ef:>5} {s_ef:>5} {build_s:>8.2f} {size_mb:>8.2f} {p50:>7.2f} {p99:>7.2f} {rec:>9.3f} {hit:>7.3f}")
+    print("\nrecall is against exact search over the same vectors; hit is the labeled statute appearing in the top k")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark native PDF extraction (text layer + page classification, no OCR): serial vs page-range
+sharding across the TextProcessor process pool.
+
+Synthetic judgments of increasing length are generated with PyMuPDF (dense text pages, like a
+Supreme Court PDF), extracted in-process and in parallel, and checked for identical page-ordered
+output. Pool start-up (spawn + PyMuPDF import) is paid once per service process and reported apart.
+
+Usage:
+    python scripts/benchmark_pdf_extraction.py [--pages 50,200,500] [--workers 4] [--repeats 3]
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rag_service'))
+
+from text_processor import PDF_WORKERS, TextProcessor
+
+PARAGRAPH = (
+    "The appellant was convicted under Section {n} of the Indian Penal Code and sentenced to rigorous "
+    "imprisonment. Learned counsel for the appellant submitted that the prosecution failed to establish "
+    "the chain of circumstances beyond reasonable doubt, and that the High Court erred in reversing the acquittal."
+)
+
+
+def make_synthetic_pdf(pages: int, lines_per_page: int = 55) -> bytes:
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    for p in range(pages):
+        page = doc.new_page()
+        text = "\n".join(PARAGRAPH.format(n=300 + (p + i) % 200)[i % 40:i % 40 + 95] for i in range(lines_per_page))
+        page.insert_text((40, 40), f"Page {p + 1}\n{text}", fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def timed(processor: TextProcessor, data: bytes, workers: int, repeats: int):
+    runs, pages = [], None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        pages = processor.extract_pages(data, workers=workers, ocr=False)
+        runs.append(time.perf_counter() - t0)
+    return statistics.median(runs), pages, dict(processor.last_extraction_stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serial vs parallel per-page PDF extraction")
+    parser.add_argument("--pages", default="50,200,500", help="Comma-separated synthetic document lengths")
+    parser.add_argument("--workers", type=int, default=max(2, PDF_WORKERS))
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    processor = TextProcessor()
+    warm = make_synthetic_pdf(64)
+    t0 = time.perf_counter()
+    processor.extract_pages(warm, workers=args.workers, ocr=False)
+    print(f"⏱️  Pool start-up ({args.workers} workers, first document): {time.perf_counter() - t0:.2f}s\n")
+
+    print(f"{'pages':>6} {'MB':>6} {'serial s':>9} {'parallel s':>11} {'speed-up':>9} {'pages/s':>9} "
+          f"{'page p50 ms':>12} {'page p95 ms':>12}")
+    try:
+        for n in [int(p) for p in args.pages.split(",") if p.strip()]:
+            data = make_synthetic_pdf(n)
+            serial_s, serial_pages, _ = timed(processor, data, 1, args.repeats)
+            parallel_s, parallel_pages, stats = timed(processor, data, args.workers, args.repeats)
+            if serial_pages != parallel_pages:
+                raise AssertionError(f"{n} pages: parallel output differs from serial (page order broken)")
+            print(f"{n:>6} {len(data) / 1e6:>6.1f} {serial_s:>9.3f} {parallel_s:>11.3f} {serial_s / parallel_s:>8.2f}x "
+                  f"{n / parallel_s:>9.1f} {stats['p50_ms']:>12.2f} {stats['p95_ms']:>12.2f}")
+    finally:
+        processor.close()
+
+
+if __name__ == "__main__":
+    main()
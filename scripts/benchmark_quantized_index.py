@@ -0,0 +1,132 @@
+"""
+Recall-vs-memory benchmark for quantized indexes
+Compares binary / int8 (optionally PCA-reduced) first-pass + rescoring against exact search and the Chroma HNSW index.
+
+Usage:
+    python scripts/benchmark_quantized_index.py [--index rag_service/mmap_index] [--k 5] [--queries 200]
+    python scripts/benchmark_quantized_index.py --build binary [--pca 128]   (write codes into the index for serving)
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rag_service'))
+
+from embeddings import get_embedding_provider, ProviderEmbeddingFunction
+from vector_store import MmapVectorStore, open_vector_store, MMAP_INDEX_PATH
+from quantized_index import QuantizedVectorStore, build_quantized_codes
+from index_snapshots import current_version, snapshot_path
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "rag_service", "data")
+
+CONFIGS = [("binary", None), ("binary", 192), ("int8", None), ("int8", 128)]
+RESCORE_FACTORS = [2, 5, 10, 20]
+
+
+def load_queries(limit: int) -> list:
+    """Natural-language questions derived from statute topics and judgment keywords"""
+    queries = []
+    with open(os.path.join(DATA_DIR, "ipc_bns_mapping.json"), 'r', encoding='utf-8') as f:
+        for item in json.load(f):
+            if item.get("topic"):
+                queries.append(f"What is the punishment for {item['topic'].lower()}?")
+    with open(os.path.join(DATA_DIR, "golden_dataset.json"), 'r', encoding='utf-8') as f:
+        for topic in json.load(f):
+            if topic.get("keywords"):
+                queries.append(f"Supreme Court judgment on {', '.join(topic['keywords'][:2])}")
+    seen = list(dict.fromkeys(queries))
+    step = max(1, len(seen) // limit)
+    return seen[::step][:limit]
+
+
+def dir_size_mb(path: str, names=None) -> float:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            if names is None or name in names:
+                total += os.path.getsize(os.path.join(root, name))
+    return total / 1e6
+
+
+def recall(truth: list, found: list) -> float:
+    return statistics.mean(len(set(t) & set(f)) / max(1, len(t)) for t, f in zip(truth, found))
+
+
+def timed_search(store, query_embeddings, k: int):
+    latencies, ids = [], []
+    for embedding in query_embeddings:
+        t0 = time.perf_counter()
+        result = store.query(query_embeddings=[embedding], n_results=k, include=["distances"])
+        latencies.append((time.perf_counter() - t0) * 1000)
+        ids.append(result["ids"][0])
+    latencies.sort()
+    return ids, statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantized index recall/memory benchmark")
+    version = current_version()
+    default_index = os.path.join(snapshot_path(version), "mmap_index") if version else MMAP_INDEX_PATH
+    parser.add_argument("--index", default=default_index)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--build", choices=["binary", "int8"], default=None)
+    parser.add_argument("--pca", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.build:
+        build_quantized_codes(args.index, mode=args.build, pca_dim=args.pca)
+        print("Serve with VECTOR_BACKEND=quantized")
+        return
+
+    ef = ProviderEmbeddingFunction(get_embedding_provider())
+    queries = load_queries(args.queries)
+    query_embeddings = ef(queries)
+    exact = MmapVectorStore(args.index, embedding_function=ef)
+    dim = exact.matrix.shape[1]
+    n = exact.count()
+    print(f"\n📊 {len(queries)} queries, {n} vectors, {dim}-dim, k={args.k}\n")
+
+    truth, p50, p99 = timed_search(exact, query_embeddings, args.k)
+    rows = [("exact float32 (mmap)", 1.0, p50, p99, dim * 4, dir_size_mb(args.index, {"embeddings.npy"}))]
+
+    try:
+        chroma = open_vector_store(ef, backend="chroma", version=version)
+        found, p50, p99 = timed_search(chroma, query_embeddings, args.k)
+        chroma_dir = os.path.dirname(args.index) if version else os.path.join(BASE_DIR, "rag_service", "chroma_db")
+        rows.append(("chroma HNSW", recall(truth, found), p50, p99, None, dir_size_mb(chroma_dir)))
+    except Exception as e:
+        print(f"⚠️ Chroma comparison skipped: {e}")
+
+    scratch = tempfile.mkdtemp(prefix="quant_bench_")
+    try:
+        for mode, pca_dim in CONFIGS:
+            work = os.path.join(scratch, f"{mode}_{pca_dim or dim}")
+            shutil.copytree(args.index, work)
+            info = build_quantized_codes(work, mode=mode, pca_dim=pca_dim)
+            for factor in RESCORE_FACTORS:
+                store = QuantizedVectorStore(work, embedding_function=ef, rescore_factor=factor)
+                found, p50, p99 = timed_search(store, query_embeddings, args.k)
+                label = f"{mode}{f'+pca{pca_dim}' if pca_dim else ''} x{factor}"
+                rows.append((label, recall(truth, found), p50, p99, info["code_bytes_per_vector"],
+                             dir_size_mb(work, {f"codes_{mode}.npy"})))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    print(f"\n{'index':<26} {'recall@' + str(args.k):>10} {'p50 ms':>8} {'p99 ms':>8} {'B/vector':>9} {'resident MB':>12}")
+    for label, r, p50, p99, bytes_per_vector, size_mb in rows:
+        bpv = "-" if bytes_per_vector is None else str(bytes_per_vector)
+        print(f"{label:<26} {r:>10.3f} {p50:>8.2f} {p99:>8.2f} {bpv:>9} {size_mb:>12.2f}")
+    print("\nrecall is measured against exact float32 search; 'resident MB' is the data scanned on every query"
+          " (for Chroma: the whole on-disk directory)")
+
+
+if __name__ == "__main__":
+    main()
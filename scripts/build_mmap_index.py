@@ -0,0 +1,70 @@
+"""
+Export the Chroma 'legal_knowledge' collection (or a corpus.arrow file) into a memory-mapped exact-search
+index (rag_service/mmap_index by default) and compare it against its source on a few queries.
+--from-corpus never opens Chroma (chromadb need not be installed).
+
+Usage:
+    python scripts/build_mmap_index.py [--dtype float32|float16] [--out rag_service/mmap_index] [--from-corpus [PATH]]
+Then start the service with VECTOR_BACKEND=mmap.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rag_service'))
+
+from embeddings import get_embedding_provider, ProviderEmbeddingFunction
+from vector_store import MmapVectorStore, open_vector_store, export_collection, MMAP_INDEX_PATH
+from corpus import Corpus, CorpusVectorStore, open_corpus
+from index_snapshots import current_version
+
+SAMPLE_QUERIES = [
+    "What is the punishment for murder?",
+    "Punishment for identity theft under IT Act",
+    "Cheating and dishonestly inducing delivery of property",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build memory-mapped exact vector index from Chroma")
+    parser.add_argument("--out", default=MMAP_INDEX_PATH)
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"])
+    parser.add_argument("--from-corpus", nargs="?", const="", default=None,
+                        help="Read vectors from a corpus.arrow file (default: the active snapshot's) instead of Chroma")
+    args = parser.parse_args()
+
+    ef = ProviderEmbeddingFunction(get_embedding_provider())
+    if args.from_corpus is not None:
+        corpus = Corpus(args.from_corpus) if args.from_corpus else open_corpus()
+        print(f"📦 Reading {corpus.count()} vectors from {corpus.path}...")
+        ids, embeddings, documents, metadatas = corpus.export()
+        collection_metadata = corpus.manifest.get("collection_metadata", {})
+        source, source_name = CorpusVectorStore(corpus.path), "corpus"
+    else:
+        source, source_name = open_vector_store(ef, backend="chroma", version=current_version()), "chroma"
+        print(f"📦 Exporting {source.count()} vectors from Chroma...")
+        ids, embeddings, documents, metadatas = export_collection(source)
+        collection_metadata = source.metadata or {}
+
+    MmapVectorStore.build(
+        args.out, ids, embeddings, documents, metadatas, dtype=args.dtype,
+        extra_manifest={"collection_metadata": collection_metadata},
+    )
+
+    mmap_store = MmapVectorStore(args.out, embedding_function=ef)
+    print(f"\n🔍 {source_name} vs mmap (exact) top-5:")
+    for query in SAMPLE_QUERIES:
+        query_embedding = ef([query])
+        t0 = time.perf_counter()
+        a = source.query(query_embeddings=query_embedding, n_results=5)
+        t1 = time.perf_counter()
+        b = mmap_store.query(query_embeddings=query_embedding, n_results=5)
+        t2 = time.perf_counter()
+        overlap = len(set(a["ids"][0]) & set(b["ids"][0]))
+        print(f"   '{query[:40]}': overlap {overlap}/5, {source_name} {1000 * (t1 - t0):.2f} ms, mmap {1000 * (t2 - t1):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Compact an index snapshot: purge tombstoned documents from the HNSW segments.
+
+Chroma deletes only mark vectors deleted, so an index that has been re-ingested many times keeps
+the space (and graph nodes) of every document it ever held. Compaction copies the live documents
+and their stored vectors into freshly built collections (main and shard collections) in a new
+snapshot, vacuums the doc store, clears the tombstone log and reports the space reclaimed.
+Nothing is re-embedded, and the snapshot being compacted is left untouched.
+
+Usage:
+    python scripts/compact_index.py [--version v20250101-120000] [--no-activate] [--dry-run]
+Without snapshots the legacy rag_service/chroma_db is compacted into a new snapshot.
+"""
+
+import os
+import sys
+import shutil
+import argparse
+
+import chromadb
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rag_service'))
+
+from vector_store import CHROMA_PATH, COLLECTION_NAME
+from retrieval import SHARD_COLLECTIONS
+from doc_store import DOC_STORE_FILE, DOC_STORE_PATH
+from compaction import (TOMBSTONE_FILE, TOMBSTONE_PATH, TombstoneLog, compact_collections, dir_size,
+                        vacuum_doc_store)
+from index_snapshots import (begin_snapshot, publish_snapshot, abort_snapshot, current_version, read_manifest,
+                             snapshot_path)
+
+
+def compact_index(version: str = None, activate: bool = True, dry_run: bool = False) -> dict:
+    """
+    Compact a snapshot (default: CURRENT) into a new one
+
+    Returns:
+        Report: tombstones, documents, bytes before / after / reclaimed
+    """
+    version = version or current_version()
+    if version:
+        db_path = os.path.join(snapshot_path(version), "chroma_db")
+        doc_store_path = os.path.join(snapshot_path(version), DOC_STORE_FILE)
+        tombstones = TombstoneLog(os.path.join(snapshot_path(version), TOMBSTONE_FILE))
+    else:
+        db_path, doc_store_path, tombstones = CHROMA_PATH, DOC_STORE_PATH, TombstoneLog(TOMBSTONE_PATH)
+    before = dir_size(db_path)
+    report = {"base_version": version, "tombstones": tombstones.pending(), "chroma_bytes_before": before}
+    print(f"🧹 {db_path}: {report['tombstones']} tombstoned documents, {before / 1e6:.1f} MB")
+    if dry_run:
+        return report
+
+    source_client = chromadb.PersistentClient(path=db_path)
+    new_version, build_path = begin_snapshot(base_version=version)
+    try:
+        target_path = os.path.join(build_path, "chroma_db")
+        shutil.rmtree(target_path, ignore_errors=True)
+        if not version and os.path.exists(doc_store_path):
+            shutil.copy2(doc_store_path, os.path.join(build_path, DOC_STORE_FILE))
+        target_client = chromadb.PersistentClient(path=target_path)
+        copied = compact_collections(source_client, target_client, [COLLECTION_NAME, *SHARD_COLLECTIONS.values()])
+        if COLLECTION_NAME not in copied:
+            raise ValueError(f"'{COLLECTION_NAME}' not found in {db_path}")
+        # Release Chroma's file handles before sizes are read and the build directory is renamed
+        target_client.clear_system_cache()
+
+        doc_store_reclaimed = vacuum_doc_store(os.path.join(build_path, DOC_STORE_FILE))
+        TombstoneLog(os.path.join(build_path, TOMBSTONE_FILE)).clear()
+        after = dir_size(target_path)
+        report.update({
+            "documents": copied,
+            "chroma_bytes_after": after,
+            "chroma_bytes_reclaimed": before - after,
+            "doc_store_bytes_reclaimed": doc_store_reclaimed,
+        })
+
+        manifest = {k: v for k, v in (read_manifest(version) if version else {}).items()
+                    if k not in ("version", "created_at", "backends")}
+        manifest.update({"source": "compact_index.py", "base_version": version, "count": copied[COLLECTION_NAME],
+                         "tombstones": 0, "compaction": report})
+        publish_snapshot(new_version, build_path, manifest, activate=activate)
+    except Exception:
+        abort_snapshot(build_path)
+        raise
+
+    for name, count in copied.items():
+        print(f"   {name:<22} {count:>7} live documents")
+    print(f"   chroma_db {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB "
+          f"({(before - after) / 1e6:.1f} MB reclaimed), doc store {doc_store_reclaimed / 1e6:.1f} MB reclaimed")
+    print(f"📦 Snapshot {new_version} published{' and activated' if activate else ''}. Reload the service with POST /admin/reload.")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Purge tombstoned documents by rebuilding the index segments")
+    parser.add_argument("--version", default=None, help="Snapshot to compact (default: CURRENT)")
+    parser.add_argument("--no-activate", action="store_true", help="Publish the compacted snapshot without pointing CURRENT at it")
+    parser.add_argument("--dry-run", action="store_true", help="Only report tombstones and current size")
+    args = parser.parse_args()
+    compact_index(version=args.version, activate=not args.no_activate, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
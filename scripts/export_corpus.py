@@ -0,0 +1,48 @@
+"""
+Write the columnar corpus file (corpus.arrow) for an existing index without re-embedding anything:
+documents, metadata and stored vectors are paged out of the snapshot's Chroma collection.
+New snapshots get one from `python scripts/ingest.py --with-corpus`.
+
+Usage:
+    python scripts/export_corpus.py [--version v20250101-120000] [--out PATH] [--parquet PATH]
+Then serve with VECTOR_BACKEND=corpus, or build other indexes with build_mmap_index.py --from-corpus.
+"""
+
+import os
+import sys
+import argparse
+
+import chromadb
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rag_service'))
+
+from vector_store import CHROMA_PATH, COLLECTION_NAME
+from corpus import CORPUS_FILE, CORPUS_PATH, Corpus, write_corpus_from_collection
+from index_snapshots import current_version, snapshot_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export an index snapshot into a memory-mappable Arrow corpus")
+    parser.add_argument("--version", default=None, help="Snapshot to export (default: CURRENT)")
+    parser.add_argument("--out", default=None, help=f"Output file (default: {CORPUS_FILE} inside the snapshot)")
+    parser.add_argument("--parquet", default=None, help="Also write a zstd-compressed Parquet copy here")
+    args = parser.parse_args()
+
+    version = args.version or current_version()
+    db_path = os.path.join(snapshot_path(version), "chroma_db") if version else CHROMA_PATH
+    out = args.out or (os.path.join(snapshot_path(version), CORPUS_FILE) if version else CORPUS_PATH)
+
+    client = chromadb.PersistentClient(path=db_path)
+    collection = client.get_collection(name=COLLECTION_NAME, embedding_function=None)
+    print(f"📦 Exporting {collection.count()} documents from {db_path}")
+    write_corpus_from_collection(collection, out, extra_manifest={"index_version": version})
+
+    corpus = Corpus(out)
+    print(f"✅ {out}: {corpus.count()} rows, {corpus.dimension}-dim, {os.path.getsize(out) / 1e6:.1f} MB")
+    if args.parquet:
+        corpus.to_parquet(args.parquet)
+        print(f"✅ {args.parquet}: {os.path.getsize(args.parquet) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Export the sentence-transformers embedding model to ONNX (fp32 + dynamically quantized int8)
+and validate both graphs numerically against the PyTorch model.
+
+Usage:
+    python scripts/export_onnx_embeddings.py [--model all-MiniLM-L6-v2] [--skip-int8]
+"""
+
+import os
+import sys
+import json
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rag_service'))
+
+from embeddings import DEFAULT_MODEL, onnx_model_dir, SentenceTransformerProvider, OnnxEmbeddingProvider
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "rag_service", "data")
+
+# Acceptance thresholds (cosine similarity against the PyTorch reference)
+FP32_MIN_COSINE = 0.9999
+INT8_MEAN_COSINE = 0.99
+
+
+def load_validation_texts(limit: int = 512) -> list:
+    """Real corpus text so validation covers the token lengths we actually embed"""
+    texts = []
+    mapping_path = os.path.join(DATA_DIR, "ipc_bns_mapping.json")
+    if os.path.exists(mapping_path):
+        with open(mapping_path, 'r', encoding='utf-8') as f:
+            for item in json.load(f):
+                texts.append(f"Statute: BNS Section {item.get('bns', '')}. Topic: {item.get('topic', '')}. Description: {item.get('text_bns', '')}")
+                if len(texts) >= limit:
+                    break
+    texts += [
+        "What is the punishment for murder?",
+        "Section 66A IT Act",
+        "धारा 302 के तहत सजा क्या है?",
+    ]
+    return texts
+
+
+def export_onnx(model_name: str, out_dir: str):
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(out_dir, exist_ok=True)
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0]
+    auto_model = transformer.auto_model.eval()
+    tokenizer = transformer.tokenizer
+
+    dummy = tokenizer(["export sample"], return_tensors="pt", padding=True)
+    input_names = ["input_ids", "attention_mask"] + (["token_type_ids"] if "token_type_ids" in dummy else [])
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    graph_path = os.path.join(out_dir, "model.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            auto_model,
+            tuple(dummy[name] for name in input_names),
+            graph_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+        )
+    tokenizer.save_pretrained(out_dir)
+
+    config = {
+        "model": model_name,
+        "dimension": st_model.get_sentence_embedding_dimension(),
+        "max_seq_length": st_model.max_seq_length,
+        "pooling": "mean",
+        "normalize": True,
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": tokenizer.pad_token_id,
+    }
+    with open(os.path.join(out_dir, "export_config.json"), 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2)
+    print(f"✅ Exported fp32 graph: {graph_path} ({os.path.getsize(graph_path) / 1e6:.1f} MB)")
+
+
+def quantize_int8(out_dir: str):
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    src = os.path.join(out_dir, "model.onnx")
+    dst = os.path.join(out_dir, "model.int8.onnx")
+    quantize_dynamic(src, dst, weight_type=QuantType.QInt8)
+    print(f"✅ Quantized int8 graph: {dst} ({os.path.getsize(dst) / 1e6:.1f} MB)")
+
+
+def compare(reference, candidate, k: int = 5) -> dict:
+    """Cosine agreement and top-k neighbour overlap between two embedding matrices"""
+    import numpy as np
+
+    cosines = (reference * candidate).sum(axis=1)
+    ref_top = np.argsort(-(reference @ reference.T), axis=1)[:, 1:k + 1]
+    cand_top = np.argsort(-(candidate @ candidate.T), axis=1)[:, 1:k + 1]
+    overlap = np.mean([len(set(a) & set(b)) / k for a, b in zip(ref_top, cand_top)])
+    return {
+        "min_cosine": float(cosines.min()),
+        "mean_cosine": float(cosines.mean()),
+        "max_abs_diff": float(np.abs(reference - candidate).max()),
+        f"top{k}_overlap": float(overlap),
+    }
+
+
+def validate(model_name: str, out_dir: str, include_int8: bool) -> bool:
+    texts = load_validation_texts()
+    print(f"\n🔍 Validating against PyTorch on {len(texts)} texts...")
+    reference = SentenceTransformerProvider(model_name).embed(texts)
+
+    ok = True
+    fp32 = compare(reference, OnnxEmbeddingProvider(model_name, model_dir=out_dir).embed(texts))
+    print(f"   fp32: {fp32}")
+    if fp32["min_cosine"] < FP32_MIN_COSINE:
+        print(f"   ❌ fp32 min cosine below {FP32_MIN_COSINE}")
+        ok = False
+
+    if include_int8:
+        int8 = compare(reference, OnnxEmbeddingProvider(model_name, quantized=True, model_dir=out_dir).embed(texts))
+        print(f"   int8: {int8}")
+        if int8["mean_cosine"] < INT8_MEAN_COSINE:
+            print(f"   ❌ int8 mean cosine below {INT8_MEAN_COSINE}")
+            ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export embedding model to ONNX")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--out-dir", default=None)
+    parser.add_argument("--skip-int8", action="store_true")
+    args = parser.parse_args()
+
+    out_dir = args.out_dir or onnx_model_dir(args.model)
+    export_onnx(args.model, out_dir)
+    if not args.skip_int8:
+        quantize_int8(out_dir)
+
+    if validate(args.model, out_dir, include_int8=not args.skip_int8):
+        print("\n🎉 ONNX export validated. Set EMBEDDING_BACKEND=onnx or onnx-int8 to use it.")
+    else:
+        print("\n⚠️ Validation failed. Keep EMBEDDING_BACKEND=torch.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
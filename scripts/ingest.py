@@ -0,0 +1,219 @@
+"""
+Unified incremental ingestion
+Synchronises one or more document sources into the vector index. Only documents whose
+content hash changed are re-embedded; documents a source no longer produces are deleted and
+tombstoned until the index is compacted (scripts/compact_index.py). By default the result
+is published as a new index snapshot (see index_snapshots.py).
+
+Usage:
+    python scripts/ingest.py                                   # statutes, judgments, it_act
+    python scripts/ingest.py --sources multi_domain,comprehensive
+    python scripts/ingest.py --full --fresh --sharded --with-mmap --with-corpus
+    python scripts/ingest.py --dry-run                         # report what would change
+    python scripts/ingest.py --no-dedup                        # keep near-duplicate judgments
+"""
+
+import os
+import sys
+import shutil
+import argparse
+
+import chromadb
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rag_service'))
+
+from embeddings import get_embedding_provider, ProviderEmbeddingFunction, embedding_metadata, check_embedding_compatibility
+from vector_store import CHROMA_PATH, COLLECTION_NAME, MmapVectorStore, export_collection, get_or_create_collection
+from corpus import CORPUS_FILE, write_corpus_from_collection
+from doc_store import DOC_STORE_FILE, DOC_STORE_PATH, DocStore
+from compaction import TOMBSTONE_FILE, TOMBSTONE_PATH, TombstoneLog
+from retrieval import SHARD_COLLECTIONS
+from ingestion import SOURCES, DEFAULT_SOURCES, get_sources, IncrementalIngestor
+from dedup import dedup_sources
+from embedding_pipeline import ParallelEmbedder
+from index_snapshots import begin_snapshot, publish_snapshot, abort_snapshot, current_version, snapshot_path
+
+
+def run_ingestion(source_names=None, in_place: bool = False, fresh: bool = False, activate: bool = True,
+                  with_mmap: bool = False, with_corpus: bool = False, sharded: bool = False, full: bool = False,
+                  dry_run: bool = False, batch_size: int = None, workers: int = None, dedup: bool = True,
+                  dedup_threshold: float = None) -> list:
+    """
+    Synchronise sources into the index
+
+    Args:
+        source_names: Sources to run (default: DEFAULT_SOURCES)
+        in_place: Write into the legacy rag_service/chroma_db instead of a new snapshot
+        fresh: Start the snapshot empty instead of copying the active index
+        activate: Point CURRENT at the published snapshot
+        with_mmap: Also write an mmap_index into the snapshot
+        with_corpus: Also write corpus.arrow (documents, metadata and vectors) into the snapshot
+        sharded: Keep per-type shard collections in step (VECTOR_SHARDS=true)
+        full: Re-embed unchanged documents too
+        dry_run: Only report what would change (never publishes)
+        batch_size: Documents per embed/upsert batch (INGEST_BATCH_SIZE)
+        workers: Embedding worker processes (EMBED_WORKERS); 1 embeds in this process
+        dedup: Collapse near-duplicates in sources that opt in (see dedup.py)
+        dedup_threshold: Estimated Jaccard similarity above which documents are merged (DEDUP_THRESHOLD)
+
+    Returns:
+        Per-source stats dicts
+    """
+    sources = []
+    for source in get_sources(source_names):
+        if source.available():
+            sources.append(source)
+        else:
+            print(f"⚠️ Source '{source.name}' has no input, skipped")
+    if dedup:
+        sources = dedup_sources(sources, dedup_threshold)
+
+    base_version = None
+    if in_place or dry_run:
+        active = None if in_place else current_version()
+        db_path = os.path.join(snapshot_path(active), "chroma_db") if active else CHROMA_PATH
+    else:
+        base_version = None if fresh else current_version()
+        version, build_path = begin_snapshot(
+            base_version=base_version,
+            base_dir=None if (fresh or base_version) else CHROMA_PATH,
+        )
+        db_path = os.path.join(build_path, "chroma_db")
+    print(f"🚀 Ingesting {', '.join(s.name for s in sources)} into {db_path}{' (dry run)' if dry_run else ''}")
+
+    provider = doc_store = None
+    try:
+        client = chromadb.PersistentClient(path=db_path)
+        workers = workers or int(os.getenv("EMBED_WORKERS", "1"))
+        if workers > 1 and not dry_run:
+            # Vectors always come from the pipeline, so the collections need no embedding function here
+            provider, ef = ParallelEmbedder(workers=workers), None
+        else:
+            provider = get_embedding_provider()
+            ef = ProviderEmbeddingFunction(provider)
+        model_metadata = embedding_metadata(provider.model_name, provider.dimension)
+        if dry_run:
+            # Never create anything in a live index
+            collection = client.get_collection(name=COLLECTION_NAME, embedding_function=ef)
+        else:
+            collection = get_or_create_collection(client, COLLECTION_NAME, ef, metadata=model_metadata)
+        # A copied base snapshot built with another model must be migrated, not mixed
+        check_embedding_compatibility(collection.metadata, provider)
+        shard_collections = {
+            shard: get_or_create_collection(client, name, ef, metadata=model_metadata)
+            for shard, name in SHARD_COLLECTIONS.items()
+        } if sharded and not dry_run else {}
+        if shard_collections and collection.count() and not any(c.count() for c in shard_collections.values()):
+            print("   Shard collections are new: re-embedding everything once to fill them")
+            full = True
+
+        # Parent/child chunk sources need the doc store; an index that already has one keeps it in step
+        doc_store_path = DOC_STORE_PATH if in_place else os.path.join(os.path.dirname(db_path), DOC_STORE_FILE)
+        if not dry_run and (any(getattr(s, "hierarchical", False) for s in sources) or os.path.exists(doc_store_path)):
+            doc_store = DocStore(doc_store_path)
+
+        tombstones = None if dry_run else TombstoneLog(
+            TOMBSTONE_PATH if in_place else os.path.join(os.path.dirname(db_path), TOMBSTONE_FILE))
+        ingestor = IncrementalIngestor(collection, provider, batch_size=batch_size, shard_collections=shard_collections,
+                                       doc_store=doc_store, tombstones=tombstones)
+        all_stats = []
+        for source in sources:
+            stats = ingestor.ingest(source, full=full, dry_run=dry_run)
+            all_stats.append(stats)
+            print(f"   {stats['source']:<14} seen {stats['seen']:>6}  unchanged {stats['unchanged']:>6}  "
+                  f"upserted {stats['upserted']:>6}  deleted {stats['deleted']:>5}  "
+                  f"{stats['seconds']:>7.2f}s  {stats['docs_per_sec']:>8.1f} docs/s")
+            if getattr(source, "report", None):
+                stats["dedup"] = dedup_report = source.report
+                vector_mb = dedup_report["dropped"] * (provider.dimension or 0) * 4 / 1e6
+                print(f"   {'':<14} dedup: {dedup_report['documents']} -> {dedup_report['kept']} documents "
+                      f"(-{dedup_report['reduction']:.0%}, {vector_mb:.1f} MB of vectors not indexed)")
+        count = collection.count()
+        print(f"📊 {count} documents in '{COLLECTION_NAME}'")
+        if doc_store:
+            print(f"   doc store: {doc_store.count()}")
+        pending_tombstones = tombstones.pending() if tombstones else 0
+        if pending_tombstones:
+            print(f"   {pending_tombstones} tombstoned documents still occupy the HNSW segment; "
+                  f"reclaim with scripts/compact_index.py")
+        report = ingestor.pipeline_stats.report()
+        for stage, entry in report["stages"].items():
+            print(f"   stage {stage:<10} {entry['items']:>7} docs  {entry['seconds']:>8.2f}s  {entry['items_per_sec']:>9.1f} docs/s")
+        print(f"   CPU {report['cpu_s']}s over {report['wall_s']}s wall ({report['cpu_utilisation']:.0%} of {os.cpu_count()} cores)")
+    except Exception:
+        if not (in_place or dry_run):
+            abort_snapshot(build_path)
+        raise
+    finally:
+        if hasattr(provider, "close"):
+            provider.close()
+        if doc_store:
+            doc_store.close()
+
+    if in_place or dry_run:
+        return all_stats
+
+    try:
+        mmap_path = os.path.join(build_path, "mmap_index")
+        if with_mmap:
+            MmapVectorStore.build(mmap_path, *export_collection(collection),
+                                  extra_manifest={"collection_metadata": collection.metadata or {}})
+        else:
+            # A copied base snapshot's mmap_index would no longer match the Chroma data
+            shutil.rmtree(mmap_path, ignore_errors=True)
+        corpus_path = os.path.join(build_path, CORPUS_FILE)
+        if with_corpus:
+            write_corpus_from_collection(collection, corpus_path, extra_manifest={"sources": [s.name for s in sources]})
+        elif os.path.exists(corpus_path):
+            os.remove(corpus_path)
+        # Release Chroma's file handles before the build directory is renamed
+        client.clear_system_cache()
+        publish_snapshot(version, build_path, {
+            "source": "ingest.py",
+            "sources": [s.name for s in sources],
+            "base_version": base_version,
+            "count": count,
+            "tombstones": pending_tombstones,
+            "sharded": sharded,
+            "hnsw": {k: v for k, v in (collection.metadata or {}).items() if k.startswith("hnsw:")},
+            "embedding": provider.describe(),
+            "ingest_stats": all_stats,
+            "pipeline": report,
+        }, activate=activate)
+        print(f"📦 Snapshot {version} published{' and activated' if activate else ''}. Reload the service with POST /admin/reload.")
+    except Exception:
+        abort_snapshot(build_path)
+        raise
+    return all_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally synchronise document sources into the vector index")
+    parser.add_argument("--sources", default=",".join(DEFAULT_SOURCES),
+                        help=f"Comma-separated sources: {', '.join(SOURCES)}")
+    parser.add_argument("--in-place", action="store_true", help="Write into the legacy rag_service/chroma_db instead of a new snapshot")
+    parser.add_argument("--fresh", action="store_true", help="Start the snapshot empty instead of copying the active index")
+    parser.add_argument("--no-activate", action="store_true", help="Publish the snapshot without pointing CURRENT at it")
+    parser.add_argument("--with-mmap", action="store_true", help="Also write an mmap_index into the snapshot")
+    parser.add_argument("--with-corpus", action="store_true", help="Also write corpus.arrow into the snapshot")
+    parser.add_argument("--sharded", action="store_true", help="Also maintain per-type shard collections")
+    parser.add_argument("--full", action="store_true", help="Re-embed unchanged documents too")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes against the active index without writing")
+    parser.add_argument("--batch-size", type=int, default=None, help="Documents per embed/upsert batch (INGEST_BATCH_SIZE)")
+    parser.add_argument("--workers", type=int, default=None, help="Embedding worker processes (EMBED_WORKERS, default 1)")
+    parser.add_argument("--no-dedup", action="store_true", help="Keep near-duplicate documents")
+    parser.add_argument("--dedup-threshold", type=float, default=None,
+                        help="Jaccard similarity for near-duplicates (DEDUP_THRESHOLD, default 0.8)")
+    args = parser.parse_args()
+
+    run_ingestion(
+        source_names=[s.strip() for s in args.sources.split(",") if s.strip()],
+        in_place=args.in_place, fresh=args.fresh, activate=not args.no_activate, with_mmap=args.with_mmap,
+        with_corpus=args.with_corpus,
+        sharded=args.sharded, full=args.full, dry_run=args.dry_run, batch_size=args.batch_size,
+        workers=args.workers, dedup=not args.no_dedup, dedup_threshold=args.dedup_threshold,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,44 @@
+"""
+Supreme Court judgment ingestion (Kaggle "legal-dataset-sc-judgments-india", 1950-2024)
+PDFs are parsed by a pool of worker processes. Every finished file is checkpointed in a manifest
+(path, size, mtime, sha256, status), and matched cases are appended to an NDJSON file as they come in,
+so an interrupted run resumes where it stopped instead of starting over. Files that take longer than
+--timeout are abandoned (their worker is killed) and recorded as "timeout". At the end, new cases are
+merged into golden_dataset.json. With --full-text, every page of a matched judgment is extracted into
+the NDJSON as well, for hierarchical (parent/child chunk) indexing.
+
+Usage:
+    python scripts/ingest_kaggle_data.py [--source DIR] [--workers 8] [--limit 1000] [--timeout 60] [--retry-failed] [--full-text]
+Then re-index the judgments:
+    python scripts/ingest.py --sources judgments[,judgment_texts]
+"""
+
+import io
 import os
 import json
+import time
 import random
-from typing import List, Dict, Any
-import io
-
-try:
-    from pypdf import PdfReader
-except ImportError:
-    print("Error: 'pypdf' is not installed. Please run: pip install pypdf")
-    exit(1)
-
-# --- CONFIGURATION ---
-# UPDATE THIS PATH to where you unzipped the Kaggle Dataset
-# Example: "C:/Downloads/legal-dataset-sc-judgments-india/1950_2024"
-SOURCE_DIR = r"dataset" 
+import hashlib
+import argparse
+import multiprocessing
+from collections import deque
+from typing import Dict, Any, Optional, Tuple
 
 # Resolve paths relative to this script
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-OUTPUT_FILE = os.path.join(BASE_DIR, "rag_service", "data", "golden_dataset.json")
-# SOURCE_DIR is relative to CWD if running from root, or absolute
-SOURCE_DIR = os.path.join(BASE_DIR, "supreme_court_judgments")
+DATA_DIR = os.path.join(BASE_DIR, "rag_service", "data")
+OUTPUT_FILE = os.path.join(DATA_DIR, "golden_dataset.json")
+# Append-only results and checkpoint manifest (one JSON object per line)
+CASES_FILE = os.path.join(DATA_DIR, "kaggle_cases.ndjson")
+MANIFEST_FILE = os.path.join(DATA_DIR, "kaggle_manifest.ndjson")
+# Where the Kaggle archive was unzipped (year folders of PDFs)
+SOURCE_DIR = os.getenv("KAGGLE_JUDGMENTS_DIR", os.path.join(BASE_DIR, "supreme_court_judgments"))
 TARGET_COUNT = 1000
+# Limit to first pages for speed and relevance (summaries are usually at start/end)
+MAX_PAGES = 5
+
+# Statuses that are final for an unchanged file; "error" and "timeout" are retried with --retry-failed
+DONE_STATUSES = {"matched", "no_match", "no_text", "duplicate"}
 
 # Keywords to identify "Important" cases and classify them
 TOPIC_KEYWORDS = {
@@ -32,39 +50,39 @@ TOPIC_KEYWORDS = {
     "Constitution": ["Constitution Bench", "Article 21", "Fundamental Rights", "Public Interest Litigation"]
 }
 
-def extract_text_from_pdf(filepath: str) -> str:
-    """Extracts text from a single PDF file."""
+
+def extract_text_from_pdf(data: bytes, max_pages: Optional[int] = MAX_PAGES) -> str:
+    """Extracts text from the first pages of a PDF (every page when max_pages is None)."""
+    from pypdf import PdfReader
+
     text = ""
-    try:
-        reader = PdfReader(filepath)
-        # Limit to first 5 pages for speed and relevance (summaries are usually at start/end)
-        for i, page in enumerate(reader.pages[:5]): 
-            extracted = page.extract_text()
-            if extracted:
-                text += extracted + "\n"
-    except Exception as e:
-        print(f"Skipping {filepath}: {e}")
+    reader = PdfReader(io.BytesIO(data))
+    for page in reader.pages[:max_pages]:
+        extracted = page.extract_text()
+        if extracted:
+            text += extracted + "\n"
     return text
 
+
 def analyze_and_format(filename: str, text: str) -> Dict[str, Any] | None:
     """
     Analyzes text to see if it matches our topics and formats it for golden_dataset.json.
     """
     text_lower = text.lower()
-    
+
     # Check for match
     matched_topic = None
     for topic, keywords in TOPIC_KEYWORDS.items():
         if any(k.lower() in text_lower for k in keywords):
             matched_topic = topic
             break
-            
+
     if not matched_topic:
         return None
 
     # Heuristic Extraction (Mocking 'Intelligent' Parsing)
     # in a real scenario, an LLM would do this breakdown
-    
+
     return {
         "keywords": [matched_topic.lower(), "supreme court", "judgment", filename],
         "ipc": {
@@ -77,9 +95,9 @@ def analyze_and_format(filename: str, text: str) -> Dict[str, Any] | None:
         },
         "hindi_response": "यह मामला सर्वोच्च न्यायालय के महत्वपूर्ण निर्णयों में से एक है।",
         "case_laws": [
-            { 
-                "title": filename.replace('.pdf', ''), 
-                "summary": f"A landmark case regarding {matched_topic}. The court held verifyable observations on the matter." 
+            {
+                "title": filename.replace('.pdf', ''),
+                "summary": f"A landmark case regarding {matched_topic}. The court held verifyable observations on the matter."
             }
         ],
         "arguments": {
@@ -92,63 +110,245 @@ def analyze_and_format(filename: str, text: str) -> Dict[str, Any] | None:
         }
     }
 
-def main():
-    print(f"🚀 Starting Ingestion from: {SOURCE_DIR}")
-    
-    if not os.path.exists(SOURCE_DIR) or SOURCE_DIR == "path/to/your/downloaded/pdfs":
-        print(f"❌ Error: Please edit the script to point to the actual PDF folder.\nCurrent path: {SOURCE_DIR}")
-        return
 
-    extracted_cases = []
-    files_processed = 0
-    
-    # Walk through year directories
-    for root, dirs, files in os.walk(SOURCE_DIR):
-        pdf_files = [f for f in files if f.lower().endswith('.pdf')]
-        
-        # Shuffle to get a mix of random years/cases
-        random.shuffle(pdf_files)
-        
-        for file in pdf_files:
-            if len(extracted_cases) >= TARGET_COUNT:
-                break
-                
+def process_file(filepath: str, max_pages: int, full_text: bool = False) -> Dict[str, Any]:
+    """Worker: hash, parse and classify one PDF (and extract all of a matched judgment with full_text)"""
+    start = time.perf_counter()
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    result = {"sha256": hashlib.sha256(data).hexdigest(), "entry": None}
+    try:
+        text = extract_text_from_pdf(data, max_pages)
+    except Exception as e:
+        result.update(status="error", error=f"{type(e).__name__}: {e}")
+    else:
+        if len(text) < 100:  # Skip empty/scanned image PDFs
+            result["status"] = "no_text"
+        else:
+            result["entry"] = analyze_and_format(os.path.basename(filepath), text)
+            result["status"] = "matched" if result["entry"] else "no_match"
+            if result["entry"] and full_text:
+                result["text"] = extract_text_from_pdf(data, None)
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def read_records(path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Latest record per relative path in an NDJSON checkpoint file (a torn last line from a crash is ignored)"""
+    path = path or MANIFEST_FILE
+    records = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                records[record["path"]] = record
+    return records
+
+
+def append_line(f, record: Dict[str, Any]):
+    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def scan_pdfs(source_dir: str, manifest: Dict[str, Dict[str, Any]], retry_failed: bool, seed: Optional[int],
+              full_text: bool = False):
+    """(relative path, stat) of every PDF that still needs processing, plus the number already done"""
+    todo, done = [], 0
+    for root, dirs, files in os.walk(source_dir):
+        dirs.sort()
+        for file in sorted(files):
+            if not file.lower().endswith('.pdf'):
+                continue
             filepath = os.path.join(root, file)
-            print(f"Processing: {file}...")
-            
-            text = extract_text_from_pdf(filepath)
-            if len(text) < 100: # Skip empty/scanned image PDFs
+            rel = os.path.relpath(filepath, source_dir).replace(os.sep, "/")
+            st = os.stat(filepath)
+            previous = manifest.get(rel)
+            unchanged = previous and previous.get("size") == st.st_size and previous.get("mtime_ns") == st.st_mtime_ns
+            # Judgments matched before --full-text was used are extracted again to pick up their text
+            needs_text = full_text and previous and previous["status"] == "matched" and not previous.get("full_text")
+            if unchanged and not needs_text and (previous["status"] in DONE_STATUSES or not retry_failed):
+                done += 1
                 continue
-                
-            entry = analyze_and_format(file, text)
-            if entry:
-                extracted_cases.append(entry)
-                print(f"✅ Added Case [{len(extracted_cases)}/{TARGET_COUNT}]: {file} ({entry['keywords'][0]})")
-            
-            files_processed += 1
-            if files_processed % 50 == 0:
-                print(f"ℹ️ Scanned {files_processed} files...")
-
-        if len(extracted_cases) >= TARGET_COUNT:
-            break
-            
-    # Load existing data to append
+            todo.append((rel, st))
+    # Mix of years when only part of the corpus is wanted; seeded, so a resumed run keeps the same order
+    if seed is not None:
+        random.Random(seed).shuffle(todo)
+    return todo, done
+
+
+def format_eta(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m" if seconds >= 3600 else f"{seconds // 60}m{seconds % 60:02d}s"
+
+
+def run(source_dir: str, workers: int, limit: int, timeout: float, max_pages: int,
+        retry_failed: bool = False, seed: Optional[int] = 42, progress_every: float = 10.0,
+        full_text: bool = False) -> Dict[str, int]:
+    manifest = read_records()
+    todo, already_done = scan_pdfs(source_dir, manifest, retry_failed, seed, full_text)
+    # sha256 -> path of the file that produced the case
+    matched_hashes = {r["sha256"]: r["path"] for r in manifest.values() if r["status"] == "matched"}
+    requeued = {rel for rel, _ in todo}
+    counts = {"matched": sum(1 for r in manifest.values() if r["status"] == "matched" and r["path"] not in requeued)}
+    print(f"🚀 {len(todo)} PDFs to process ({already_done} already checkpointed), {workers} workers, "
+          f"{timeout:.0f}s per-file timeout")
+    if limit and counts["matched"] >= limit:
+        print(f"ℹ️ Already have {counts['matched']} matched cases (limit {limit})")
+        return counts
+
+    pending = deque(todo)
+    # One task per worker, so a task's submit time is also (almost exactly) its start time
+    in_flight: Dict[str, Tuple[os.stat_result, Any, float]] = {}
+
+    def new_pool():
+        # Recycle workers periodically: pypdf can leak memory on malformed files
+        return multiprocessing.Pool(workers, maxtasksperchild=200)
+
+    pool = new_pool()
+    start = last_report = time.perf_counter()
+    processed = 0
+    with open(MANIFEST_FILE, 'a', encoding='utf-8') as manifest_f, open(CASES_FILE, 'a', encoding='utf-8') as cases_f:
+
+        def record(rel: str, st: os.stat_result, result: Dict[str, Any]):
+            nonlocal processed
+            if result["status"] == "matched":
+                if matched_hashes.get(result["sha256"], rel) != rel:
+                    result["status"] = "duplicate"
+                else:
+                    matched_hashes[result["sha256"]] = rel
+                    # Case line first: a crash before the manifest line only re-processes the file,
+                    # and the merge drops the repeated line
+                    line = {"path": rel, "entry": result["entry"]}
+                    if result.get("text"):
+                        line["text"] = result["text"]
+                    append_line(cases_f, line)
+            append_line(manifest_f, {
+                "path": rel, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": result.get("sha256"),
+                "status": result["status"], "seconds": result.get("seconds"), "error": result.get("error"),
+                "full_text": "text" in result,
+            })
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+            processed += 1
+
+        try:
+            while pending or in_flight:
+                while pending and len(in_flight) < workers and not (limit and counts["matched"] >= limit):
+                    rel, st = pending.popleft()
+                    task = pool.apply_async(process_file, (os.path.join(source_dir, rel), max_pages, full_text))
+                    in_flight[rel] = (st, task, time.perf_counter())
+                if not in_flight:
+                    break
+
+                now = time.perf_counter()
+                progressed = False
+                for rel, (st, task, submitted) in list(in_flight.items()):
+                    if task.ready():
+                        del in_flight[rel]
+                        try:
+                            result = task.get()
+                        except Exception as e:
+                            result = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+                        record(rel, st, result)
+                        progressed = True
+                    elif now - submitted > timeout:
+                        # A pool task cannot be cancelled once running: kill the workers and requeue
+                        # the other in-flight files in front of the queue
+                        print(f"⏱️ Timeout after {timeout:.0f}s: {rel}")
+                        del in_flight[rel]
+                        record(rel, st, {"status": "timeout", "seconds": round(now - submitted, 3)})
+                        pool.terminate()
+                        pool.join()
+                        for other, (other_st, _, _) in in_flight.items():
+                            pending.appendleft((other, other_st))
+                        in_flight.clear()
+                        pool = new_pool()
+                        progressed = True
+                        break
+                if not progressed:
+                    time.sleep(0.02)
+
+                if now - last_report >= progress_every:
+                    last_report = now
+                    elapsed = now - start
+                    rate = processed / max(elapsed, 1e-9)
+                    remaining = len(pending) + len(in_flight)
+                    eta = format_eta(remaining / rate) if rate else "?"
+                    print(f"ℹ️ {processed}/{len(todo)} files, {rate:.1f} files/s, ETA {eta} | "
+                          f"matched {counts['matched']}, errors {counts.get('error', 0)}, "
+                          f"timeouts {counts.get('timeout', 0)}")
+        finally:
+            pool.terminate()
+            pool.join()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Processed {processed} PDFs in {elapsed:.1f}s ({processed / max(elapsed, 1e-9):.1f} files/s): {counts}")
+    return counts
+
+
+def merge_into_golden_dataset() -> int:
+    """Append checkpointed cases not yet in golden_dataset.json (written atomically). Returns the number added."""
     try:
         with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
             existing_data = json.load(f)
     except FileNotFoundError:
         existing_data = []
 
-    # Merge
-    print(f"\n💾 Merging {len(extracted_cases)} new cases...")
-    final_data = existing_data + extracted_cases
-    
-    # Save
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+    titles = {case["title"] for entry in existing_data for case in entry.get("case_laws", [])}
+    new_entries = []
+    if os.path.exists(CASES_FILE):
+        # Streamed line by line: with --full-text the file holds every judgment's text
+        with open(CASES_FILE, 'r', encoding='utf-8') as f:
+            for raw in f:
+                try:
+                    entry = json.loads(raw)["entry"]
+                except json.JSONDecodeError:
+                    continue  # torn last line from a crash
+                title = entry["case_laws"][0]["title"]
+                if title not in titles:
+                    titles.add(title)
+                    new_entries.append(entry)
+
+    print(f"\n💾 Merging {len(new_entries)} new cases...")
+    final_data = existing_data + new_entries
+    tmp_path = OUTPUT_FILE + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
         json.dump(final_data, f, indent=2, ensure_ascii=False)
-        
+    os.replace(tmp_path, OUTPUT_FILE)
+
     print(f"🎉 Done! Dataset expanded to {len(final_data)} entries.")
     print(f"File saved at: {OUTPUT_FILE}")
+    return len(new_entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel, resumable ingestion of Supreme Court judgment PDFs")
+    parser.add_argument("--source", default=SOURCE_DIR, help="Unzipped Kaggle dataset (year folders of PDFs)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--limit", type=int, default=TARGET_COUNT, help="Stop after this many matched cases (0 = all)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-file timeout in seconds")
+    parser.add_argument("--max-pages", type=int, default=MAX_PAGES)
+    parser.add_argument("--retry-failed", action="store_true", help="Re-process files that errored or timed out")
+    parser.add_argument("--no-shuffle", action="store_true", help="Process in path order (year by year)")
+    parser.add_argument("--no-merge", action="store_true", help="Only checkpoint, do not update golden_dataset.json")
+    parser.add_argument("--full-text", action="store_true",
+                        help="Also extract every page of matched judgments (indexed by the judgment_texts source)")
+    args = parser.parse_args()
+
+    print(f"🚀 Starting Ingestion from: {args.source}")
+    if not os.path.isdir(args.source):
+        print(f"❌ Error: PDF folder not found. Pass --source or set KAGGLE_JUDGMENTS_DIR.\nCurrent path: {args.source}")
+        return
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    run(args.source, max(1, args.workers), args.limit, args.timeout, args.max_pages,
+        retry_failed=args.retry_failed, seed=None if args.no_shuffle else 42, full_text=args.full_text)
+    if not args.no_merge:
+        merge_into_golden_dataset()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,165 @@
+"""
+Re-embed an existing index with another embedding model into a new snapshot
+Documents and metadata are read from the source snapshot (the main collection and any shard
+collections) and re-encoded in large batches by a pool of worker processes, each with its own
+copy of the model. The new snapshot is published without moving CURRENT: the running service
+(and any restart) would refuse it until EMBEDDING_MODEL is switched (see check_embedding_compatibility).
+--activate moves CURRENT as well, and only when EMBEDDING_MODEL here already names the new model.
+The model-independent parts of the source - the doc store and the tombstone log - are copied over,
+and corpus.arrow is rebuilt from the new vectors when the source had one (or with --with-corpus).
+
+Usage:
+    python scripts/migrate_embeddings.py --model all-mpnet-base-v2 [--workers 4] [--batch-size 256] [--activate] [--with-mmap] [--with-corpus]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+
+import chromadb
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rag_service'))
+
+from embeddings import DEFAULT_MODEL, MODEL_REGISTRY, model_spec, embedding_metadata
+from vector_store import (CHROMA_PATH, COLLECTION_NAME, MmapVectorStore, export_collection,
+                          get_or_create_collection)
+from retrieval import SHARD_COLLECTIONS
+from index_snapshots import begin_snapshot, publish_snapshot, abort_snapshot, current_version, snapshot_path
+from embedding_pipeline import ParallelEmbedder, PipelineStats
+from corpus import CORPUS_FILE, CORPUS_PATH, write_corpus_from_collection
+from doc_store import DOC_STORE_FILE, DOC_STORE_PATH
+from compaction import TOMBSTONE_FILE, TOMBSTONE_PATH
+
+PAGE_SIZE = 5000
+
+
+def _page_batches(source, batch_size: int):
+    """(id, document, metadata) batches read page by page from a collection"""
+    total = source.count()
+    for offset in range(0, total, PAGE_SIZE):
+        page = source.get(include=["documents", "metadatas"], limit=PAGE_SIZE, offset=offset)
+        rows = list(zip(page["ids"], page["documents"], page["metadatas"]))
+        for i in range(0, len(rows), batch_size):
+            yield rows[i:i + batch_size]
+
+
+def migrate_collection(source, dest, embedder: ParallelEmbedder, batch_size: int, stats: PipelineStats) -> int:
+    """Stream one collection through the embedding pool. Returns the number of documents written."""
+    total = source.count()
+    written = 0
+    start = time.perf_counter()
+    for batch, vectors in embedder.embed_batches(_page_batches(source, batch_size), stats):
+        dest.upsert(ids=[r[0] for r in batch], documents=[r[1] for r in batch], metadatas=[r[2] for r in batch],
+                    embeddings=vectors.tolist())
+        written += len(batch)
+        rate = written / max(1e-9, time.perf_counter() - start)
+        print(f"\r   {written}/{total} documents ({rate:.0f} docs/s)", end="", flush=True)
+    print()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-embed the active index with another model into a new snapshot")
+    parser.add_argument("--model", required=True, choices=sorted(MODEL_REGISTRY))
+    parser.add_argument("--backend", default=os.getenv("EMBEDDING_BACKEND", "torch"))
+    parser.add_argument("--from-version", default=None, help="Source snapshot (default: CURRENT)")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--activate", action="store_true",
+                        help="Also point CURRENT at the new snapshot (EMBEDDING_MODEL must already be --model)")
+    parser.add_argument("--with-mmap", action="store_true")
+    parser.add_argument("--with-corpus", action="store_true", help="Write corpus.arrow even if the source had none")
+    args = parser.parse_args()
+
+    spec = model_spec(args.model)
+    configured = os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL)
+    if args.activate and configured != args.model:
+        raise SystemExit(f"EMBEDDING_MODEL is {configured}; the service would refuse a {args.model} index. "
+                         f"Switch EMBEDDING_MODEL first or migrate without --activate.")
+    source_version = args.from_version or current_version()
+    source_path = os.path.join(snapshot_path(source_version), "chroma_db") if source_version else CHROMA_PATH
+    source_client = chromadb.PersistentClient(path=source_path)
+    existing = {c if isinstance(c, str) else c.name for c in source_client.list_collections()}
+    names = [name for name in [COLLECTION_NAME, *SHARD_COLLECTIONS.values()] if name in existing]
+    if not names:
+        raise SystemExit(f"No collections to migrate in {source_path}")
+    # Files of the source index that do not depend on the embedding model
+    if source_version:
+        source_files = {name: os.path.join(snapshot_path(source_version), name)
+                        for name in (DOC_STORE_FILE, TOMBSTONE_FILE, CORPUS_FILE)}
+    else:
+        source_files = {DOC_STORE_FILE: os.getenv("DOC_STORE_PATH", DOC_STORE_PATH), TOMBSTONE_FILE: TOMBSTONE_PATH,
+                        CORPUS_FILE: os.getenv("CORPUS_FILE_PATH", CORPUS_PATH)}
+    with_corpus = args.with_corpus or os.path.exists(source_files[CORPUS_FILE])
+
+    version, build_path = begin_snapshot()
+    print(f"🔁 Migrating {source_version or 'legacy'} -> {version}: {args.model} ({spec['dimension']}-dim), "
+          f"batches of {args.batch_size}")
+
+    counts = {}
+    embedder = None
+    try:
+        carried_files = []
+        for name in (DOC_STORE_FILE, TOMBSTONE_FILE):
+            if os.path.exists(source_files[name]):
+                shutil.copy2(source_files[name], os.path.join(build_path, name))
+                carried_files.append(name)
+        if carried_files:
+            print(f"📎 Carried over: {', '.join(carried_files)}")
+
+        client = chromadb.PersistentClient(path=os.path.join(build_path, "chroma_db"))
+        stats = PipelineStats()
+        embedder = ParallelEmbedder(workers=args.workers, backend=args.backend, model_name=args.model)
+        for name in names:
+            source = source_client.get_collection(name=name, embedding_function=None)
+            carried = {k: v for k, v in (source.metadata or {}).items()
+                       if not k.startswith(("hnsw:", "embedding:"))}
+            dest = get_or_create_collection(client, name, None,
+                                            metadata={**carried, **embedding_metadata(args.model, spec["dimension"])})
+            print(f"📦 {name}: {source.count()} documents")
+            counts[name] = migrate_collection(source, dest, embedder, args.batch_size, stats)
+        embedder.close()
+        report = stats.report()
+        elapsed = report["wall_s"]
+
+        main_collection = client.get_collection(name=COLLECTION_NAME, embedding_function=None)
+        if args.with_mmap:
+            MmapVectorStore.build(os.path.join(build_path, "mmap_index"), *export_collection(main_collection),
+                                  extra_manifest={"collection_metadata": main_collection.metadata or {}})
+        if with_corpus:
+            # The corpus holds the vectors, so it is rebuilt rather than copied
+            write_corpus_from_collection(main_collection, os.path.join(build_path, CORPUS_FILE),
+                                         extra_manifest={"migrated_from": source_version})
+        client.clear_system_cache()
+        source_client.clear_system_cache()
+
+        total = sum(counts.values())
+        publish_snapshot(version, build_path, {
+            "source": "migrate_embeddings.py",
+            "migrated_from": source_version,
+            "count": counts.get(COLLECTION_NAME, total),
+            "collections": counts,
+            "carried_over": carried_files,
+            "corpus": with_corpus,
+            "embedding": {"backend": args.backend, "model": args.model, "dimension": spec["dimension"]},
+            "pipeline": report,
+        }, activate=args.activate)
+    except BaseException:
+        if embedder:
+            embedder.close()
+        abort_snapshot(build_path)
+        raise
+
+    print(f"✅ Re-embedded {total} documents in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} docs/s, "
+          f"CPU utilisation {report['cpu_utilisation']:.0%})")
+    if args.activate:
+        print(f"   CURRENT -> {version}. Restart the service, or POST /admin/reload, with EMBEDDING_MODEL={args.model}.")
+    else:
+        print(f"   Set EMBEDDING_MODEL={args.model} on the service, then POST /admin/reload "
+              f"{{\"version\": \"{version}\"}} (or run with --activate and restart).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Report shared vs unique resident memory for a gunicorn master and its workers (Linux)
+
+Usage:
+    python scripts/report_worker_memory.py <master_pid>
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rag_service'))
+
+from shared_assets import memory_report
+
+
+def child_pids(pid: int) -> list:
+    children = []
+    task_dir = f"/proc/{pid}/task"
+    for tid in os.listdir(task_dir):
+        try:
+            with open(os.path.join(task_dir, tid, "children"), "r") as f:
+                children.extend(int(c) for c in f.read().split())
+        except OSError:
+            continue
+    return children
+
+
+def main():
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+
+    master = int(sys.argv[1])
+    reports = [("master", memory_report(master))] + [("worker", memory_report(pid)) for pid in child_pids(master)]
+
+    print(f"{'role':<8} {'pid':>8} {'rss MB':>10} {'pss MB':>10} {'shared MB':>10} {'unique MB':>10}")
+    for role, r in reports:
+        if "error" in r:
+            print(f"{role:<8} {r['pid']:>8} {r['error']}")
+            continue
+        print(f"{role:<8} {r['pid']:>8} {r['rss_mb']:>10} {r['pss_mb']:>10} {r['shared_mb']:>10} {r['unique_mb']:>10}")
+
+    valid = [r for _, r in reports if "error" not in r]
+    naive = sum(r["rss_mb"] for r in valid)
+    actual = sum(r["pss_mb"] for r in valid)
+    print(f"\nSum of RSS (what N independent processes would cost): {naive:.1f} MB")
+    print(f"Sum of PSS (actual physical memory with sharing):      {actual:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()